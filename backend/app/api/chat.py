@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.gemini_service import gemini_service
+import asyncio
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -30,7 +31,7 @@ async def chat(request: ChatRequest):
         full_prompt = f"{system_prompt}\n\nUser Question: {request.message}\n\nAssistant:"
         
         # Use Gemini to generate response
-        response = gemini_service.generate_chat_response(full_prompt)
+        response = await asyncio.to_thread(gemini_service.generate_chat_response, full_prompt)
         
         return ChatResponse(response=response)
         
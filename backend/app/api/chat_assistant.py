@@ -1,15 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import google.generativeai as genai
 import os
+from app.services.llm_transport import llm_transport
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-# Configure Gemini API
+# Configure Gemini API (shared, pre-connected transport)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+llm_transport.configure(GEMINI_API_KEY)
 
 class ChatMessage(BaseModel):
     message: str
@@ -25,7 +24,7 @@ async def chat_assistant(chat_message: ChatMessage):
         
         # Use same model configuration as gemini_service
         model_name = os.getenv('GEMINI_MODEL', 'gemma-3-27b-it')
-        model = genai.GenerativeModel(model_name)
+        model = llm_transport.get_model(model_name)
         
         # System prompt to guide the AI assistant
         prompt = f"""You are an expert interview coach and career advisor with 20+ years of experience. 
@@ -1,7 +1,9 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from app.middleware.auth import get_current_user
 from app.services.code_executor import code_executor
+from app.services.execution_pool import ExecutionRejected, execution_pool
 
 router = APIRouter(prefix="/api/code", tags=["code"])
 
@@ -9,6 +11,7 @@ class ExecuteCodeRequest(BaseModel):
     code: str
     language: str
     input: str = ""
+    queueTimeout: Optional[float] = None  # Seconds to wait for a free runner, capped by the server
 
 @router.post("/execute")
 async def execute_code(request: ExecuteCodeRequest):
@@ -21,16 +24,24 @@ async def execute_code(request: ExecuteCodeRequest):
     - go, rust, ruby, php
     - swift, kotlin, scala
     - r, perl, bash
+    
+    Runs are admitted through the execution pool: when it is saturated the
+    request gets 429 (queue full) or 503 (queue deadline passed) with Retry-After.
     """
     try:
-        result = code_executor.execute(
-            code=request.code,
-            language=request.language.lower(),
-            input_data=request.input
+        result = await execution_pool.run(
+            lambda: code_executor.execute_async(
+                code=request.code,
+                language=request.language.lower(),
+                input_data=request.input
+            ),
+            queue_timeout=request.queueTimeout
         )
         
         return result
         
+    except ExecutionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code execution failed: {str(e)}")
 
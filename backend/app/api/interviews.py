@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from datetime import datetime, timedelta
-from app.models.schemas import StartInterviewRequest, SubmitAnswerRequest
+from app.models.schemas import StartInterviewRequest, SubmitAnswerRequest, PartialAnswerRequest
 from app.services.firebase_service import firebase_service
 from app.services.gemini_service import gemini_service
+from app.services.question_set_store import question_set_store, SPARE_QUESTIONS
+from app.services.speculative_evaluator import speculative_evaluator
+from app.services.interview_planner import update_score_stats, is_measured_score, should_stop_early, plan_question_budget, has_time_for_another_question
+from app.services.adaptive_engine import adaptive_enabled, has_unasked_questions, next_adaptive_question, question_level, update_ability
 from app.middleware.auth import get_current_user
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import asyncio
 import uuid
 import random
 
@@ -14,14 +19,20 @@ router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 class QuestionSetRequest(BaseModel):
     config: dict
     count: int = 5
+    daily: bool = False  # Serve the shared set for this config and seed instead of a fresh one
+    seed: Optional[str] = None  # Defaults to today's date (UTC) for daily sets
 
 class RegenerateQuestionRequest(BaseModel):
     config: dict
     questionId: str
+    setId: Optional[str] = None  # Serve a spare generated with this set when one is left
+    exclude: List[str] = []  # Question texts already in the editor
 
 class StartWithQuestionsRequest(BaseModel):
     config: dict
     questions: List[dict]
+    setId: Optional[str] = None
+    deferEvaluation: bool = True  # Record answers only and grade them all when the interview finishes
 
 @router.post("/start")
 async def start_interview(request: Request, req: StartInterviewRequest, user: dict = Depends(get_current_user)):
@@ -36,14 +47,34 @@ async def start_interview(request: Request, req: StartInterviewRequest, user: di
         for key, value in config_dict.items():
             print(f"  {key}: {value}")
         
-        print("\n--- Calling Gemini Service to generate first question ---")
-        # Generate first question using Gemini
-        first_question = gemini_service.generate_first_question(
-            config=config_dict,
-            user_profile=user
-        )
+        # Plan the question budget from the duration and the user's answer pace
+        past_interviews = firebase_service.get_user_interviews(user['uid'])
+        plan = plan_question_budget(config_dict, past_interviews)
+        print(f"\n--- Question plan: {plan} ---")
+        
+        print("\n--- Calling Gemini Service to generate planned questions (single batch) ---")
+        try:
+            planned_questions = await asyncio.to_thread(
+                gemini_service.generate_question_set,
+                config=config_dict,
+                count=plan['planned']
+            )
+        except Exception as e:
+            print(f"[WARNING] Batch generation failed, using fallback questions: {str(e)}")
+            planned_questions = gemini_service.get_fallback_question_set(config_dict, plan['planned'])
+        
+        if planned_questions:
+            first_question = planned_questions[0]
+        else:
+            first_question = await asyncio.to_thread(
+                gemini_service.generate_first_question,
+                config=config_dict,
+                user_profile=user
+            )
+            planned_questions = [first_question]
         
         print(f"\n--- First question received ---")
+        print(f"Planned questions: {len(planned_questions)} of {plan['budget']}")
         print(f"Question length: {len(first_question)} chars")
         print(f"Question: {first_question}")
         
@@ -55,6 +86,8 @@ async def start_interview(request: Request, req: StartInterviewRequest, user: di
             "status": "in_progress",
             "transcript": "",
             "qa": [],
+            "questions": planned_questions,
+            "questionPlan": plan,
             "firstQuestion": first_question
         }
         
@@ -77,6 +110,38 @@ async def start_interview(request: Request, req: StartInterviewRequest, user: di
         print("="*70 + "\n")
         raise HTTPException(status_code=500, detail=f"Failed to start interview: {str(e)}")
 
+def _next_question_plan(interview: dict, current_question: str, elapsed_ms: int) -> dict:
+    """
+    Work out up front whether the next question already exists (planned) or the
+    interview ends after this answer, and whether a follow-up comes from the bank,
+    so the evaluation call can skip generating a next question
+    """
+    answered = len(interview['qa']) + 1
+    pre_generated_questions = interview.get('questions', [])
+    question_plan = interview.get('questionPlan')
+    budget = (question_plan or {}).get('budget') or (len(pre_generated_questions) if pre_generated_questions else 10)
+    now_ms = int(datetime.now().timestamp() * 1000)
+    out_of_time = bool(question_plan) and not has_time_for_another_question(
+        question_plan,
+        interview['qa'] + [{"startTs": now_ms - elapsed_ms, "endTs": now_ms}]
+    )
+    needs_next_question = answered < budget and answered >= len(pre_generated_questions) and not out_of_time
+    
+    # Follow-ups come from the bank at the candidate's estimated level while it has
+    # unasked questions, so the evaluation call does not have to generate one
+    asked = [qa.get('questionText', '') for qa in interview['qa']] + [current_question]
+    adaptive_next = needs_next_question and adaptive_enabled(interview['config']) and has_unasked_questions(interview['config'], asked)
+    
+    return {
+        "answered": answered,
+        "budget": budget,
+        "preGenerated": pre_generated_questions,
+        "outOfTime": out_of_time,
+        "needsNextQuestion": needs_next_question,
+        "asked": asked,
+        "adaptiveNext": adaptive_next
+    }
+
 @router.post("/{interview_id}/answer")
 async def submit_answer(
     interview_id: str,
@@ -92,18 +157,46 @@ async def submit_answer(
         if interview['userId'] != user['uid']:
             raise HTTPException(status_code=403, detail="Not authorized")
         
-        # Get current question (last one or first question)
-        if interview['qa']:
-            current_question = interview['qa'][-1]['questionText']
+        # Get current question (the one last sent to the client, or the first question)
+        current_question = interview.get('currentQuestion') or interview.get('firstQuestion', '')
+        
+        if interview.get('evaluationMode') == 'deferred':
+            return _record_deferred_answer(interview_id, interview, request)
+        
+        plan = _next_question_plan(interview, current_question, request.elapsedMs)
+        answered, budget, out_of_time = plan['answered'], plan['budget'], plan['outOfTime']
+        pre_generated_questions, asked, adaptive_next = plan['preGenerated'], plan['asked'], plan['adaptiveNext']
+        include_next_question = plan['needsNextQuestion'] and not adaptive_next
+        
+        # Fallback questions are drawn without replacement from a per-interview permutation
+        fallback_sampler = dict(interview.get('fallbackSampler') or {})
+        
+        # Reuse the speculative evaluation of the streamed transcript when it still matches
+        speculative = await speculative_evaluator.take(interview_id, len(interview['qa']), request.answerText)
+        if speculative and include_next_question and not speculative[0].get('nextQuestion'):
+            speculative = None  # Speculated when no next question was needed yet
+        if speculative:
+            result, match, partial_answer = speculative
+            if match == 'refine':
+                result = await asyncio.to_thread(
+                    gemini_service.refine_evaluation,
+                    config=interview['config'],
+                    question=current_question,
+                    previous=result,
+                    partial_answer=partial_answer,
+                    final_answer=request.answerText
+                )
         else:
-            current_question = interview.get('firstQuestion', '')
-        
-        # Evaluate answer using Gemini
-        result = gemini_service.evaluate_and_generate_next(
-            config=interview['config'],
-            qa_history=interview['qa'],
-            current_answer=request.answerText
-        )
+            # Evaluate answer using Gemini
+            result = await asyncio.to_thread(
+                gemini_service.evaluate_and_generate_next,
+                config=interview['config'],
+                qa_history=interview['qa'],
+                current_answer=request.answerText,
+                current_question=current_question,
+                include_next_question=include_next_question,
+                fallback_sampler=fallback_sampler
+            )
         
         # Create QA entry
         qa_entry = {
@@ -117,25 +210,62 @@ async def submit_answer(
             "modelAnswer": result.get('modelAnswer')
         }
         
-        # Update interview
         updated_qa = interview['qa'] + [qa_entry]
-        firebase_service.update_interview(interview_id, {
-            "qa": updated_qa,
-            "transcript": interview.get('transcript', '') + f"\nQ: {current_question}\nA: {request.answerText}\n"
-        })
+        
+        # Track the running score estimate for early stopping (real evaluations only)
+        score_stats = interview.get('scoreStats')
+        if is_measured_score(result):
+            score_stats = update_score_stats(score_stats, float(qa_entry['aiScore']))
+        
+        # Ability estimate for adaptive follow-ups
+        ability = interview.get('ability')
+        if qa_entry['aiScore'] is not None:
+            ability = update_ability(ability, float(qa_entry['aiScore']), question_level(current_question, interview['config']), interview['config'])
+        # Interviews on the user's own question list always run to the end
+        early_stop = None if interview.get('presetQuestions') else should_stop_early(score_stats, interview['config'])
         
         # Determine next question
         # Check if we have pre-generated questions
-        pre_generated_questions = interview.get('questions', [])
-        if pre_generated_questions and len(updated_qa) < len(pre_generated_questions):
+        if answered >= budget or out_of_time:
+            next_question = None
+        elif len(updated_qa) < len(pre_generated_questions):
             # Use next pre-generated question
             next_question = pre_generated_questions[len(updated_qa)]
+        elif adaptive_next:
+            next_question = (
+                next_adaptive_question(ability, interview['config'], asked, fallback_sampler)
+                or result.get('nextQuestion')
+                or "INTERVIEW_COMPLETE"
+            )
         else:
-            # Use AI-generated next question or mark complete
-            next_question = result.get('nextQuestion', '')
+            # Use AI-generated follow-up question or mark complete
+            next_question = result.get('nextQuestion') or "INTERVIEW_COMPLETE"
+        
+        # Update interview
+        interview_update = {
+            "qa": updated_qa,
+            "currentQuestion": next_question,
+            "scoreStats": score_stats,
+            "ability": ability,
+            "fallbackSampler": fallback_sampler,
+            "transcript": interview.get('transcript', '') + f"\nQ: {current_question}\nA: {request.answerText}\n"
+        }
+        if early_stop:
+            interview_update["stopReason"] = "confidence"
+        firebase_service.update_interview(interview_id, interview_update)
         
         # Check if interview is complete
-        if next_question == "INTERVIEW_COMPLETE" or len(updated_qa) >= 10 or (pre_generated_questions and len(updated_qa) >= len(pre_generated_questions)):
+        if early_stop:
+            print(f"Stopping interview {interview_id} early: score {early_stop['mean']} ± {early_stop['halfWidth']}")
+            return {
+                "nextQuestion": None,
+                "evaluation": result,
+                "completed": True,
+                "stoppedEarly": True,
+                "scoreEstimate": early_stop
+            }
+        
+        if next_question is None or next_question == "INTERVIEW_COMPLETE":
             return {
                 "nextQuestion": None,
                 "evaluation": result,
@@ -150,19 +280,118 @@ async def submit_answer(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to submit answer: {str(e)}")
 
+def _record_deferred_answer(interview_id: str, interview: dict, request: SubmitAnswerRequest) -> dict:
+    """Store the answer ungraded and hand back the next pre-generated question; grading happens at finish"""
+    current_question = interview.get('currentQuestion') or interview.get('firstQuestion', '')
+    qa_entry = {
+        "questionId": str(uuid.uuid4()),
+        "questionText": current_question,
+        "answerText": request.answerText,
+        "startTs": int(datetime.now().timestamp() * 1000) - request.elapsedMs,
+        "endTs": int(datetime.now().timestamp() * 1000),
+        "aiScore": None,
+        "aiFeedback": None,
+        "pendingEvaluation": True
+    }
+    
+    updated_qa = interview['qa'] + [qa_entry]
+    questions = interview.get('questions', [])
+    next_question = questions[len(updated_qa)] if len(updated_qa) < len(questions) else None
+    
+    firebase_service.update_interview(interview_id, {
+        "qa": updated_qa,
+        "currentQuestion": next_question,
+        "transcript": interview.get('transcript', '') + f"\nQ: {current_question}\nA: {request.answerText}\n"
+    })
+    
+    return {
+        "nextQuestion": next_question,
+        "evaluation": None,
+        "deferred": True,
+        "completed": next_question is None
+    }
+
+def _grade_deferred_answers(interview: dict) -> list:
+    """Batch-grade the answers recorded in deferred mode and return the updated QA list"""
+    qa_list = interview.get('qa', [])
+    pending = [qa for qa in qa_list if qa.get('pendingEvaluation')]
+    if not pending:
+        return qa_list
+    
+    results = gemini_service.evaluate_answers_batch(
+        interview['config'],
+        [{"question": qa['questionText'], "answer": qa['answerText']} for qa in pending]
+    )
+    for qa, result in zip(pending, results):
+        qa['aiScore'] = result.get('score')
+        qa['aiFeedback'] = result.get('feedback')
+        qa['evaluation'] = result
+        qa.pop('pendingEvaluation', None)
+    return qa_list
+
+@router.post("/{interview_id}/partial")
+async def submit_partial_answer(
+    interview_id: str,
+    request: PartialAnswerRequest,
+    user: dict = Depends(get_current_user)
+):
+    """Start evaluating the answer transcript so far, while the candidate is still answering"""
+    try:
+        interview = firebase_service.get_interview(interview_id)
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        
+        if interview['userId'] != user['uid']:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        
+        if interview.get('status') != 'in_progress':
+            return {"status": "closed"}
+        if interview.get('evaluationMode') == 'deferred':
+            return {"status": "deferred"}
+        
+        config = interview['config']
+        qa_history = list(interview['qa'])
+        current_question = interview.get('currentQuestion') or interview.get('firstQuestion', '')
+        fallback_sampler = dict(interview.get('fallbackSampler') or {})
+        plan = _next_question_plan(interview, current_question, request.elapsedMs)
+        include_next_question = plan['needsNextQuestion'] and not plan['adaptiveNext']
+        
+        status = speculative_evaluator.submit_partial(
+            interview_id,
+            len(qa_history),
+            request.partialTranscript,
+            lambda transcript: gemini_service.evaluate_and_generate_next(
+                config=config,
+                qa_history=qa_history,
+                current_answer=transcript,
+                current_question=current_question,
+                include_next_question=include_next_question,
+                fallback_sampler=fallback_sampler
+            )
+        )
+        return {"status": status}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to submit partial answer: {str(e)}")
+
 @router.post("/{interview_id}/finish")
-async def finish_interview(interview_id: str, user: dict = Depends(get_current_user)):
+async def finish_interview(interview_id: str, background_tasks: BackgroundTasks, user: dict = Depends(get_current_user)):
     try:
         interview = firebase_service.get_interview(interview_id)
         if not interview or interview['userId'] != user['uid']:
             raise HTTPException(status_code=404, detail="Interview not found")
         
+        # Deferred interviews are graded here, in a few batched calls
+        interview['qa'] = await asyncio.to_thread(_grade_deferred_answers, interview)
+        
         # Calculate overall score from evaluation scores
         scores = []
         for qa in interview['qa']:
-            if qa.get('evaluation') and qa['evaluation'].get('score'):
+            # A score of 0 (blank or non-answers) counts, as it does in scoreStats
+            if qa.get('evaluation') and qa['evaluation'].get('score') is not None:
                 scores.append(qa['evaluation']['score'])
-            elif qa.get('aiScore'):
+            elif qa.get('aiScore') is not None:
                 scores.append(qa['aiScore'])
         overall_score = sum(scores) / len(scores) if scores else 0
         
@@ -174,6 +403,7 @@ async def finish_interview(interview_id: str, user: dict = Depends(get_current_u
         avg_response_time = sum(response_times) / len(response_times) if response_times else 0
         
         firebase_service.update_interview(interview_id, {
+            "qa": interview['qa'],
             "status": "completed",
             "endedAt": datetime.now(),
             "overallScore": round(overall_score, 1),
@@ -185,6 +415,10 @@ async def finish_interview(interview_id: str, user: dict = Depends(get_current_u
             }
         })
         
+        # Model answers are skipped on the answer path; fill them in after the response is sent
+        if any(not qa.get('modelAnswer') for qa in interview['qa']):
+            background_tasks.add_task(_generate_missing_model_answers, interview_id)
+        
         return {
             "reportId": interview_id,
             "overallScore": round(overall_score, 1)
@@ -192,6 +426,69 @@ async def finish_interview(interview_id: str, user: dict = Depends(get_current_u
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to finish interview: {str(e)}")
 
+def _generate_missing_model_answers(interview_id: str):
+    """Background task: generate and cache model answers for QA entries that have none"""
+    try:
+        interview = firebase_service.get_interview(interview_id)
+        if not interview:
+            return
+        
+        qa_list = interview.get('qa', [])
+        generated = 0
+        for qa in qa_list:
+            if not qa.get('modelAnswer'):
+                model_answer = gemini_service.generate_model_answer(
+                    config=interview['config'],
+                    question=qa.get('questionText', ''),
+                    answer=qa.get('answerText')
+                )
+                if model_answer:  # Left empty on failure, to be generated on request later
+                    qa['modelAnswer'] = model_answer
+                    generated += 1
+        
+        if generated:
+            firebase_service.update_interview(interview_id, {"qa": qa_list})
+        print(f"Generated {generated} model answers for interview {interview_id}")
+    except Exception as e:
+        print(f"Failed to generate model answers for interview {interview_id}: {str(e)}")
+
+@router.get("/{interview_id}/qa/{question_id}/model-answer")
+async def get_model_answer(interview_id: str, question_id: str, user: dict = Depends(get_current_user)):
+    """Get the model answer for one QA entry, generating and caching it on first request"""
+    try:
+        interview = firebase_service.get_interview(interview_id)
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        
+        if interview['userId'] != user['uid'] and user.get('role') != 'admin':
+            raise HTTPException(status_code=403, detail="Not authorized")
+        
+        qa_list = interview.get('qa', [])
+        qa = next((entry for entry in qa_list if entry.get('questionId') == question_id), None)
+        if not qa:
+            raise HTTPException(status_code=404, detail="Question not found")
+        
+        if qa.get('modelAnswer'):
+            return {"questionId": question_id, "modelAnswer": qa['modelAnswer'], "cached": True}
+        
+        model_answer = await asyncio.to_thread(
+            gemini_service.generate_model_answer,
+            config=interview['config'],
+            question=qa.get('questionText', ''),
+            answer=qa.get('answerText')
+        )
+        if not model_answer:
+            raise HTTPException(status_code=503, detail="Model answers are temporarily unavailable, please try again later")
+        
+        qa['modelAnswer'] = model_answer
+        firebase_service.update_interview(interview_id, {"qa": qa_list})
+        
+        return {"questionId": question_id, "modelAnswer": qa['modelAnswer'], "cached": False}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get model answer: {str(e)}")
+
 @router.get("/{interview_id}")
 async def get_interview(interview_id: str, user: dict = Depends(get_current_user)):
     interview = firebase_service.get_interview(interview_id)
@@ -279,24 +576,37 @@ async def generate_question_set(
 ):
     """Generate a full set of questions before starting the interview"""
     try:
-        questions = gemini_service.generate_question_set(
+        if request.daily:
+            # One shared set per normalized config and seed, generated once for everyone
+            question_set = await asyncio.to_thread(
+                question_set_store.get_or_create_daily_set,
+                config=request.config,
+                count=request.count,
+                generate=lambda config, count: gemini_service.generate_question_set(config=config, count=count, spares=SPARE_QUESTIONS),
+                seed=request.seed
+            )
+            return {
+                "questions": question_set['questions'],
+                "count": len(question_set['questions']),
+                "setId": question_set['id'],
+                "seed": question_set['seed'],
+                "daily": True
+            }
+        
+        questions = await asyncio.to_thread(
+            gemini_service.generate_question_set,
             config=request.config,
-            count=request.count
+            count=request.count,
+            spares=SPARE_QUESTIONS
         )
         
-        # Format questions with IDs
-        formatted_questions = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": q,
-                "order": i
-            }
-            for i, q in enumerate(questions)
-        ]
+        # Keep the set (and its spare alternates) server-side for regeneration
+        question_set = question_set_store.create_set(request.config, questions, request.count)
         
         return {
-            "questions": formatted_questions,
-            "count": len(formatted_questions)
+            "questions": question_set['questions'],
+            "count": len(question_set['questions']),
+            "setId": question_set['id']
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate questions: {str(e)}")
@@ -306,12 +616,15 @@ async def regenerate_question(
     request: RegenerateQuestionRequest,
     user: dict = Depends(get_current_user)
 ):
-    """Regenerate a single question"""
+    """Regenerate a single question, from the set's spares while they last"""
     try:
-        new_question = gemini_service.generate_first_question(
-            config=request.config,
-            user_profile=user
-        )
+        new_question = question_set_store.take_spare(request.setId, request.exclude) if request.setId else None
+        if new_question is None:
+            new_question = await asyncio.to_thread(
+                gemini_service.generate_first_question,
+                config=request.config,
+                user_profile=user
+            )
         
         return {
             "question": {
@@ -339,6 +652,9 @@ async def start_with_questions(
             "transcript": "",
             "qa": [],
             "questions": [q['text'] for q in request.questions],
+            "questionSetId": request.setId,
+            "presetQuestions": bool(request.questions),
+            "evaluationMode": "deferred" if request.deferEvaluation and request.questions else "immediate",
             "currentQuestionIndex": 0,
             "firstQuestion": request.questions[0]['text'] if request.questions else ""
         }
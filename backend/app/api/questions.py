@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from app.middleware.auth import get_current_user, require_admin
 from app.services.gemini_service import gemini_service
 from app.services.firebase_service import firebase_service
+from app.services.question_search import question_search, DEFAULT_PAGE_SIZE, MAX_RESULTS
+from app.services.question_import import question_importer, detect_format
 from typing import Optional
 from datetime import datetime
+import asyncio
+import time
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
 
@@ -14,34 +18,84 @@ class PracticeAnswerRequest(BaseModel):
     category: str
     sessionId: Optional[str] = None
 
-# Placeholder for future question bank functionality
-SAMPLE_QUESTIONS = [
-    {
-        "id": "1",
-        "text": "Explain the difference between let, const, and var in JavaScript",
-        "category": "technical",
-        "difficulty": "entry",
-        "tags": ["javascript", "fundamentals"]
-    },
-    {
-        "id": "2",
-        "text": "Describe a time when you had to work with a difficult team member",
-        "category": "behavioral",
-        "difficulty": "mid",
-        "tags": ["teamwork", "conflict-resolution"]
-    }
-]
-
 @router.get("")
-async def get_questions(category: str = None, difficulty: str = None):
-    questions = SAMPLE_QUESTIONS
-    
-    if category:
-        questions = [q for q in questions if q['category'] == category]
-    if difficulty:
-        questions = [q for q in questions if q['difficulty'] == difficulty]
-    
-    return questions
+async def get_questions(
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    topic: Optional[str] = None,
+    company: Optional[str] = None,
+    source: Optional[str] = Query(None, description="bank or set"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_RESULTS),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """
+    Page through the question bank and stored question sets.
+
+    Filters take comma-separated values (any of them matches). Without a
+    limit or cursor the response is a plain list of the first matches, as
+    before paging; with either it is {questions, count, total, nextCursor},
+    and the response's nextCursor gets the next page.
+    """
+    try:
+        paged = cursor is not None or limit is not None
+        page = question_search.list_questions(
+            category, difficulty, topic, company, source, cursor,
+            (limit or DEFAULT_PAGE_SIZE) if paged else MAX_RESULTS,
+            [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        )
+        return page if paged else page['questions']
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing questions: {str(e)}")
+
+@router.get("/search")
+async def search_questions(
+    q: str = Query("", description="Search text"),
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    topic: Optional[str] = None,
+    company: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Ranked search over the question bank and stored question sets"""
+    try:
+        started = time.perf_counter()
+        found = question_search.search(q, category, difficulty, topic, company, limit)
+        return {
+            **found,
+            "count": len(found['results']),
+            "tookMs": round((time.perf_counter() - started) * 1000, 3)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching questions: {str(e)}")
+
+@router.post("/import")
+async def import_questions(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from Content-Type"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Stream an NDJSON or CSV upload (raw request body) into the question bank.
+
+    Rows need question and category; difficulty, hints, topics, companies,
+    pool and a canonical answer are optional (CSV list fields are
+    '|'-separated; a CSV answer is a number with an optional tolerance column). Duplicates of
+    existing questions are skipped. New questions are searchable and used by
+    the fallback generator as soon as the import finishes.
+    """
+    try:
+        fmt = detect_format(format, request.headers.get('content-type', ''))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        report = await question_importer.run(request.stream(), fmt)
+        print(f"=== QUESTIONS: import by {admin['uid']}: {report['imported']} imported ===")
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing questions: {str(e)}")
 
 @router.get("/generate")
 async def generate_practice_questions(
@@ -52,7 +106,7 @@ async def generate_practice_questions(
 ):
     """Generate AI-powered practice questions and create a new practice session"""
     try:
-        questions = gemini_service.generate_practice_questions(category, difficulty, count)
+        questions = await asyncio.to_thread(gemini_service.generate_practice_questions, category, difficulty, count)
         if not questions:
             raise HTTPException(status_code=500, detail="Failed to generate questions")
         
@@ -84,7 +138,8 @@ async def evaluate_practice_answer(
 ):
     """Evaluate a practice answer with AI feedback and save to session"""
     try:
-        evaluation = gemini_service.evaluate_practice_answer(
+        evaluation = await asyncio.to_thread(
+            gemini_service.evaluate_practice_answer,
             question=request.question,
             answer=request.answer,
             category=request.category
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
-import google.generativeai as genai
 import os
+from app.services.llm_transport import llm_transport
 from typing import Dict, List
 import PyPDF2
 import io
@@ -10,10 +10,9 @@ import re
 
 router = APIRouter(prefix="/api", tags=["resume"])
 
-# Configure Gemini API
+# Configure Gemini API (shared, pre-connected transport)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+llm_transport.configure(GEMINI_API_KEY)
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file"""
@@ -156,7 +155,7 @@ async def analyze_resume(resume: UploadFile = File(...)):
         
         # Use same model configuration as gemini_service
         model_name = os.getenv('GEMINI_MODEL', 'gemma-3-27b-it')
-        model = genai.GenerativeModel(model_name)
+        model = llm_transport.get_model(model_name)
         
         prompt = f"""You are an expert resume analyzer and ATS (Applicant Tracking System) consultant. 
 Analyze the following resume and provide:
@@ -11,6 +11,7 @@ class InterviewConfig(BaseModel):
     difficulty: Literal['entry', 'mid', 'senior']
     durationMinutes: Literal[15, 30, 45, 60]
     videoEnabled: bool = True
+    confidenceBand: Optional[float] = None  # Early-stop once the score is known within ± this many points (0 disables)
 
 class StartInterviewRequest(BaseModel):
     config: InterviewConfig
@@ -20,6 +21,10 @@ class SubmitAnswerRequest(BaseModel):
     elapsedMs: int
     partialTranscript: Optional[str] = None
 
+class PartialAnswerRequest(BaseModel):
+    partialTranscript: str
+    elapsedMs: int = 0
+
 class QuestionAnswer(BaseModel):
     questionId: str
     questionText: str
@@ -0,0 +1,108 @@
+import math
+import os
+from typing import Optional
+from app.services.question_bank import DEFAULT_CATEGORY, draw_without_replacement, fallback_pool, lookup_question, question_bank
+
+# Adaptive follow-ups: a Rasch (1PL IRT) ability estimate updated after every
+# answer picks the next question from the bank at the level that tells us the
+# most about the candidate, without an LLM call. Opt-in: it trades the LLM's
+# tailored follow-up for a bank question
+ADAPTIVE_ENGINE_ENABLED = os.getenv('ADAPTIVE_ENGINE_ENABLED', 'false').lower() == 'true'
+LEVEL_DIFFICULTY = {'entry': -1.0, 'mid': 0.0, 'senior': 1.0}  # Item difficulty on the ability (logit) scale
+PASS_SCORE = 70  # aiScore of a candidate whose ability matches the question's difficulty
+SCORE_SPREAD = 30  # aiScore points from PASS_SCORE to a clear fail / full marks
+PRIOR_INFORMATION = 1.0  # Fisher information of the starting estimate; an answer at p = 0.5 adds 0.25
+MAX_ABILITY = 3.0
+
+
+def adaptive_enabled(config: dict) -> bool:
+    """
+    Whether follow-ups come from the engine: config['adaptive'] overrides the
+    default per interview, and the bank must have questions on the interview's
+    subType, since select() would otherwise fall back to unrelated topics.
+    """
+    enabled = config.get('adaptive')
+    if enabled is None:
+        enabled = ADAPTIVE_ENGINE_ENABLED
+    return bool(enabled) and question_bank.snapshot().covers_sub_type(config.get('type', DEFAULT_CATEGORY), config.get('subType'))
+
+
+def _probability(ability: float, difficulty: float) -> float:
+    return 1 / (1 + math.exp(difficulty - ability))
+
+
+def update_ability(state: Optional[dict], score: float, level: str, config: dict) -> dict:
+    """
+    One online Newton step on the Rasch likelihood, stored on the interview as
+    {ability, information, answers}. The score is used as partial credit, so
+    the step shrinks as information accumulates, like a decaying Elo K-factor.
+    """
+    state = dict(state or {
+        'ability': LEVEL_DIFFICULTY.get(config.get('difficulty'), 0.0),
+        'information': PRIOR_INFORMATION,
+        'answers': 0
+    })
+    difficulty = LEVEL_DIFFICULTY.get(level, 0.0)
+    outcome = min(max((score - PASS_SCORE + SCORE_SPREAD) / (2 * SCORE_SPREAD), 0.0), 1.0)
+    expected = _probability(state['ability'], difficulty)
+
+    state['information'] += expected * (1 - expected)
+    ability = state['ability'] + (outcome - expected) / state['information']
+    state['ability'] = round(min(max(ability, -MAX_ABILITY), MAX_ABILITY), 4)
+    state['answers'] += 1
+    return state
+
+
+def ability_estimate(state: Optional[dict]) -> dict:
+    """Ability with its standard error and the level it corresponds to"""
+    if not state:
+        return {'answers': 0, 'ability': None, 'standardError': None, 'level': None}
+    return {
+        'answers': state['answers'],
+        'ability': round(state['ability'], 2),
+        'standardError': round(1 / math.sqrt(state['information']), 2),
+        'level': target_levels(state['ability'])[0]
+    }
+
+
+def target_levels(ability: float) -> list:
+    """Levels from most to least informative; a Rasch item is most informative where difficulty = ability"""
+    return sorted(LEVEL_DIFFICULTY, key=lambda level: abs(LEVEL_DIFFICULTY[level] - ability))
+
+
+def question_level(question: str, config: dict) -> str:
+    """Bank difficulty of a question, or the interview's difficulty for generated questions"""
+    bank_question = lookup_question(config.get('type', DEFAULT_CATEGORY), question)
+    if bank_question:
+        return bank_question['difficulty']
+    return config.get('difficulty') or 'mid'
+
+
+def _normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def has_unasked_questions(config: dict, asked: list) -> bool:
+    """Whether the bank still has a question for this config that was not asked yet"""
+    asked = {_normalize(text) for text in asked}
+    category = config.get('type', DEFAULT_CATEGORY)
+    for level in LEVEL_DIFFICULTY:
+        questions = fallback_pool(category, level, sub_type=config.get('subType'), company=config.get('company'))
+        if any(_normalize(question['question']) not in asked for question in questions):
+            return True
+    return False
+
+
+def next_adaptive_question(state: Optional[dict], config: dict, asked: list, sampler: dict) -> Optional[str]:
+    """
+    Unasked bank question at the level nearest the current ability estimate,
+    trying the next nearest level when one is used up. Draws share the
+    interview's fallback sampler, so they are O(1) and never repeat.
+    """
+    ability = state['ability'] if state else LEVEL_DIFFICULTY.get(config.get('difficulty'), 0.0)
+    category = config.get('type', DEFAULT_CATEGORY)
+    for level in target_levels(ability):
+        question = draw_without_replacement(sampler, category, level, asked, config.get('subType'), config.get('company'))
+        if question:
+            return question['question']
+    return None
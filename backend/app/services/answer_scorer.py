@@ -0,0 +1,127 @@
+import math
+import threading
+from collections import Counter
+from app.services.question_bank import question_bank
+from app.services.text_tokens import tokenize
+
+# Offline answer scoring: BM25-weighted coverage of the question's reference
+# terms (question text, bank hints and topics, cached model answer)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_ANSWER_TERMS = 60  # Typical content-word count of a spoken answer
+DEPTH_TERMS = 40  # Distinct content words for full depth credit
+FULL_COVERAGE = 0.5
+COVERAGE_SHARE = 0.7  # Of the score range; the rest rewards depth
+MIN_SCORE = 40
+MAX_CACHED_REFERENCES = 5000  # Generated questions are not in the bank; keep their cache bounded
+MAX_SCORE = 95
+
+
+class AnswerScorer:
+    """
+    Scores answers locally while Gemini is unavailable.
+
+    Reference term weights are precomputed once per bank question (IDF over the
+    bank) and cached per bank version, so scoring an answer is one pass over
+    its tokens plus a lookup per reference term.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._idf = {}
+        self._default_idf = 1.0
+        self._by_text = {}
+        self._references = {}
+
+    def _refresh(self):
+        snapshot = question_bank.snapshot()
+        if snapshot.version == self._version:
+            return
+        with self._lock:
+            if snapshot.version == self._version:
+                return
+            document_frequency = Counter()
+            by_text = {}
+            for question in snapshot.by_id.values():
+                by_text[' '.join(question['question'].lower().split())] = question
+                document_frequency.update(set(tokenize(self._reference_text(question))))
+            total = max(len(snapshot.by_id), 1)
+            self._idf = {
+                term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+                for term, df in document_frequency.items()
+            }
+            self._default_idf = math.log(1 + (total + 0.5) / 0.5)
+            self._by_text = by_text
+            self._references = {}
+            self._version = snapshot.version
+
+    def _reference_text(self, question) -> str:
+        return ' '.join([question['question'], *question['hints'], *question['topics']])
+
+    def _reference(self, question_text: str, model_answer: str = '') -> dict:
+        """{term: weight} for the question, cached by question text"""
+        key = (' '.join((question_text or '').lower().split()), bool(model_answer))
+        cached = self._references.get(key)
+        if cached is not None:
+            return cached
+
+        bank_question = self._by_text.get(key[0])
+        hints = bank_question['hints'] if bank_question else ()
+        text = self._reference_text(bank_question) if bank_question else question_text
+        weights = Counter()
+        for term in tokenize(text):
+            weights[term] = self._idf.get(term, self._default_idf)
+        # A model answer widens the vocabulary at a lower weight than the question's own terms
+        for term in set(tokenize(model_answer)):
+            weights[term] = max(weights[term], 0.5 * self._idf.get(term, self._default_idf))
+
+        reference = {
+            'weights': dict(weights),
+            'total': sum(weights.values()),
+            'hints': tuple((hint, frozenset(tokenize(hint))) for hint in hints)
+        }
+        if len(self._references) >= MAX_CACHED_REFERENCES:
+            self._references = {}
+        self._references[key] = reference
+        return reference
+
+    def score(self, question: str, answer: str, model_answer: str = '') -> dict:
+        """Score MIN_SCORE-MAX_SCORE (40-95) with the matched and missed reference concepts"""
+        self._refresh()
+        reference = self._reference(question, model_answer)
+        answer_terms = tokenize(answer)
+        frequencies = Counter(answer_terms)
+        length_norm = 1 - BM25_B + BM25_B * len(answer_terms) / AVG_ANSWER_TERMS
+
+        # BM25 term saturation, normalized to the best achievable score for the reference
+        matched = 0.0
+        for term, weight in reference['weights'].items():
+            tf = frequencies.get(term)
+            if tf:
+                matched += weight * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm) / (BM25_K1 + 1)
+        coverage = min(matched / reference['total'], 1.0) if reference['total'] else 0.0
+
+        # Depth: distinct content words, saturating around a full spoken answer
+        depth = min(len(frequencies) / DEPTH_TERMS, 1.0)
+        # Covering half the reference weight already reads as a complete answer
+        quality = COVERAGE_SHARE * min(coverage / FULL_COVERAGE, 1.0) + (1 - COVERAGE_SHARE) * depth
+        score = round(MIN_SCORE + (MAX_SCORE - MIN_SCORE) * quality)
+
+        covered_hints, missed_hints = [], []
+        answer_vocabulary = set(frequencies)
+        for hint, hint_terms in reference['hints']:
+            (covered_hints if hint_terms and hint_terms & answer_vocabulary else missed_hints).append(hint)
+
+        return {
+            'score': score,
+            'coverage': round(coverage, 3),
+            'coveredHints': covered_hints,
+            'missedHints': missed_hints,
+            'wordCount': len((answer or '').split())
+        }
+
+
+# Singleton instance
+answer_scorer = AnswerScorer()
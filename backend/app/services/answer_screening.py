@@ -0,0 +1,66 @@
+import re
+from difflib import SequenceMatcher
+from typing import Optional
+
+# Cheap local checks that catch answers not worth an LLM evaluation
+
+NON_ANSWER_PHRASES = {
+    "i dont know", "i do not know", "dont know", "idk", "no idea", "not sure",
+    "i am not sure", "im not sure", "no clue", "i have no idea", "pass", "skip",
+    "next", "next question", "nothing", "na", "n a", "none", "no answer",
+    "i cant answer", "i cannot answer", "sorry", "sorry i dont know",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUMERIC_OR_OPTION_RE = re.compile(r"^\(?([a-e]|-?\d+([.,/]\d+)?%?)\)?$")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower().replace("'", "")))
+
+
+def prescreen_answer(answer: str, question: str = "", category: str = "") -> Optional[dict]:
+    """
+    Classify trivial answers without calling the LLM.
+
+    Returns None when the answer needs a real evaluation, otherwise a dict with
+    the reason, a deterministic low score and short feedback.
+    """
+    normalized = _normalize(answer or "")
+
+    if not normalized:
+        return {
+            "reason": "blank",
+            "score": 0,
+            "feedback": "No answer was provided. Try to share whatever you know about the topic, even a partial answer.",
+        }
+
+    if normalized in NON_ANSWER_PHRASES:
+        return {
+            "reason": "no_attempt",
+            "score": 5,
+            "feedback": "It's fine not to know everything, but try to reason out loud and share a partial approach instead of skipping.",
+        }
+
+    words = normalized.split()
+    # Aptitude answers are often a single number or option letter
+    if len(words) == 1 and not (category == "aptitude" or _NUMERIC_OR_OPTION_RE.match(answer.strip().lower())):
+        return {
+            "reason": "one_word",
+            "score": 10,
+            "feedback": "A one-word reply doesn't show your understanding. Explain your reasoning and give an example.",
+        }
+
+    if question:
+        normalized_question = _normalize(question)
+        if normalized_question and len(words) >= 3:
+            question_words = set(normalized_question.split())
+            overlap = sum(1 for word in words if word in question_words) / len(words)
+            if overlap >= 0.9 and SequenceMatcher(None, normalized, normalized_question).ratio() >= 0.85:
+                return {
+                    "reason": "question_copy",
+                    "score": 5,
+                    "feedback": "The answer repeats the question instead of answering it. Address the question directly with your own explanation.",
+                }
+
+    return None
@@ -0,0 +1,341 @@
+import os
+import random
+import re
+from fractions import Fraction
+from typing import Callable, Optional
+
+# Procedural aptitude questions. Each template renders parameters into a fixed
+# sentence and computes the canonical answer; the same template parses the
+# sentence back, so answers are recomputed from the question text alone and
+# nothing has to be stored per generated question.
+APTITUDE_GENERATED_SHARE = float(os.getenv('APTITUDE_GENERATED_SHARE', '0.5'))
+MAX_ATTEMPTS_PER_QUESTION = 50
+MAX_ANSWER_DENOMINATOR = 12
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)(?::[^}]*)?\}")
+
+
+def _numeric(value: Fraction, unit: str = '', money: bool = False) -> Optional[dict]:
+    """
+    Canonical answer for a computed value, shown as a short decimal or a mixed
+    number; None for awkward fractions, so the parameters are drawn again.
+    """
+    value = Fraction(value)
+    if value.denominator > MAX_ANSWER_DENOMINATOR:
+        return None
+    if (value * 100).denominator == 1:
+        display = f"{float(value):,.2f}".rstrip('0').rstrip('.') if money else f"{float(value):g}"
+    elif value > 1:
+        display = f"{value.numerator // value.denominator} {value - value.numerator // value.denominator}"
+    else:
+        display = f"{value.numerator}/{value.denominator}"
+    display = f"₹{display}" if money else display
+    spec = {'value': round(float(value), 4), 'tolerance': 0 if value.denominator == 1 else 0.01, 'display': display}
+    if unit and not money:
+        spec['unit'] = unit
+    return spec
+
+
+class _Template:
+    def __init__(self, family: str, difficulty: str, text: str, params: Callable, solve: Callable, hints: tuple):
+        self.family = family
+        self.difficulty = difficulty
+        self.text = text
+        self.params = params
+        self.solve = solve
+        self.hints = hints
+        pattern, position = '', 0
+        for match in _PLACEHOLDER_RE.finditer(text):
+            pattern += re.escape(text[position:match.start()])
+            name = match.group(1)
+            pattern += rf"(?P<{name}>-?\d+(?:, -?\d+)+)" if name == 'terms' else rf"(?P<{name}>\d+)"
+            position = match.end()
+        self.regex = re.compile(pattern + re.escape(text[position:]) + '$')
+
+    def parse(self, question: str) -> Optional[dict]:
+        match = self.regex.match(question.strip())
+        if not match:
+            return None
+        return {
+            name: [int(t) for t in value.split(', ')] if name == 'terms' else int(value)
+            for name, value in match.groupdict().items()
+        }
+
+    def generate(self, rng: random.Random) -> Optional[dict]:
+        values = self.params(rng)
+        if values is None:
+            return None
+        answer = self.solve(values)
+        if answer is None:
+            return None
+        text = self.text.format(**{k: ', '.join(map(str, v)) if k == 'terms' else v for k, v in values.items()})
+        return {
+            'question': text,
+            'category': 'aptitude',
+            'difficulty': self.difficulty,
+            'hints': list(self.hints),
+            'topics': [self.family],
+            'answer': answer
+        }
+
+
+# --- Parameter generators: values are chosen so answers stay exact ---
+
+def _train_pole(rng):
+    speed = 18 * rng.randint(2, 8)
+    seconds = rng.randint(5, 20)
+    return {'length': speed * 5 // 18 * seconds, 'seconds': seconds}
+
+
+def _train_platform(rng):
+    speed = 18 * rng.randint(2, 6)
+    seconds = rng.randint(15, 40)
+    total = speed * 5 // 18 * seconds
+    return {'length': rng.randint(total // 3, total // 2), 'speed': speed, 'seconds': seconds}
+
+
+def _trains_opposite(rng):
+    u, v = 9 * rng.randint(4, 10), 9 * rng.randint(3, 8)
+    if (u + v) % 18:
+        v += 9
+    total = (u + v) * 5 // 18 * rng.randint(6, 15)
+    a = rng.randint(total * 2 // 5, total * 3 // 5)
+    return {'a': a, 'b': total - a, 'u': u, 'v': v}
+
+
+def _trains_same(rng):
+    v = 9 * rng.randint(3, 8)
+    u = v + 18 * rng.randint(1, 3)
+    total = (u - v) * 5 // 18 * rng.randint(15, 40)
+    a = rng.randint(total * 2 // 5, total * 3 // 5)
+    return {'a': a, 'b': total - a, 'u': u, 'v': v}
+
+
+def _two_rates(rng, low=2, high=15):
+    a, b = rng.sample(range(low, high + 1), 2)
+    return {'a': min(a, b), 'b': max(a, b)}
+
+
+def _three_pipes(rng):
+    a, b, c = rng.sample(range(2, 13), 3)
+    # Keep the net rate positive and the answer within a sensible number of hours
+    if Fraction(1, a) + Fraction(1, b) - Fraction(1, c) < Fraction(1, 2 * max(a, b)):
+        return None
+    return {'a': a, 'b': b, 'c': c}
+
+
+def _profit(rng):
+    cost = 20 * rng.randint(5, 50)
+    return {'cost': cost, 'price': cost * (100 + 5 * rng.randint(1, 10)) // 100}
+
+
+def _loss(rng):
+    cost = 20 * rng.randint(5, 50)
+    return {'cost': cost, 'price': cost * (100 - 5 * rng.randint(1, 8)) // 100}
+
+
+def _markup(rng):
+    markup = 5 * rng.randint(4, 10)
+    return {'markup': markup, 'discount': 5 * rng.randint(1, markup // 10)}
+
+
+def _cost_equals_sale(rng):
+    m = rng.randint(5, 20)
+    return {'n': m + rng.randint(1, m // 2), 'm': m}
+
+
+def _simple_interest(rng):
+    return {'principal': 500 * rng.randint(2, 40), 'rate': rng.randint(2, 15), 'years': rng.randint(1, 8)}
+
+
+def _interest_rate(rng):
+    principal, rate, years = 100 * rng.randint(10, 200), rng.randint(2, 15), rng.randint(2, 8)
+    return {'principal': principal, 'amount': principal + principal * rate * years // 100, 'years': years}
+
+
+def _interest_multiple(rng):
+    k = rng.randint(2, 4)
+    return {'k': k, 'years': rng.randint(2, 12), 'j': rng.randint(k + 1, k + 4)}
+
+
+def _workers(rng):
+    workers, days = rng.randint(4, 30), rng.randint(6, 40)
+    divisors = [d for d in range(2, workers * days) if workers * days % d == 0 and d != days and 2 <= d <= 60]
+    return {'workers': workers, 'days': days, 'target': rng.choice(divisors)} if divisors else None
+
+
+def _work_leave(rng):
+    a, b = rng.sample(range(8, 31), 2)
+    days = rng.randint(2, 6)
+    if days * (Fraction(1, a) + Fraction(1, b)) >= 1:
+        return None
+    return {'a': a, 'b': b, 'days': days}
+
+
+def _series_arithmetic(rng):
+    start, step = rng.randint(1, 30), rng.randint(2, 15)
+    return {'terms': [start + step * i for i in range(5)]}
+
+
+def _series_geometric(rng):
+    start, ratio = rng.randint(1, 6), rng.randint(2, 4)
+    return {'terms': [start * ratio ** i for i in range(5)]}
+
+
+def _series_quadratic(rng):
+    first, offset = rng.randint(1, 8), rng.randint(-2, 10)
+    if rng.random() < 0.5:
+        return {'terms': [n * n + offset for n in range(first, first + 5)]}
+    return {'terms': [n * (n + 1) + offset for n in range(first, first + 5)]}
+
+
+def _series_hard(rng):
+    if rng.random() < 0.5:
+        a, b = rng.randint(1, 9), rng.randint(1, 9)
+        terms = [a, b]
+        while len(terms) < 6:
+            terms.append(terms[-1] + terms[-2])
+        return {'terms': terms}
+    first, offset = rng.randint(1, 5), rng.randint(-1, 5)
+    return {'terms': [n ** 3 + offset for n in range(first, first + 5)]}
+
+
+def _clock_quarter(rng):
+    return {'hour': rng.randint(1, 12), 'minute': 15 * rng.randint(0, 3)}
+
+
+def _clock(rng):
+    return {'hour': rng.randint(1, 12), 'minute': rng.randint(1, 59)}
+
+
+# --- Solvers: compute the answer from the parameters in the question text ---
+
+def _next_in_series(terms: list) -> Optional[int]:
+    """Next term for arithmetic, geometric, Fibonacci-like, quadratic and cubic series"""
+    def differences(values):
+        return [b - a for a, b in zip(values, values[1:])]
+    first = differences(terms)
+    if len(set(first)) == 1:
+        return terms[-1] + first[0]
+    if 0 not in terms:
+        ratios = {Fraction(b, a) for a, b in zip(terms, terms[1:])}
+        if len(ratios) == 1:
+            value = terms[-1] * ratios.pop()
+            return int(value) if value.denominator == 1 else None
+    if len(terms) >= 4 and all(terms[i] == terms[i - 1] + terms[i - 2] for i in range(2, len(terms))):
+        return terms[-1] + terms[-2]
+    second = differences(first)
+    if len(set(second)) == 1:
+        return terms[-1] + first[-1] + second[0]
+    third = differences(second)
+    if len(third) >= 2 and len(set(third)) == 1:
+        return terms[-1] + first[-1] + second[-1] + third[0]
+    return None
+
+
+def _series_answer(values):
+    value = _next_in_series(values['terms'])
+    return None if value is None else _numeric(value)
+
+
+def _clock_answer(values):
+    angle = abs(Fraction(30 * (values['hour'] % 12)) - Fraction(11, 2) * values['minute'])
+    return _numeric(min(angle, 360 - angle), 'degrees')
+
+
+_TRAIN_HINTS = ("Convert km/hr to m/s by multiplying by 5/18", "Distance covered = total length")
+_PIPE_HINTS = ("Add the work done per hour", "Emptying pipes count as negative work")
+_PROFIT_HINTS = ("Profit % = profit / cost price x 100",)
+_INTEREST_HINTS = ("SI = P x R x T / 100",)
+_WORK_HINTS = ("Add the fractions of work done per day",)
+_SERIES_HINTS = ("Look at the differences between terms", "Check for ratios or squares")
+_CLOCK_HINTS = ("The hour hand moves 0.5 degrees per minute", "The minute hand moves 6 degrees per minute")
+
+TEMPLATES = (
+    _Template('trains', 'entry', "A train {length}m long passes a pole in {seconds} seconds. What is its speed in km/hr?",
+              _train_pole, lambda v: _numeric(Fraction(v['length'], v['seconds']) * Fraction(18, 5), 'km/hr'), _TRAIN_HINTS),
+    _Template('trains', 'mid', "A train {length}m long running at {speed} km/hr crosses a platform in {seconds} seconds. What is the length of the platform in meters?",
+              _train_platform, lambda v: _numeric(Fraction(v['speed'] * 5, 18) * v['seconds'] - v['length'], 'm'), _TRAIN_HINTS),
+    _Template('trains', 'mid', "Two trains {a}m and {b}m long are running in opposite directions at {u} km/hr and {v} km/hr. In how many seconds will they cross each other?",
+              _trains_opposite, lambda v: _numeric((v['a'] + v['b']) / Fraction((v['u'] + v['v']) * 5, 18), 'seconds'), _TRAIN_HINTS),
+    _Template('trains', 'senior', "Two trains {a}m and {b}m long are running in the same direction at {u} km/hr and {v} km/hr. In how many seconds will the faster train pass the slower one?",
+              _trains_same, lambda v: _numeric((v['a'] + v['b']) / Fraction((v['u'] - v['v']) * 5, 18), 'seconds'), _TRAIN_HINTS),
+    _Template('pipes-cisterns', 'entry', "Pipe A can fill a tank in {a} hours and pipe B can fill it in {b} hours. If both pipes are opened together, in how many hours will the tank be filled?",
+              _two_rates, lambda v: _numeric(1 / (Fraction(1, v['a']) + Fraction(1, v['b'])), 'hours'), _PIPE_HINTS),
+    _Template('pipes-cisterns', 'mid', "A pipe can fill a cistern in {a} hours and another pipe can empty it in {b} hours. If both are opened together, in how many hours will the cistern be filled?",
+              _two_rates, lambda v: _numeric(1 / (Fraction(1, v['a']) - Fraction(1, v['b'])), 'hours'), _PIPE_HINTS),
+    _Template('pipes-cisterns', 'senior', "Pipes A and B can fill a tank in {a} and {b} hours respectively, and pipe C can empty it in {c} hours. If all three are opened together, in how many hours will the tank be filled?",
+              _three_pipes, lambda v: _numeric(1 / (Fraction(1, v['a']) + Fraction(1, v['b']) - Fraction(1, v['c'])), 'hours'), _PIPE_HINTS),
+    _Template('profit-loss', 'entry', "A shopkeeper buys an article for ₹{cost} and sells it for ₹{price}. What is his profit percentage?",
+              _profit, lambda v: _numeric(Fraction(v['price'] - v['cost'], v['cost']) * 100, '%'), _PROFIT_HINTS),
+    _Template('profit-loss', 'entry', "A shopkeeper buys an article for ₹{cost} and sells it for ₹{price}. What is his loss percentage?",
+              _loss, lambda v: _numeric(Fraction(v['cost'] - v['price'], v['cost']) * 100, '%'), _PROFIT_HINTS),
+    _Template('profit-loss', 'mid', "If the cost price of {n} articles equals the selling price of {m} articles, what is the profit percentage?",
+              _cost_equals_sale, lambda v: _numeric(Fraction(v['n'] - v['m'], v['m']) * 100, '%'), _PROFIT_HINTS),
+    _Template('profit-loss', 'senior', "A merchant marks his goods {markup}% above the cost price and allows a discount of {discount}%. What is his profit percentage?",
+              _markup, lambda v: _numeric((Fraction(100 + v['markup'], 100) * Fraction(100 - v['discount'], 100) - 1) * 100, '%'), _PROFIT_HINTS),
+    _Template('simple-interest', 'entry', "What is the simple interest on ₹{principal} at {rate}% per annum for {years} years?",
+              _simple_interest, lambda v: _numeric(Fraction(v['principal'] * v['rate'] * v['years'], 100), money=True), _INTEREST_HINTS),
+    _Template('simple-interest', 'mid', "A sum of ₹{principal} amounts to ₹{amount} in {years} years at simple interest. What is the rate of interest per annum?",
+              _interest_rate, lambda v: _numeric(Fraction((v['amount'] - v['principal']) * 100, v['principal'] * v['years']), '%'), _INTEREST_HINTS),
+    _Template('simple-interest', 'mid', "A sum of money becomes {k} times itself in {years} years at simple interest. In how many years will it become {j} times itself?",
+              _interest_multiple, lambda v: _numeric(Fraction(v['years'] * (v['j'] - 1), v['k'] - 1), 'years'), _INTEREST_HINTS),
+    _Template('time-work', 'entry', "A can complete a piece of work in {a} days and B can complete it in {b} days. In how many days can they complete it working together?",
+              lambda rng: _two_rates(rng, 4, 30), lambda v: _numeric(1 / (Fraction(1, v['a']) + Fraction(1, v['b'])), 'days'), _WORK_HINTS),
+    _Template('time-work', 'entry', "If {workers} workers can complete a job in {days} days, how many workers are needed to complete it in {target} days?",
+              _workers, lambda v: _numeric(Fraction(v['workers'] * v['days'], v['target']), 'workers'), _WORK_HINTS),
+    _Template('time-work', 'senior', "A can do a work in {a} days and B in {b} days. They work together for {days} days, then A leaves. In how many more days will B finish the remaining work?",
+              _work_leave, lambda v: _numeric((1 - v['days'] * (Fraction(1, v['a']) + Fraction(1, v['b']))) * v['b'], 'days'), _WORK_HINTS),
+    _Template('number-series', 'entry', "Find the next number in the series: {terms}, ?", _series_arithmetic, _series_answer, _SERIES_HINTS),
+    _Template('number-series', 'mid', "Find the next number in the series: {terms}, ?", _series_geometric, _series_answer, _SERIES_HINTS),
+    _Template('number-series', 'mid', "Find the next number in the series: {terms}, ?", _series_quadratic, _series_answer, _SERIES_HINTS),
+    _Template('number-series', 'senior', "Find the next number in the series: {terms}, ?", _series_hard, _series_answer, _SERIES_HINTS),
+    _Template('clocks', 'entry', "What is the angle between the hour and minute hands of a clock at {hour}:{minute:02d}?", _clock_quarter, _clock_answer, _CLOCK_HINTS),
+    _Template('clocks', 'mid', "What is the angle between the hour and minute hands of a clock at {hour}:{minute:02d}?", _clock, _clock_answer, _CLOCK_HINTS),
+)
+FAMILIES = tuple(sorted({template.family for template in TEMPLATES}))
+
+
+def answer_for(question: str) -> Optional[dict]:
+    """Canonical answer of a generated question, recomputed from its text; None for any other text"""
+    for template in TEMPLATES:
+        values = template.parse(question or '')
+        if values is not None:
+            try:
+                return template.solve(values)
+            except ZeroDivisionError:
+                return None
+    return None
+
+
+def generate_aptitude_question(difficulty: str = None, family: str = None, rng: random.Random = None) -> Optional[dict]:
+    """One generated question (bank record shape, with its answer) for the difficulty and family"""
+    rng = rng or random
+    templates = [t for t in TEMPLATES if (not family or t.family == family) and (not difficulty or t.difficulty == difficulty)]
+    templates = templates or [t for t in TEMPLATES if not family or t.family == family]
+    for _ in range(MAX_ATTEMPTS_PER_QUESTION):
+        question = rng.choice(templates).generate(rng)
+        if question:
+            return question
+    return None
+
+
+def generate_aptitude_questions(count: int, difficulty: str = None, exclude=(), rng: random.Random = None) -> list:
+    """
+    count distinct question texts, cycling through the families so a set
+    covers as many question types as possible
+    """
+    rng = rng or random
+    families = list(FAMILIES)
+    rng.shuffle(families)
+    seen = {' '.join(text.lower().split()) for text in exclude if text}
+    questions = []
+    attempts = 0
+    while len(questions) < count and attempts < count * MAX_ATTEMPTS_PER_QUESTION:
+        question = generate_aptitude_question(difficulty, families[attempts % len(families)], rng)
+        attempts += 1
+        key = ' '.join(question['question'].lower().split()) if question else None
+        if key and key not in seen:
+            seen.add(key)
+            questions.append(question['question'])
+    return questions
@@ -0,0 +1,240 @@
+import re
+from fractions import Fraction
+from typing import Optional
+from app.services.aptitude_generator import answer_for
+from app.services.question_bank import lookup_question
+
+# Deterministic grading of aptitude questions that carry a canonical answer in
+# the bank ("answer" field), one of:
+#   {"value": 36, "tolerance": 0.5, "unit": "km/hr"}   numeric, absolute tolerance
+#   {"option": "b", "text": "Plenty"}                  multiple choice
+#   {"accept": ["statue"], "reject": ["painting"]}     short text answer
+# Generated aptitude questions carry no bank record; their answer is
+# recomputed from the question text by the generator.
+DEFAULT_RELATIVE_TOLERANCE = 0.005
+CORRECT_SCORE = 85
+INCORRECT_SCORE = 15
+REASONING_BONUS = 10  # For answers that show their working
+REASONING_WORDS = 8
+SHORT_ANSWER_WORDS = 6
+
+_NUMBER_RE = re.compile(
+    r"(?<![\w.])(?P<sign>-)?(?:"
+    r"(?P<whole>\d+)\s+(?P<num>\d+)/(?P<den>\d+)"  # mixed number: 10 2/3
+    r"|(?P<fnum>\d+)\s*/\s*(?P<fden>\d+)"  # fraction: 7/8
+    r"|(?P<dec>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"  # 12,000 / 36 / 7.5
+    r")(?P<percent>\s*(?:%|percent\b))?"
+)
+_CUE_RE = re.compile(r"\b(?:answer|result|final(?:ly)?)\b", re.IGNORECASE)
+_OPTION_RE = re.compile(r"\(([a-e])\)\s*([^()]+?)(?=\s*\([a-e]\)|$)", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_PAREN_OPTION_RE = re.compile(r"\(([a-e])\)", re.IGNORECASE)
+# A letter-only token: "b", "b)", "(b)", "b. ...", "option b", but not "A ..." or "E.g."
+_LEADING_LETTER_RE = re.compile(r"\s*(?:option\s+)?\(?([a-e])(?:\)|[.:,-](?![a-z])|\s*$)", re.IGNORECASE)
+
+# Words in the few before a mention that make it a negated ("not a building")
+# or a stated ("so yes") answer; scanning back stops at a clause break
+CONTEXT_WORDS = 3
+NEGATIONS = frozenset(('not', 'no', 'never', 'nor', 'neither', 'cannot', 't'))
+CUES = frozenset(('answer', 'so', 'therefore', 'hence', 'thus', 'final', 'finally'))
+CLAUSE_BREAKS = frozenset(('but', 'and', 'then', 'he', 'she', 'it', 'they')) | CUES
+
+_UNITS = {word: n for n, word in enumerate(
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen "
+    "fifteen sixteen seventeen eighteen nineteen".split())}
+_TENS = {word: 10 * n for n, word in enumerate("_ _ twenty thirty forty fifty sixty seventy eighty ninety".split()) if n >= 2}
+_SPOKEN_RE = re.compile(
+    r"\b(?:(?P<tens>" + '|'.join(_TENS) + r")(?:[\s-](?P<units>" + '|'.join(list(_UNITS)[1:10]) + r"))?"
+    r"|(?P<unit>" + '|'.join(sorted(_UNITS, key=len, reverse=True)) + r"))\b",
+    re.IGNORECASE
+)
+
+
+def _words(text: str) -> str:
+    return ' '.join(_WORD_RE.findall((text or '').lower()))
+
+
+def _spoken_numbers(text: str) -> str:
+    """Replace spelled-out numbers below 100 (as speech-to-text often leaves them) with digits"""
+    def replace(match):
+        if match.group('tens'):
+            return str(_TENS[match.group('tens').lower()] + _UNITS.get((match.group('units') or '').lower(), 0))
+        return str(_UNITS[match.group('unit').lower()])
+    return _SPOKEN_RE.sub(replace, text)
+
+
+def extract_numbers(text: str) -> list:
+    """[(value, is_percent, offset)] for every number in the text"""
+    numbers = []
+    for match in _NUMBER_RE.finditer(_spoken_numbers(text or '')):
+        if match.group('whole'):
+            value = int(match.group('whole')) + Fraction(int(match.group('num')), int(match.group('den')) or 1)
+        elif match.group('fnum'):
+            if not int(match.group('fden')):
+                continue
+            value = Fraction(int(match.group('fnum')), int(match.group('fden')))
+        else:
+            value = float(match.group('dec').replace(',', ''))
+        value = float(value) * (-1 if match.group('sign') else 1)
+        numbers.append((value, bool(match.group('percent')), match.start()))
+    return numbers
+
+
+def _numeric_match(spec: dict, value: float, is_percent: bool) -> bool:
+    expected = float(spec['value'])
+    tolerance = spec.get('tolerance')
+    if tolerance is None:
+        tolerance = abs(expected) * DEFAULT_RELATIVE_TOLERANCE
+    candidates = (value, value / 100) if is_percent else (value,)
+    return any(abs(candidate - expected) <= tolerance + 1e-9 for candidate in candidates)
+
+
+def _grade_numeric(spec: dict, answer: str) -> Optional[bool]:
+    numbers = extract_numbers(answer)
+    if not numbers:
+        return None
+    # The stated answer: the last number right after "answer"/"result", else the last number
+    cues = [match.end() for match in _CUE_RE.finditer(_spoken_numbers(answer))]
+    cued = [n for n in numbers if cues and any(0 <= n[2] - cue <= 25 for cue in cues)]
+    value, is_percent, _ = (cued or numbers)[-1]
+    if _numeric_match(spec, value, is_percent):
+        return True
+    if any(_numeric_match(spec, v, p) for v, p, _ in numbers):
+        return None  # The right value appears in the working but is not clearly the answer
+    return False
+
+
+def _context(text: str, start: int) -> tuple:
+    """(negated, cued) for a mention starting at offset start of a _words() text"""
+    for word in reversed(text[:start].split()[-CONTEXT_WORDS:]):
+        if word in NEGATIONS:
+            return True, False
+        if word in CUES:
+            return False, True
+        if word in CLAUSE_BREAKS:
+            break
+    return False, False
+
+
+def _mentions(text: str, phrases: list, verdict) -> list:
+    """[(offset, verdict, negated, cued)] for every occurrence of the phrases"""
+    mentions = []
+    for phrase in phrases:
+        words = _words(phrase)
+        if not words:
+            continue
+        for match in re.finditer(r"\b" + re.escape(words) + r"\b", text):
+            mentions.append((match.start(), verdict, *_context(text, match.start())))
+    return mentions
+
+
+def _decide(mentions: list):
+    """
+    Verdict of the stated answer, ignoring negated mentions: the last cued
+    one ("so yes"), else a leading one ("Yes, ..."), else the last one, since
+    reasoning tends to name the alternatives before the conclusion.
+    """
+    kept = sorted(m for m in mentions if not m[2])
+    if not kept:
+        return None
+    cued = [m for m in kept if m[3]]
+    if cued:
+        return cued[-1][1]
+    return kept[0][1] if kept[0][0] == 0 else kept[-1][1]
+
+
+def _grade_text(spec: dict, answer: str) -> Optional[bool]:
+    """The stated accepted or rejected phrase decides; short answers with neither are wrong"""
+    text = _words(answer)
+    mentions = _mentions(text, spec.get('accept') or [], True) + _mentions(text, spec.get('reject') or [], False)
+    if mentions:
+        return _decide(mentions)
+    return False if len(text.split()) <= SHORT_ANSWER_WORDS else None
+
+
+def _grade_option(spec: dict, answer: str, question: str) -> Optional[bool]:
+    """The stated option, named by letter ("b", "(b)", "option b") or by its text, decides"""
+    options = {letter.lower(): _words(text) for letter, text in _OPTION_RE.findall(question)}
+    options = options or {spec['option'].lower(): _words(spec.get('text', ''))}
+    # A bare letter only counts on its own ("b", "b) ..."), not as the article "A"
+    leading = _LEADING_LETTER_RE.match(answer or '')
+    text = _words(_PAREN_OPTION_RE.sub(r" option \1 ", answer or ''))
+    mentions = [(0, leading.group(1).lower(), False, False)] if leading else []
+    for letter, option_text in options.items():
+        mentions += _mentions(text, [f"option {letter}"] + ([option_text] if option_text else []), letter)
+    letter = _decide(mentions)
+    return None if letter is None else letter == spec['option'].lower()
+
+
+def expected_display(spec: dict) -> str:
+    if 'value' in spec:
+        value = spec.get('display') or f"{float(spec['value']):g}"
+        unit = spec.get('unit') or ''
+        return f"{value}{unit}" if unit in ('', '%') else f"{value} {unit}"
+    if 'option' in spec:
+        return f"({spec['option']}) {spec.get('text', '')}".strip()
+    return spec.get('display') or (spec.get('accept') or [''])[0]
+
+
+def validate_answer_spec(spec) -> Optional[str]:
+    """Error message for a malformed canonical answer, None when it is valid"""
+    if not isinstance(spec, dict):
+        return "'answer' must be an object"
+    if 'value' in spec:
+        try:
+            float(spec['value'])
+            float(spec.get('tolerance') or 0)
+        except (TypeError, ValueError):
+            return "'answer.value' and 'answer.tolerance' must be numbers"
+        return None
+    if 'option' in spec:
+        return None if str(spec['option']).lower() in 'abcde' and len(str(spec['option'])) == 1 else "'answer.option' must be a letter a-e"
+    if isinstance(spec.get('accept'), list) and spec['accept'] and all(isinstance(a, str) for a in spec['accept']):
+        return None
+    return "'answer' needs value, option or a non-empty accept list"
+
+
+def grade(spec: dict, answer: str, question: str = '') -> Optional[bool]:
+    """True/False when the answer can be graded deterministically, None when it needs a full evaluation"""
+    if 'value' in spec:
+        return _grade_numeric(spec, answer)
+    if 'option' in spec:
+        return _grade_option(spec, answer, question)
+    return _grade_text(spec, answer)
+
+
+def grade_answer(question: str, answer: str, category: str = 'aptitude') -> Optional[dict]:
+    """
+    Evaluation for a bank or generated question with a canonical answer, in the shape the
+    LLM evaluation returns; None when the question has no canonical answer or
+    the answer cannot be graded unambiguously.
+    """
+    bank_question = lookup_question(category, question)
+    spec = bank_question.get('answer') if bank_question else None
+    if not spec and category == 'aptitude':
+        spec = answer_for(question)
+    if not spec:
+        return None
+    verdict = grade(spec, answer or '', question)
+    if verdict is None:
+        return None
+
+    expected = expected_display(spec)
+    explained = len((answer or '').split()) >= REASONING_WORDS
+    if verdict:
+        return {
+            "score": CORRECT_SCORE + (REASONING_BONUS if explained else 0),
+            "feedback": f"Correct, the answer is {expected}." + ("" if explained else " Walk through your working too, interviewers want to see the method."),
+            "strengths": ["Correct final answer"] + (["Showed the working"] if explained else []),
+            "improvements": [] if explained else ["Explain the steps that lead to the answer"],
+            "autoGraded": True,
+            "expectedAnswer": expected
+        }
+    return {
+        "score": INCORRECT_SCORE + (REASONING_BONUS if explained else 0),
+        "feedback": f"Not quite, the expected answer is {expected}. Recheck each step of the calculation.",
+        "strengths": ["Showed the working"] if explained else [],
+        "improvements": ["Double-check the calculation before giving the final answer"],
+        "autoGraded": True,
+        "expectedAnswer": expected
+    }
@@ -1,10 +1,15 @@
+import asyncio
 import subprocess
 import tempfile
 import os
 import json
-from typing import Dict, Any
+import signal
+from typing import Dict, Any, List, Optional, Tuple
 import time
 
+READ_CHUNK_SIZE = 65536
+KILL_WAIT_SECONDS = 2  # How long to wait for a killed process to be reaped
+
 class CodeExecutor:
     """Service to execute code in various programming languages safely"""
     
@@ -101,6 +106,30 @@ class CodeExecutor:
         }
     }
     
+    # Installation hints for missing compilers and interpreters
+    INSTALL_GUIDE = {
+        'python': 'Install from https://python.org',
+        'node': 'Install from https://nodejs.org',
+        'ts-node': 'Run: npm install -g ts-node typescript',
+        'javac': 'Install JDK from https://www.oracle.com/java/technologies/downloads/',
+        'java': 'Install JDK from https://www.oracle.com/java/technologies/downloads/',
+        'g++': 'Install MinGW from https://www.mingw-w64.org/',
+        'gcc': 'Install MinGW from https://www.mingw-w64.org/',
+        'go': 'Install from https://go.dev/dl/ or run: winget install GoLang.Go',
+        'rustc': 'Install from https://rustup.rs/',
+        'ruby': 'Install from https://www.ruby-lang.org/ or run: winget install RubyInstallerTeam.Ruby',
+        'php': 'Install from https://www.php.net/ or run: winget install PHP.PHP',
+        'swift': 'Install from https://www.swift.org/download/',
+        'kotlinc': 'Install from https://kotlinlang.org/docs/command-line.html',
+        'kotlin': 'Install from https://kotlinlang.org/docs/command-line.html',
+        'Rscript': 'Install R from https://cran.r-project.org/ or run: winget install RProject.R',
+        'perl': 'Install from https://www.perl.org/ or run: winget install StrawberryPerl.StrawberryPerl',
+        'bash': 'Install Git Bash from https://git-scm.com/',
+        'csc': 'Install .NET SDK from https://dotnet.microsoft.com/ or run: winget install Microsoft.DotNet.SDK.8',
+        'scala': 'Install from https://www.scala-lang.org/download/',
+        'scalac': 'Install from https://www.scala-lang.org/download/'
+    }
+    
     def __init__(self):
         """Initialize and check if we're in a serverless environment"""
         self.is_serverless = os.getenv('VERCEL', '') or os.getenv('AWS_LAMBDA_FUNCTION_NAME', '')
@@ -109,18 +138,8 @@ class CodeExecutor:
         if self.is_serverless:
             print("WARNING: Code execution disabled in serverless environment")
     
-    def execute(self, code: str, language: str, input_data: str = "") -> Dict[str, Any]:
-        """
-        Execute code in specified language
-        
-        Args:
-            code: Source code to execute
-            language: Programming language (17 languages supported)
-            input_data: Input to provide to the program
-            
-        Returns:
-            Dict with output, error, execution_time, and status
-        """
+    def _check(self, language: str) -> Optional[Dict[str, Any]]:
+        """Error result when code cannot be executed here, None otherwise"""
         # Check if in serverless environment
         if self.is_serverless:
             return {
@@ -139,17 +158,31 @@ class CodeExecutor:
                 'error': f'Unsupported language: {language}. Available: {available_langs}',
                 'execution_time': 0
             }
+        return None
+    
+    def execute(self, code: str, language: str, input_data: str = "") -> Dict[str, Any]:
+        """
+        Execute code in specified language, blocking until it finishes.
+        Async callers should use execute_async.
+        
+        Args:
+            code: Source code to execute
+            language: Programming language (17 languages supported)
+            input_data: Input to provide to the program
+            
+        Returns:
+            Dict with output, error, execution_time, and status
+        """
+        error = self._check(language)
+        if error:
+            return error
         
         lang_config = self.LANGUAGES[language]
         
         try:
             # Create temporary directory for execution
             with tempfile.TemporaryDirectory() as temp_dir:
-                # Create source file
-                file_path = os.path.join(temp_dir, f'main{lang_config["extension"]}')
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(code)
-                
+                file_path = self._write_source(temp_dir, code, lang_config)
                 start_time = time.time()
                 
                 # Compile if needed
@@ -174,35 +207,179 @@ class CodeExecutor:
                 'execution_time': 0
             }
     
+    async def execute_async(self, code: str, language: str, input_data: str = "") -> Dict[str, Any]:
+        """
+        Execute code without blocking the event loop.
+        
+        Same arguments and result as execute, but the compiler and the program
+        run as asyncio subprocesses whose pipes are read as they produce
+        output, so a worker keeps serving requests while programs run.
+        """
+        error = self._check(language)
+        if error:
+            return error
+        
+        lang_config = self.LANGUAGES[language]
+        
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_path = self._write_source(temp_dir, code, lang_config)
+                start_time = time.time()
+                
+                if lang_config['compile']:
+                    compile_result = await self._compile_async(file_path, temp_dir, lang_config)
+                    if not compile_result['success']:
+                        return compile_result
+                
+                result = await self._run_async(file_path, temp_dir, lang_config, input_data)
+                result['execution_time'] = round(time.time() - start_time, 3)
+                return result
+                
+        except Exception as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': f'Execution error: {str(e)}',
+                'execution_time': 0
+            }
+    
+    def _write_source(self, temp_dir: str, code: str, lang_config: Dict) -> str:
+        """Create the source file and return its path"""
+        file_path = os.path.join(temp_dir, f'main{lang_config["extension"]}')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        return file_path
+    
+    def _compile_command(self, file_path: str, temp_dir: str, lang_config: Dict) -> Optional[List[str]]:
+        """Compiler command line, None for an unknown compiler"""
+        if lang_config['compile'] in ['gcc', 'g++']:
+            # C/C++ compilation
+            output_file = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')
+            return [lang_config['compile'], file_path, '-o', output_file]
+        elif lang_config['compile'] == 'javac':
+            # Java compilation
+            return ['javac', file_path]
+        elif lang_config['compile'] == 'rustc':
+            # Rust compilation
+            output_file = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')
+            return ['rustc', file_path, '-o', output_file]
+        elif lang_config['compile'] == 'kotlinc':
+            # Kotlin compilation
+            jar_file = os.path.join(temp_dir, 'main.jar')
+            compile_cmd = ['kotlinc', file_path]
+            if 'compileArgs' in lang_config:
+                compile_cmd.extend(lang_config['compileArgs'])
+                compile_cmd.append(jar_file)
+            return compile_cmd
+        elif lang_config['compile'] == 'csc':
+            # C# compilation
+            output_file = os.path.join(temp_dir, 'main.exe')
+            return ['csc', f'/out:{output_file}', file_path, '/nologo']
+        elif lang_config['compile'] == 'scalac':
+            # Scala compilation
+            return ['scalac', file_path]
+        return None
+    
+    def _run_command(self, file_path: str, temp_dir: str, lang_config: Dict) -> List[str]:
+        """Command line that runs the compiled/interpreted code"""
+        if lang_config['extension'] == '.py':
+            return ['python', file_path]
+        elif lang_config['extension'] == '.js':
+            return ['node', file_path]
+        elif lang_config['extension'] == '.ts':
+            return ['ts-node', file_path]
+        elif lang_config['extension'] == '.java':
+            # Java requires class name
+            return ['java', '-cp', temp_dir, 'Main']
+        elif lang_config['extension'] == '.go':
+            return ['go', 'run', file_path]
+        elif lang_config['extension'] == '.rb':
+            return ['ruby', file_path]
+        elif lang_config['extension'] == '.php':
+            return ['php', file_path]
+        elif lang_config['extension'] == '.swift':
+            return ['swift', file_path]
+        elif lang_config['extension'] == '.r':
+            return ['Rscript', file_path]
+        elif lang_config['extension'] == '.pl':
+            return ['perl', file_path]
+        elif lang_config['extension'] == '.sh':
+            return ['bash', file_path]
+        elif lang_config['extension'] == '.scala':
+            # Run compiled Scala class
+            class_name = os.path.splitext(os.path.basename(file_path))[0]
+            return ['scala', '-cp', temp_dir, class_name]
+        elif lang_config['compile'] in ['gcc', 'g++', 'rustc']:
+            # Run compiled C/C++/Rust executable
+            return [os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')]
+        elif lang_config['compile'] == 'kotlinc':
+            # Run compiled Kotlin jar
+            return ['kotlin', os.path.join(temp_dir, 'main.jar')]
+        elif lang_config['compile'] == 'csc':
+            # Run compiled C# executable
+            return [os.path.join(temp_dir, 'main.exe')]
+        return [lang_config['command'], file_path]
+    
+    def _compile_result(self, returncode: int, stderr: str) -> Dict[str, Any]:
+        if returncode != 0:
+            return {
+                'success': False,
+                'output': '',
+                'error': f'Compilation error:\n{stderr}',
+                'execution_time': 0
+            }
+        return {'success': True}
+    
+    def _run_result(self, returncode: int, stdout: str, stderr: str) -> Dict[str, Any]:
+        # Truncate output if too large
+        output = stdout
+        if len(output) > self.max_output_size:
+            output = output[:self.max_output_size] + '\n... (output truncated)'
+        
+        error = stderr
+        if len(error) > self.max_output_size:
+            error = error[:self.max_output_size] + '\n... (error truncated)'
+        
+        return {
+            'success': returncode == 0,
+            'output': output,
+            'error': error if returncode != 0 else '',
+            'exit_code': returncode
+        }
+    
+    def _compile_timeout(self) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'output': '',
+            'error': 'Compilation timeout',
+            'execution_time': 0
+        }
+    
+    def _run_timeout(self) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'output': '',
+            'error': f'Execution timeout (>{self.timeout}s). Your code took too long to execute.',
+            'execution_time': self.timeout
+        }
+    
+    def _not_installed(self, lang_config: Dict) -> Dict[str, Any]:
+        # Provide helpful installation instructions
+        compiler_cmd = lang_config.get('compile') or lang_config.get('command', 'unknown')
+        install_msg = self.INSTALL_GUIDE.get(compiler_cmd, 'Check language installation documentation')
+        
+        return {
+            'success': False,
+            'output': '',
+            'error': f'❌ {compiler_cmd} is not installed or not in PATH.\n\n📥 Installation: {install_msg}\n\nAfter installation, restart the backend server.',
+            'execution_time': 0
+        }
+    
     def _compile(self, file_path: str, temp_dir: str, lang_config: Dict) -> Dict[str, Any]:
         """Compile the source code"""
         try:
-            if lang_config['compile'] in ['gcc', 'g++']:
-                # C/C++ compilation
-                output_file = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')
-                compile_cmd = [lang_config['compile'], file_path, '-o', output_file]
-            elif lang_config['compile'] == 'javac':
-                # Java compilation
-                compile_cmd = ['javac', file_path]
-            elif lang_config['compile'] == 'rustc':
-                # Rust compilation
-                output_file = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')
-                compile_cmd = ['rustc', file_path, '-o', output_file]
-            elif lang_config['compile'] == 'kotlinc':
-                # Kotlin compilation
-                jar_file = os.path.join(temp_dir, 'main.jar')
-                compile_cmd = ['kotlinc', file_path]
-                if 'compileArgs' in lang_config:
-                    compile_cmd.extend(lang_config['compileArgs'])
-                    compile_cmd.append(jar_file)
-            elif lang_config['compile'] == 'csc':
-                # C# compilation
-                output_file = os.path.join(temp_dir, 'main.exe')
-                compile_cmd = ['csc', f'/out:{output_file}', file_path, '/nologo']
-            elif lang_config['compile'] == 'scalac':
-                # Scala compilation
-                compile_cmd = ['scalac', file_path]
-            else:
+            compile_cmd = self._compile_command(file_path, temp_dir, lang_config)
+            if compile_cmd is None:
                 return {'success': False, 'output': '', 'error': 'Unknown compiler'}
             
             process = subprocess.run(
@@ -212,24 +389,10 @@ class CodeExecutor:
                 timeout=self.timeout,
                 cwd=temp_dir
             )
-            
-            if process.returncode != 0:
-                return {
-                    'success': False,
-                    'output': '',
-                    'error': f'Compilation error:\n{process.stderr}',
-                    'execution_time': 0
-                }
-            
-            return {'success': True}
+            return self._compile_result(process.returncode, process.stderr)
             
         except subprocess.TimeoutExpired:
-            return {
-                'success': False,
-                'output': '',
-                'error': 'Compilation timeout',
-                'execution_time': 0
-            }
+            return self._compile_timeout()
         except Exception as e:
             return {
                 'success': False,
@@ -241,116 +404,61 @@ class CodeExecutor:
     def _run(self, file_path: str, temp_dir: str, lang_config: Dict, input_data: str) -> Dict[str, Any]:
         """Run the compiled/interpreted code"""
         try:
-            # Prepare command based on language
-            if lang_config['extension'] == '.py':
-                cmd = ['python', file_path]
-            elif lang_config['extension'] == '.js':
-                cmd = ['node', file_path]
-            elif lang_config['extension'] == '.ts':
-                cmd = ['ts-node', file_path]
-            elif lang_config['extension'] == '.java':
-                # Java requires class name
-                cmd = ['java', '-cp', temp_dir, 'Main']
-            elif lang_config['extension'] == '.go':
-                cmd = ['go', 'run', file_path]
-            elif lang_config['extension'] == '.rb':
-                cmd = ['ruby', file_path]
-            elif lang_config['extension'] == '.php':
-                cmd = ['php', file_path]
-            elif lang_config['extension'] == '.swift':
-                cmd = ['swift', file_path]
-            elif lang_config['extension'] == '.r':
-                cmd = ['Rscript', file_path]
-            elif lang_config['extension'] == '.pl':
-                cmd = ['perl', file_path]
-            elif lang_config['extension'] == '.sh':
-                cmd = ['bash', file_path]
-            elif lang_config['extension'] == '.scala':
-                # Run compiled Scala class
-                class_name = os.path.splitext(os.path.basename(file_path))[0]
-                cmd = ['scala', '-cp', temp_dir, class_name]
-            elif lang_config['compile'] in ['gcc', 'g++', 'rustc']:
-                # Run compiled C/C++/Rust executable
-                output_file = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main')
-                cmd = [output_file]
-            elif lang_config['compile'] == 'kotlinc':
-                # Run compiled Kotlin jar
-                jar_file = os.path.join(temp_dir, 'main.jar')
-                cmd = ['kotlin', jar_file]
-            elif lang_config['compile'] == 'csc':
-                # Run compiled C# executable
-                output_file = os.path.join(temp_dir, 'main.exe')
-                cmd = [output_file]
-            else:
-                cmd = [lang_config['command'], file_path]
-            
             # Execute with timeout
             process = subprocess.run(
-                cmd,
+                self._run_command(file_path, temp_dir, lang_config),
                 input=input_data,
                 capture_output=True,
                 text=True,
                 timeout=self.timeout,
                 cwd=temp_dir
             )
-            
-            # Truncate output if too large
-            output = process.stdout
-            if len(output) > self.max_output_size:
-                output = output[:self.max_output_size] + '\n... (output truncated)'
-            
-            error = process.stderr
-            if len(error) > self.max_output_size:
-                error = error[:self.max_output_size] + '\n... (error truncated)'
-            
-            return {
-                'success': process.returncode == 0,
-                'output': output,
-                'error': error if process.returncode != 0 else '',
-                'exit_code': process.returncode
-            }
+            return self._run_result(process.returncode, process.stdout, process.stderr)
             
         except subprocess.TimeoutExpired:
+            return self._run_timeout()
+        except FileNotFoundError:
+            return self._not_installed(lang_config)
+        except Exception as e:
             return {
                 'success': False,
                 'output': '',
-                'error': f'Execution timeout (>{self.timeout}s). Your code took too long to execute.',
-                'execution_time': self.timeout
-            }
-        except FileNotFoundError as e:
-            # Provide helpful installation instructions
-            install_guide = {
-                'python': 'Install from https://python.org',
-                'node': 'Install from https://nodejs.org',
-                'ts-node': 'Run: npm install -g ts-node typescript',
-                'javac': 'Install JDK from https://www.oracle.com/java/technologies/downloads/',
-                'java': 'Install JDK from https://www.oracle.com/java/technologies/downloads/',
-                'g++': 'Install MinGW from https://www.mingw-w64.org/',
-                'gcc': 'Install MinGW from https://www.mingw-w64.org/',
-                'go': 'Install from https://go.dev/dl/ or run: winget install GoLang.Go',
-                'rustc': 'Install from https://rustup.rs/',
-                'ruby': 'Install from https://www.ruby-lang.org/ or run: winget install RubyInstallerTeam.Ruby',
-                'php': 'Install from https://www.php.net/ or run: winget install PHP.PHP',
-                'swift': 'Install from https://www.swift.org/download/',
-                'kotlinc': 'Install from https://kotlinlang.org/docs/command-line.html',
-                'kotlin': 'Install from https://kotlinlang.org/docs/command-line.html',
-                'Rscript': 'Install R from https://cran.r-project.org/ or run: winget install RProject.R',
-                'perl': 'Install from https://www.perl.org/ or run: winget install StrawberryPerl.StrawberryPerl',
-                'bash': 'Install Git Bash from https://git-scm.com/',
-                'csc': 'Install .NET SDK from https://dotnet.microsoft.com/ or run: winget install Microsoft.DotNet.SDK.8',
-                'scala': 'Install from https://www.scala-lang.org/download/',
-                'scalac': 'Install from https://www.scala-lang.org/download/'
+                'error': f'Runtime error: {str(e)}',
+                'execution_time': 0
             }
+    
+    async def _compile_async(self, file_path: str, temp_dir: str, lang_config: Dict) -> Dict[str, Any]:
+        """Compile the source code in an asyncio subprocess"""
+        try:
+            compile_cmd = self._compile_command(file_path, temp_dir, lang_config)
+            if compile_cmd is None:
+                return {'success': False, 'output': '', 'error': 'Unknown compiler'}
             
-            compiler_cmd = lang_config.get('compile') or lang_config.get('command', 'unknown')
-            install_msg = install_guide.get(compiler_cmd, 'Check language installation documentation')
+            returncode, _, stderr = await self._communicate(compile_cmd, temp_dir)
+            return self._compile_result(returncode, stderr)
             
+        except asyncio.TimeoutError:
+            return self._compile_timeout()
+        except Exception as e:
             return {
                 'success': False,
                 'output': '',
-                'error': f'❌ {compiler_cmd} is not installed or not in PATH.\n\n📥 Installation: {install_msg}\n\nAfter installation, restart the backend server.',
+                'error': f'Compilation error: {str(e)}',
                 'execution_time': 0
             }
+    
+    async def _run_async(self, file_path: str, temp_dir: str, lang_config: Dict, input_data: str) -> Dict[str, Any]:
+        """Run the compiled/interpreted code in an asyncio subprocess"""
+        try:
+            returncode, stdout, stderr = await self._communicate(
+                self._run_command(file_path, temp_dir, lang_config), temp_dir, input_data
+            )
+            return self._run_result(returncode, stdout, stderr)
+            
+        except asyncio.TimeoutError:
+            return self._run_timeout()
+        except FileNotFoundError:
+            return self._not_installed(lang_config)
         except Exception as e:
             return {
                 'success': False,
@@ -358,6 +466,77 @@ class CodeExecutor:
                 'error': f'Runtime error: {str(e)}',
                 'execution_time': 0
             }
+    
+    async def _communicate(self, cmd: List[str], cwd: str, input_data: str = None) -> Tuple[int, str, str]:
+        """
+        (exit code, stdout, stderr) of a subprocess, raising asyncio.TimeoutError
+        after self.timeout. The subprocess runs in its own session, and its whole
+        process group is killed when it is done, times out or is cancelled, so
+        background children cannot hold the pipes (and the worker slot) open.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True
+        )
+        try:
+            _, stdout, stderr, returncode = await asyncio.wait_for(
+                asyncio.gather(
+                    self._feed(process.stdin, input_data),
+                    self._read(process.stdout),
+                    self._read(process.stderr),
+                    process.wait()
+                ),
+                timeout=self.timeout
+            )
+            return returncode, stdout, stderr
+        finally:
+            self._kill(process)
+            try:
+                await asyncio.wait_for(process.wait(), timeout=KILL_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                print(f"[CODE] Process {process.pid} was not reaped {KILL_WAIT_SECONDS}s after being killed")
+    
+    def _kill(self, process: asyncio.subprocess.Process):
+        """Kill the process and anything it started (its process group where supported)"""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            elif process.returncode is None:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass  # Everything in the group has already exited
+    
+    async def _feed(self, stdin: Optional[asyncio.StreamWriter], input_data: Optional[str]):
+        if stdin is None:
+            return
+        try:
+            if input_data:
+                stdin.write(input_data.encode('utf-8'))
+                await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The program exited without reading all of its input
+        finally:
+            stdin.close()
+    
+    async def _read(self, stream: asyncio.StreamReader) -> str:
+        """
+        Read a pipe to EOF, keeping only what can be shown: the rest is
+        drained and dropped so a chatty program cannot exhaust memory.
+        """
+        limit = self.max_output_size * 4 + 4  # Bytes for max_output_size UTF-8 characters, plus one
+        chunks, size = [], 0
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            if size < limit:
+                chunks.append(chunk[:limit - size])
+            size += len(chunk)
+        return b''.join(chunks).decode('utf-8', errors='replace')
 
 # Singleton instance
 code_executor = CodeExecutor()
@@ -0,0 +1,139 @@
+import asyncio
+import collections
+import math
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+# Admission control for code execution: at most EXECUTION_WORKERS compilers or
+# programs run at once, the rest wait in a bounded FIFO queue
+EXECUTION_WORKERS = int(os.getenv('CODE_EXECUTION_WORKERS', '0')) or os.cpu_count() or 1
+EXECUTION_QUEUE_SIZE = int(os.getenv('CODE_EXECUTION_QUEUE_SIZE', '0')) or 8 * EXECUTION_WORKERS
+QUEUE_TIMEOUT_SECONDS = float(os.getenv('CODE_EXECUTION_QUEUE_TIMEOUT', '15'))
+WAIT_SAMPLES = 500  # Recent queue waits kept for the percentiles in /metrics
+RUN_TIME_SMOOTHING = 0.1  # EWMA weight of the latest run time, for Retry-After estimates
+
+
+class ExecutionRejected(Exception):
+    """The request was not run: the queue was full (429) or its queue deadline passed (503)"""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ExecutionPool:
+    """
+    Bounded pool for running submitted code.
+
+    A request runs at once when a worker slot is free, otherwise it waits its
+    turn in FIFO order; a finishing request hands its slot straight to the
+    oldest waiter. When the queue is full the request is rejected at once
+    with a Retry-After estimated from recent run times, and a request that
+    waits longer than its queue deadline gives up instead of running late.
+    Everything runs on the event loop, so no locks are needed.
+    """
+
+    def __init__(self, workers: int = EXECUTION_WORKERS, queue_size: int = EXECUTION_QUEUE_SIZE,
+                 queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 0)
+        self.queue_timeout = queue_timeout
+        self._running = 0
+        self._waiters = collections.deque()
+        self._waits = collections.deque(maxlen=WAIT_SAMPLES)
+        self._run_time = 1.0  # seconds, smoothed
+        self._stats = {'submitted': 0, 'completed': 0, 'queued': 0, 'rejectedQueueFull': 0, 'expiredInQueue': 0, 'peakQueueLength': 0}
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new request"""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._run_time * backlog / self.workers))
+
+    async def _acquire(self, queue_timeout: float):
+        if self._running < self.workers and not self._waiters:
+            self._running += 1
+            self._waits.append(0.0)
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._stats['rejectedQueueFull'] += 1
+            raise ExecutionRejected(
+                "The code runner is busy, please try again shortly", 429, self.retry_after()
+            )
+
+        slot = asyncio.get_running_loop().create_future()
+        self._waiters.append(slot)
+        self._stats['queued'] += 1
+        self._stats['peakQueueLength'] = max(self._stats['peakQueueLength'], len(self._waiters))
+        enqueued = time.monotonic()
+        try:
+            await asyncio.wait({slot}, timeout=queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued; pass on a slot that was already handed over
+            if slot.done():
+                self._release()
+            else:
+                self._waiters.remove(slot)
+            raise
+        if not slot.done():
+            self._waiters.remove(slot)
+            slot.cancel()
+            self._stats['expiredInQueue'] += 1
+            raise ExecutionRejected(
+                f"The code runner is busy, your code waited more than {queue_timeout:g}s in the queue", 503, self.retry_after()
+            )
+        self._waits.append(time.monotonic() - enqueued)
+
+    def _release(self):
+        # The slot passes directly to the oldest waiter, so the running count stays put
+        while self._waiters:
+            slot = self._waiters.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self._running -= 1
+
+    async def run(self, job: Callable[[], Awaitable], queue_timeout: Optional[float] = None):
+        """
+        Await job() once a worker slot is free. queue_timeout overrides the
+        default queue deadline (capped at it); raises ExecutionRejected.
+        """
+        self._stats['submitted'] += 1
+        timeout = self.queue_timeout if queue_timeout is None else min(max(queue_timeout, 0.0), self.queue_timeout)
+        await self._acquire(timeout)
+        started = time.monotonic()
+        try:
+            return await job()
+        finally:
+            elapsed = time.monotonic() - started
+            self._run_time += RUN_TIME_SMOOTHING * (elapsed - self._run_time)
+            self._stats['completed'] += 1
+            self._release()
+
+    def snapshot(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> Optional[float]:
+            return round(waits[min(int(p * len(waits)), len(waits) - 1)] * 1000, 1) if waits else None
+
+        return {
+            **self._stats,
+            'workers': self.workers,
+            'queueSize': self.queue_size,
+            'queueTimeoutSeconds': self.queue_timeout,
+            'running': self._running,
+            'queueLength': len(self._waiters),
+            'avgRunSeconds': round(self._run_time, 3),
+            'queueWaitMs': {
+                'samples': len(waits),
+                'avg': round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': round(waits[-1] * 1000, 1) if waits else None
+            }
+        }
+
+
+# Singleton instance
+execution_pool = ExecutionPool()
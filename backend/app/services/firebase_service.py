@@ -266,4 +266,92 @@ class FirebaseService:
             .stream()
         return [doc.to_dict() for doc in docs]
 
+    def get_question_set(self, set_id: str):
+        if not self.initialized:
+            # Use in-memory storage for development
+            if hasattr(self, 'mock_storage') and 'question_sets' in self.mock_storage:
+                return self.mock_storage['question_sets'].get(set_id)
+            return None
+        doc = self.db.collection('question_sets').document(set_id).get()
+        return doc.to_dict() if doc.exists else None
+    
+    def save_question_set(self, set_id: str, set_data: dict):
+        set_data['id'] = set_id
+        if not self.initialized:
+            # Use in-memory storage for development
+            if not hasattr(self, 'mock_storage'):
+                self.mock_storage = {}
+            if 'question_sets' not in self.mock_storage:
+                self.mock_storage['question_sets'] = {}
+            self.mock_storage['question_sets'][set_id] = set_data
+            return set_data
+        self.db.collection('question_sets').document(set_id).set(set_data)
+        return set_data
+    
+    def list_question_sets(self, limit: int = 1000, daily_only: bool = False):
+        if not self.initialized:
+            # Use in-memory storage for development
+            if hasattr(self, 'mock_storage') and 'question_sets' in self.mock_storage:
+                question_sets = [v for v in self.mock_storage['question_sets'].values() if v.get('daily') or not daily_only]
+                return sorted(question_sets, key=lambda x: x.get('createdAt', ''), reverse=True)[:limit]
+            return []
+        query = self.db.collection('question_sets')
+        if daily_only:
+            query = query.where('daily', '==', True)
+        docs = query\
+            .order_by('createdAt', direction=firestore.Query.DESCENDING)\
+            .limit(limit)\
+            .stream()
+        return [doc.to_dict() for doc in docs]
+    
+    def get_rubric(self, rubric_id: str):
+        if not self.initialized:
+            # Use in-memory storage for development
+            if hasattr(self, 'mock_storage') and 'rubrics' in self.mock_storage:
+                return self.mock_storage['rubrics'].get(rubric_id)
+            return None
+        doc = self.db.collection('rubrics').document(rubric_id).get()
+        return doc.to_dict() if doc.exists else None
+    
+    def save_rubric(self, rubric_id: str, rubric_data: dict):
+        rubric_data['id'] = rubric_id
+        if not self.initialized:
+            # Use in-memory storage for development
+            if not hasattr(self, 'mock_storage'):
+                self.mock_storage = {}
+            if 'rubrics' not in self.mock_storage:
+                self.mock_storage['rubrics'] = {}
+            self.mock_storage['rubrics'][rubric_id] = rubric_data
+            return rubric_data
+        self.db.collection('rubrics').document(rubric_id).set(rubric_data)
+        return rubric_data
+
+    def save_bank_questions(self, questions: dict):
+        """Store imported bank questions, keyed by document id, in batched writes"""
+        if not self.initialized:
+            # Use in-memory storage for development
+            if not hasattr(self, 'mock_storage'):
+                self.mock_storage = {}
+            if 'bank_questions' not in self.mock_storage:
+                self.mock_storage['bank_questions'] = {}
+            self.mock_storage['bank_questions'].update(questions)
+            return
+        items = list(questions.items())
+        for start in range(0, len(items), 500):  # Firestore batch write limit
+            batch = self.db.batch()
+            for doc_id, question in items[start:start + 500]:
+                batch.set(self.db.collection('bank_questions').document(doc_id), question)
+            batch.commit()
+    
+    def list_bank_questions(self):
+        if not self.initialized:
+            # Use in-memory storage for development
+            if hasattr(self, 'mock_storage') and 'bank_questions' in self.mock_storage:
+                return sorted(self.mock_storage['bank_questions'].values(), key=lambda x: x.get('importedAt', ''))
+            return []
+        docs = self.db.collection('bank_questions')\
+            .order_by('importedAt')\
+            .stream()
+        return [doc.to_dict() for doc in docs]
+
 firebase_service = FirebaseService()
@@ -1,10 +1,24 @@
 import os
 import json
-import google.generativeai as genai
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
+from app.services.answer_screening import prescreen_answer
+from app.services.aptitude_generator import APTITUDE_GENERATED_SHARE, generate_aptitude_questions
+from app.services.aptitude_grader import grade_answer
+from app.services.retry_policy import call_with_retry
+from app.services.llm_transport import llm_transport
+from app.services.rubric_store import rubric_store
+from app.services.answer_scorer import answer_scorer
+from app.services.question_bank import sample_fallback_question, sample_fallback_questions, draw_without_replacement, draw_widening, PRACTICE_POOL
+from app.services.json_repair import parse_llm_json, salvage_fields, coerce_score, coerce_str_list
 
 load_dotenv()
 
+# Answers graded per LLM call when evaluation is deferred to the end of the interview
+BATCH_EVALUATION_SIZE = int(os.getenv('BATCH_EVALUATION_SIZE', '5'))
+
 class GeminiService:
     def __init__(self):
         print("\n" + "="*60)
@@ -18,14 +32,17 @@ class GeminiService:
         
         # Allow model override via environment variable
         model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+        # 'tiered' skips the model answer on the answer path; it is generated on demand
+        self.evaluation_mode = os.getenv('EVALUATION_MODE', 'tiered').lower()
+        print(f"Evaluation mode: {self.evaluation_mode}")
         if api_key and api_key != 'your_gemini_api_key_here':
             try:
                 print("Configuring Gemini API...")
-                genai.configure(api_key=api_key)
+                llm_transport.configure(api_key)
                 print("Creating model instances...")
                 # Use model_name for question generation (default: gemini-2.5-flash, can be gemma-3-27b)
-                self.flash_model = genai.GenerativeModel(model_name)
-                self.pro_model = genai.GenerativeModel(model_name)
+                self.flash_model = llm_transport.get_model(model_name)
+                self.pro_model = llm_transport.get_model(model_name)
                 self.initialized = True
                 print("[SUCCESS] Gemini AI initialized successfully")
                 print(f"Flash Model: {self.flash_model._model_name}")
@@ -51,6 +68,10 @@ class GeminiService:
         
         print("="*60 + "\n")
     
+    def _generate(self, model, prompt: str, call_type: str):
+        """Call the model with the retry policy for this call type (transient errors only)"""
+        return call_with_retry(lambda: model.generate_content(prompt), call_type)
+    
     def generate_first_question(self, config: dict, user_profile: dict = None):
         print("\n" + "="*60)
         print("GENERATE FIRST QUESTION")
@@ -75,7 +96,7 @@ class GeminiService:
             print(f"Using model: {self.flash_model._model_name if self.flash_model else 'None'}")
             print("Sending request to Gemini...")
             
-            response = self.flash_model.generate_content(prompt)
+            response = self._generate(self.flash_model, prompt, 'first_question')
             
             print("\n[SUCCESS] API Response received!")
             print(f"Response type: {type(response)}")
@@ -119,22 +140,59 @@ class GeminiService:
             print("[WARNING] Using fallback due to API error")
             return self._get_fallback_first_question(config)
     
-    def evaluate_and_generate_next(self, config: dict, qa_history: list, current_answer: str):
+    def evaluate_and_generate_next(self, config: dict, qa_history: list, current_answer: str, include_model_answer: bool = None, current_question: str = '', include_next_question: bool = True, fallback_sampler: dict = None):
+        if include_model_answer is None:
+            include_model_answer = self.evaluation_mode == 'full'
+        
         print("\n" + "="*60)
         print("EVALUATE AND GENERATE NEXT")
         print("="*60)
         print(f"Initialized: {self.initialized}")
+        print(f"Include model answer: {include_model_answer}")
+        print(f"Include next question: {include_next_question}")
         print(f"Pro Model: {self.pro_model}")
         print(f"QA History length: {len(qa_history)}")
         print(f"Current answer length: {len(current_answer)} chars")
         print(f"Config: {json.dumps(config, indent=2)}")
         
+        screened = prescreen_answer(current_answer, current_question, config.get('type', ''))
+        if screened:
+            print(f"[PRESCREEN] Skipping LLM evaluation: {screened['reason']}")
+            return {
+                "score": screened['score'],
+                "feedback": screened['feedback'],
+                "strengths": [],
+                "improvements": ["Attempt a complete answer with reasoning and examples"],
+                "nextQuestion": self._get_fallback_first_question(config, fallback_sampler, self._asked_questions(qa_history, current_question)) if include_next_question else None,
+                "prescreened": screened['reason']
+            }
+        
+        # Bank questions with a canonical answer are graded locally
+        graded = grade_answer(current_question, current_answer, config.get('type', ''))
+        if graded:
+            print(f"[AUTO-GRADE] Graded against the canonical answer, score {graded['score']}")
+            return {
+                **graded,
+                "nextQuestion": self._get_fallback_first_question(config, fallback_sampler, self._asked_questions(qa_history, current_question)) if include_next_question else None
+            }
+        
         if not self.initialized:
             print("❌ WARNING: Gemini not initialized, using fallback")
-            return self._get_fallback_evaluation(qa_history, current_answer, config)
+            return self._get_fallback_evaluation(qa_history, current_answer, config, fallback_sampler, current_question)
+        
+        # Questions graded before have a cached rubric; grade against it with a short prompt
+        interview_type = config.get('type', 'technical')
+        rubric = rubric_store.get(current_question, interview_type)
+        if rubric is None:
+            rubric_store.schedule(current_question, interview_type, self.generate_rubric)
+        elif not include_next_question:
+            result = self._grade_with_rubric(current_question, current_answer, rubric, config, include_model_answer)
+            if result:
+                print(f"[RUBRIC] Graded against cached rubric, score {result['score']}")
+                return result
             
         print("\n--- Building evaluation prompt ---")
-        prompt = self._build_evaluation_prompt(config, qa_history, current_answer)
+        prompt = self._build_evaluation_prompt(config, qa_history, current_answer, include_model_answer, include_next_question)
         print(f"Prompt length: {len(prompt)} characters")
         print(f"Prompt preview (first 300 chars):\n{prompt[:300]}...")
         
@@ -143,7 +201,7 @@ class GeminiService:
             print(f"Using model: {self.pro_model._model_name if self.pro_model else 'None'}")
             print("Sending evaluation request to Gemini...")
             
-            response = self.pro_model.generate_content(prompt)
+            response = self._generate(self.pro_model, prompt, 'evaluation')
             
             print("\n[SUCCESS] API Response received!")
             print(f"Response type: {type(response)}")
@@ -152,10 +210,10 @@ class GeminiService:
             if hasattr(response, 'text'):
                 print(f"Response text length: {len(response.text)} chars")
                 print(f"Response preview: {response.text[:300]}...")
-                result = self._parse_evaluation_response(response.text)
+                result = self._parse_evaluation_response(response.text, include_next_question)
                 print(f"\n[SUCCESS] Evaluation complete!")
                 print(f"Score: {result.get('score')}")
-                print(f"Next question: {result.get('nextQuestion', 'N/A')[:80]}...")
+                print(f"Next question: {(result.get('nextQuestion') or 'N/A')[:80]}...")
                 print("="*60 + "\n")
                 return result
             else:
@@ -177,7 +235,7 @@ class GeminiService:
                 "free_tier" in error_str.lower()):
                 print("[WARNING] QUOTA EXCEEDED: Using fallback evaluation")
                 print(f"Quota error detected: {error_str[:200]}...")
-                return self._get_fallback_evaluation(qa_history, current_answer, config)
+                return self._get_fallback_evaluation(qa_history, current_answer, config, fallback_sampler, current_question)
             
             print(f"Error details:")
             import traceback
@@ -186,7 +244,7 @@ class GeminiService:
             
             # For other errors, also use fallback
             print("[WARNING] Using fallback evaluation due to API error")
-            return self._get_fallback_evaluation(qa_history, current_answer, config)
+            return self._get_fallback_evaluation(qa_history, current_answer, config, fallback_sampler, current_question)
     
     def _build_first_question_prompt(self, config: dict, user_profile: dict = None):
         interview_type = config.get('type', 'technical')
@@ -371,7 +429,7 @@ Return ONLY the question text, nothing else."""
 
         return prompt
     
-    def _build_evaluation_prompt(self, config: dict, qa_history: list, current_answer: str):
+    def _build_evaluation_prompt(self, config: dict, qa_history: list, current_answer: str, include_model_answer: bool = True, include_next_question: bool = True):
         interview_type = config.get('type', 'technical')
         sub_type = config.get('subType', '')
         company = config.get('company', '')
@@ -393,18 +451,48 @@ Previous Q&A:
 Current Answer:
 {current_answer}
 
-Evaluate the answer and provide:
-1. Score (0-100) - Be realistic and consider the difficulty level and technology context
-2. Feedback (what was good, what could be improved) - Be specific to the technology/sub-type
-3. A model/ideal answer - Include technology-specific best practices
-4. List of strengths (2-3 points)
-5. List of improvements (2-3 points)
-6. Next follow-up question (or "INTERVIEW_COMPLETE" if enough questions asked) - Make it relevant to {sub_type if sub_type else interview_type}
-
+"""
+        
+        next_question_item = f'Next follow-up question (or "INTERVIEW_COMPLETE" if enough questions asked) - Make it relevant to {sub_type if sub_type else interview_type}'
+        if include_model_answer:
+            items = [
+                "Score (0-100) - Be realistic and consider the difficulty level and technology context",
+                "Feedback (what was good, what could be improved) - Be specific to the technology/sub-type",
+                "A model/ideal answer - Include technology-specific best practices",
+                "List of strengths (2-3 points)",
+                "List of improvements (2-3 points)",
+            ]
+            json_fields = [
+                '  "score": 75',
+                '  "feedback": "..."',
+                '  "modelAnswer": "..."',
+                '  "strengths": ["...", "..."]',
+                '  "improvements": ["...", "..."]',
+            ]
+        else:
+            items = [
+                "Score (0-100) - Be realistic and consider the difficulty level and technology context",
+                "Short feedback (1-2 sentences)",
+            ]
+            json_fields = [
+                '  "score": 75',
+                '  "feedback": "..."',
+            ]
+        if include_next_question:
+            items.append(next_question_item)
+            json_fields.append('  "nextQuestion": "..." or "INTERVIEW_COMPLETE"')
+        
+        prompt += "Evaluate the answer and provide" + (":" if include_model_answer else " ONLY:") + "\n"
+        prompt += "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1)) + "\n"
+        if not include_model_answer:
+            prompt += "\nDo NOT write a model answer, strengths or improvements.\n"
+        
+        if include_next_question:
+            prompt += """
 **CRITICAL RULES FOR NEXT QUESTION:**
 """
         
-        if interview_type == 'aptitude':
+        if include_next_question and interview_type == 'aptitude':
             prompt += """- ONLY ask aptitude and reasoning questions (quantitative, logical reasoning, verbal reasoning, data interpretation, puzzles)
 - **NEVER ask:** "Write code to...", "Implement an algorithm...", "Design a system...", "Tell me about a time when..."
 - **NEVER ask:** Programming, coding, algorithms, data structures, frameworks, STAR method, teamwork, leadership
@@ -412,14 +500,14 @@ Evaluate the answer and provide:
 - Categories: Number series, percentage, profit-loss, speed-time-distance, logical puzzles, pattern recognition, coding-decoding, data interpretation, verbal reasoning
 - Example: "If a train travels 120 km in 2 hours, what is its speed?" or "Complete the series: 2, 6, 12, 20, ?"
 """
-        elif interview_type == 'technical':
+        elif include_next_question and interview_type == 'technical':
             prompt += """- ONLY ask technical questions (coding, algorithms, data structures, system design, frameworks, databases)
 - **NEVER ask:** "If a train travels...", "Complete the series...", "Calculate percentage...", "Tell me about a time..."
 - **NEVER ask:** Quantitative aptitude, math word problems, number puzzles, logical reasoning, STAR method, teamwork
 - **ONLY ask:** Coding problems, algorithm design, system architecture, technical concepts, debugging, optimization
 - Focus on programming, software engineering, and technical problem-solving
 """
-        elif interview_type == 'behavioral':
+        elif include_next_question and interview_type == 'behavioral':
             prompt += """- ONLY ask behavioral and communication questions (STAR method, teamwork, conflict resolution, leadership)
 - **NEVER ask:** "Write code to...", "Implement...", "Design a system...", "If a train travels...", "Complete the series..."
 - **NEVER ask:** Coding, algorithms, data structures, system design, math calculations, percentage, number puzzles
@@ -428,50 +516,290 @@ Evaluate the answer and provide:
 """
         
         prompt += """
+Return response as JSON:
+{
+""" + ",\n".join(json_fields) + """
+}"""
+        
+        return prompt
+    
+    def refine_evaluation(self, config: dict, question: str, previous: dict, partial_answer: str, final_answer: str) -> dict:
+        """Adjust an evaluation made on a partial answer to the final answer with a short prompt"""
+        if not self.initialized:
+            return previous
+        
+        prompt = f"""You are an expert interviewer. An answer to the question below was evaluated while the candidate was still speaking.
+
+Question: {question}
+
+Partial answer (already evaluated):
+{partial_answer}
+
+Preliminary evaluation: score {previous.get('score')}, feedback: {previous.get('feedback')}
+
+Final answer:
+{final_answer}
+
+Adjust the score (0-100) and short feedback (1-2 sentences) to reflect the final answer.
+
 Return response as JSON:
 {{
   "score": 75,
-  "feedback": "...",
-  "modelAnswer": "...",
-  "strengths": ["...", "..."],
-  "improvements": ["...", "..."],
-  "nextQuestion": "..." or "INTERVIEW_COMPLETE"
+  "feedback": "..."
 }}"""
         
-        return prompt
+        try:
+            response = self._generate(self.flash_model, prompt, 'evaluation_refine')
+            refined = parse_llm_json(response.text, 'object', 'evaluation_refine')
+            if not refined or 'score' not in refined:
+                return previous
+            return {
+                **previous,
+                "score": coerce_score(refined.get('score'), previous.get('score', 70)),
+                "feedback": str(refined.get('feedback') or previous.get('feedback', ''))
+            }
+        except Exception as e:
+            print(f"Gemini API error in evaluation refine: {e}")
+            return previous
+    
+    def evaluate_answers_batch(self, config: dict, items: list) -> list:
+        """
+        Grade a whole interview's answers at once (deferred evaluation).
+
+        items is a list of {question, answer}; results come back in the same order.
+        Answers are sent in chunks of BATCH_EVALUATION_SIZE, one LLM call per chunk,
+        with the chunks running concurrently.
+        """
+        results = [None] * len(items)
+        pending = []
+        for i, item in enumerate(items):
+            screened = prescreen_answer(item['answer'], item['question'], config.get('type', ''))
+            if screened:
+                results[i] = {
+                    "score": screened['score'],
+                    "feedback": screened['feedback'],
+                    "strengths": [],
+                    "improvements": ["Attempt a complete answer with reasoning and examples"],
+                    "prescreened": screened['reason']
+                }
+                continue
+            results[i] = grade_answer(item['question'], item['answer'], config.get('type', ''))
+            if results[i] is None:
+                pending.append(i)
+        
+        print(f"\n=== BATCH EVALUATION: {len(items)} answers, {len(items) - len(pending)} prescreened or auto-graded ===")
+        if pending and self.initialized:
+            chunks = [pending[start:start + BATCH_EVALUATION_SIZE] for start in range(0, len(pending), BATCH_EVALUATION_SIZE)]
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                for chunk, chunk_results in zip(chunks, executor.map(lambda chunk: self._evaluate_chunk(config, [items[i] for i in chunk]), chunks)):
+                    for i, result in zip(chunk, chunk_results):
+                        results[i] = result
+        
+        for i in pending:
+            if results[i] is None:
+                fallback = self._get_fallback_evaluation([], items[i]['answer'], config, current_question=items[i]['question'])
+                fallback.pop('nextQuestion', None)
+                results[i] = fallback
+        return results
+    
+    def _evaluate_chunk(self, config: dict, items: list) -> list:
+        """One LLM call grading several answers; entries that cannot be parsed come back as None"""
+        interview_type = config.get('type', 'technical')
+        sub_type = config.get('subType', '')
+        company = config.get('company', '')
+        difficulty = config.get('difficulty', 'mid')
+        company_context = f" at {company}" if company else ""
+        tech_context = f" focusing on {sub_type}" if sub_type else ""
+        
+        answers_text = "\n\n".join(
+            f"[{n}] Question: {item['question']}\nAnswer: {item['answer']}"
+            for n, item in enumerate(items, 1)
+        )
+        prompt = f"""You are an expert interviewer evaluating a candidate's responses in a {interview_type} interview{tech_context}{company_context} at {difficulty} level.
+
+Evaluate each numbered answer independently:
+1. Score (0-100)
+2. Constructive feedback (2-3 sentences)
+3. Strengths and areas for improvement
+
+{answers_text}
+
+Return a JSON array with exactly {len(items)} objects, in the same order:
+[
+  {{"index": 1, "score": 75, "feedback": "...", "strengths": ["..."], "improvements": ["..."]}}
+]"""
+        
+        try:
+            response = self._generate(self.pro_model, prompt, 'batch_evaluation')
+            data = parse_llm_json(response.text, 'array', 'batch_evaluation')
+        except Exception as e:
+            print(f"Gemini API error in batch evaluation: {e}")
+            return [None] * len(items)
+        
+        results = [None] * len(items)
+        for position, entry in enumerate(data or []):
+            if not isinstance(entry, dict) or 'score' not in entry:
+                continue
+            try:
+                index = int(entry.get('index', position + 1)) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < len(items) and results[index] is None:
+                results[index] = {
+                    "score": coerce_score(entry.get('score')),
+                    "feedback": str(entry.get('feedback') or "Good attempt. Continue practicing."),
+                    "strengths": coerce_str_list(entry.get('strengths')),
+                    "improvements": coerce_str_list(entry.get('improvements'))
+                }
+        return results
+    
+    def generate_rubric(self, question: str, category: str) -> dict:
+        """Compact grading rubric and model answer for a question, generated once and cached by rubric_store"""
+        prompt = f"""You are an expert interviewer preparing to grade answers to a {category} interview question.
+
+Question: {question}
+
+Write a compact grading rubric:
+1. The 3-6 key points a strong answer must cover (short phrases)
+2. Up to 3 common mistakes or red flags
+3. A concise model answer (at most 120 words)
+
+Return response as JSON:
+{{
+  "keyPoints": ["...", "..."],
+  "mistakes": ["..."],
+  "modelAnswer": "..."
+}}"""
+        
+        response = self._generate(self.flash_model, prompt, 'rubric')
+        data = parse_llm_json(response.text, 'object', 'rubric')
+        if not data:
+            return None
+        return {
+            "keyPoints": coerce_str_list(data.get('keyPoints'))[:6],
+            "mistakes": coerce_str_list(data.get('mistakes'))[:3],
+            "modelAnswer": str(data.get('modelAnswer') or '')
+        }
+    
+    def _grade_with_rubric(self, question: str, answer: str, rubric: dict, config: dict, include_model_answer: bool = False, practice: bool = False):
+        """Grade one answer against a cached rubric; returns None so the caller can fall back to the full prompt"""
+        category = config.get('type', 'technical')
+        difficulty = config.get('difficulty', '')
+        level = f" at {difficulty} level" if difficulty else ""
+        key_points = "\n".join(f"- {point}" for point in rubric.get('keyPoints', []))
+        mistakes = "\n".join(f"- {mistake}" for mistake in rubric.get('mistakes', []))
+        
+        if practice:
+            fields = '"score": 75, "feedback": "2-3 sentences", "keyPoints": ["missed or strong point", "..."]'
+        else:
+            fields = '"score": 75, "feedback": "1-2 sentences", "strengths": ["..."], "improvements": ["..."]'
+        
+        prompt = f"""Grade this {category} interview answer{level} against the rubric.
+
+Question: {question}
+
+Key points:
+{key_points}
+Common mistakes:
+{mistakes or "- none listed"}
+
+Answer:
+{answer}
+
+Score 0-100 by how many key points are covered and how well. Return ONLY JSON:
+{{{fields}}}"""
+        
+        try:
+            response = self._generate(self.flash_model, prompt, 'practice_evaluation' if practice else 'evaluation')
+        except Exception as e:
+            print(f"Gemini API error in rubric grading: {e}")
+            return None
+        
+        data = parse_llm_json(response.text, 'object', 'rubric_evaluation')
+        if not data or 'score' not in data:
+            return None
+        
+        result = {
+            "score": coerce_score(data.get('score')),
+            "feedback": str(data.get('feedback') or "Good attempt. Continue practicing."),
+            "rubricGraded": True
+        }
+        if practice:
+            result["keyPoints"] = coerce_str_list(data.get('keyPoints')) or rubric.get('keyPoints', [])[:3]
+        else:
+            result["strengths"] = coerce_str_list(data.get('strengths'))
+            result["improvements"] = coerce_str_list(data.get('improvements'))
+            result["nextQuestion"] = None
+            if include_model_answer and rubric.get('modelAnswer'):
+                result["modelAnswer"] = rubric['modelAnswer']
+        return result
+    
+    def generate_model_answer(self, config: dict, question: str, answer: str = None) -> Optional[str]:
+        """
+        Generate the model/ideal answer for a single question (on demand, cached by the caller).
+        Returns None when no answer could be generated, so nothing generic gets cached.
+        """
+        interview_type = config.get('type', 'technical')
+        rubric = rubric_store.get(question, interview_type)
+        if rubric and rubric.get('modelAnswer'):
+            return rubric['modelAnswer']
+        
+        if not self.initialized:
+            return None
+        
+        sub_type = config.get('subType', '')
+        difficulty = config.get('difficulty', 'mid')
+        tech_context = f" focusing on {sub_type}" if sub_type else ""
+        candidate_context = f"\n\nCandidate's answer (address its gaps where relevant):\n{answer}" if answer else ""
+        
+        prompt = f"""You are an expert interviewer for a {interview_type} interview{tech_context} at {difficulty} level.
+
+Write a concise model answer to the following interview question. Cover the key points an interviewer expects, with best practices and a short example where useful.
+
+Question: {question}{candidate_context}
+
+Return ONLY the model answer text (at most 200 words)."""
+        
+        try:
+            response = self._generate(self.flash_model, prompt, 'model_answer')
+            return response.text.strip() or None
+        except Exception as e:
+            print(f"Gemini API error in model answer: {e}")
+            return None
     
     def _extract_question(self, text: str) -> str:
         # Clean up response to get just the question
         return text.strip().replace('"', '').replace("'", "")
     
-    def _parse_evaluation_response(self, text: str) -> dict:
-        try:
-            # Try to extract JSON from response
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                # Fallback parsing
+    def _parse_evaluation_response(self, text: str, expect_next_question: bool = True) -> dict:
+        data = parse_llm_json(text, 'object', 'evaluation')
+        if data is None:
+            # Recover whatever fields are still readable before using canned defaults
+            data = salvage_fields(text, ('feedback', 'modelAnswer', 'nextQuestion'), ('score',), 'evaluation')
+            if 'score' not in data:
+                print(f"Error parsing Gemini response, using defaults: {text[:200]}")
                 return {
                     "score": 70,
                     "feedback": "Good attempt. Continue practicing.",
-                    "modelAnswer": "A comprehensive answer would cover...",
                     "strengths": ["Clear communication"],
                     "improvements": ["Add more specific examples"],
-                    "nextQuestion": "Can you elaborate on your experience with..."
+                    "nextQuestion": "Can you elaborate on your experience with..." if expect_next_question else None,
+                    "fallback": True
                 }
-        except Exception as e:
-            print(f"Error parsing Gemini response: {e}")
-            return {
-                "score": 70,
-                "feedback": text[:200],
-                "modelAnswer": "See feedback for improvement areas.",
-                "strengths": ["Effort shown"],
-                "improvements": ["More detail needed"],
-                "nextQuestion": "Let's move to the next topic..."
-            }
+        
+        result = {
+            **data,
+            "score": coerce_score(data.get('score')),
+            "feedback": str(data.get('feedback') or "Good attempt. Continue practicing."),
+            "strengths": coerce_str_list(data.get('strengths')),
+            "improvements": coerce_str_list(data.get('improvements')),
+            "nextQuestion": str(data.get('nextQuestion') or "Let's move to the next topic...")
+        }
+        if not data.get('modelAnswer'):
+            result.pop('modelAnswer', None)
+        if not expect_next_question:
+            result['nextQuestion'] = None
+        return result
     def generate_practice_questions(self, category: str, difficulty: str, count: int = 5):
         """Generate multiple practice questions for quick practice mode"""
         if not self.initialized:
@@ -501,7 +829,7 @@ Return as JSON array:
 ]"""
         
         try:
-            response = self.flash_model.generate_content(prompt)
+            response = self._generate(self.flash_model, prompt, 'practice_questions')
             questions = self._parse_questions_response(response.text)
             if questions:
                 return questions
@@ -512,9 +840,36 @@ Return as JSON array:
     
     def evaluate_practice_answer(self, question: str, answer: str, category: str):
         """Quick evaluation for practice mode"""
+        screened = prescreen_answer(answer, question, category)
+        if screened:
+            return {
+                "score": screened['score'],
+                "feedback": screened['feedback'],
+                "keyPoints": ["Attempt a complete answer with reasoning and examples"],
+                "prescreened": screened['reason']
+            }
+        
+        graded = grade_answer(question, answer, category)
+        if graded:
+            return {
+                "score": graded['score'],
+                "feedback": graded['feedback'],
+                "keyPoints": graded['strengths'] + graded['improvements'],
+                "autoGraded": True,
+                "expectedAnswer": graded['expectedAnswer']
+            }
+        
         if not self.initialized:
             raise Exception("Gemini AI is not initialized. Please check your API key configuration.")
         
+        rubric = rubric_store.get(question, category)
+        if rubric is None:
+            rubric_store.schedule(question, category, self.generate_rubric)
+        else:
+            result = self._grade_with_rubric(question, answer, rubric, {'type': category}, practice=True)
+            if result:
+                return result
+        
         prompt = f"""Evaluate this {category} interview answer:
 
 Question: {question}
@@ -533,76 +888,93 @@ Return as JSON:
 }}"""
         
         try:
-            response = self.flash_model.generate_content(prompt)
+            response = self._generate(self.flash_model, prompt, 'practice_evaluation')
             return self._parse_practice_evaluation(response.text)
         except Exception as e:
             print(f"Gemini API error in practice evaluation: {e}")
             raise Exception(f"Failed to evaluate practice answer: {str(e)}")
     
     def _parse_questions_response(self, text: str) -> list:
-        try:
-            start_idx = text.find('[')
-            end_idx = text.rfind(']') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                return json.loads(json_str)
-        except Exception as e:
-            print(f"Error parsing questions: {e}")
-        return []
+        data = parse_llm_json(text, 'array', 'practice_questions')
+        if data is None:
+            print(f"Error parsing questions: {text[:200]}")
+            return []
+        
+        questions = []
+        for item in data:
+            if isinstance(item, str):
+                item = {"question": item}
+            if not isinstance(item, dict) or not str(item.get('question') or '').strip():
+                continue
+            questions.append({
+                **item,
+                "question": str(item['question']).strip(),
+                "hints": coerce_str_list(item.get('hints')),
+                "topics": coerce_str_list(item.get('topics'))
+            })
+        return questions
     
     def _parse_practice_evaluation(self, text: str) -> dict:
-        try:
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                return json.loads(json_str)
-        except:
-            pass
+        data = parse_llm_json(text, 'object', 'practice_evaluation')
+        if data is None:
+            data = salvage_fields(text, ('feedback',), ('score',), 'practice_evaluation')
+            if 'score' not in data:
+                return {
+                    "score": 70,
+                    "feedback": "Good attempt!",
+                    "keyPoints": ["Keep practicing"]
+                }
+        
         return {
-            "score": 70,
-            "feedback": "Good attempt!",
-            "keyPoints": ["Keep practicing"]
+            **data,
+            "score": coerce_score(data.get('score')),
+            "feedback": str(data.get('feedback') or "Good attempt!"),
+            "keyPoints": coerce_str_list(data.get('keyPoints')) or ["Keep practicing"]
         }
     
-    def _get_fallback_first_question(self, config: dict) -> str:
-        """Get a fallback first question when AI is not available or quota exceeded"""
-        import random
+    def _asked_questions(self, qa_history: list, current_question: str = '') -> list:
+        return [qa.get('questionText', '') for qa in qa_history] + [current_question]
+    
+    def _get_fallback_first_question(self, config: dict, sampler: dict = None, asked: list = ()) -> str:
+        """
+        Get a fallback first question when AI is not available or quota exceeded.
         
+        With a per-interview sampler state the question is drawn without
+        replacement, so an interview in fallback mode does not repeat questions;
+        once the config's pool is used up a wider pool is drawn from.
+        """
         category = config.get('type', 'technical')
         difficulty = config.get('difficulty', 'mid')
         
-        # Get fallback questions for the category and difficulty
-        fallback_questions = self._get_fallback_questions(category, difficulty, 10)
+        sub_type = config.get('subType')
+        company = config.get('company')
         
-        if fallback_questions:
-            # Pick a random question
-            question_obj = random.choice(fallback_questions)
+        if sampler is not None:
+            question_obj = draw_without_replacement(sampler, category, difficulty, asked, sub_type, company)
+        else:
+            # Pick a random question matching the category, subType, difficulty and company
+            question_obj = sample_fallback_question(category, difficulty, sub_type, company)
+        if category == 'aptitude' and (not question_obj or question_obj['question'] in asked):
+            # The bank is used up for this interview; generated questions never run out
+            generated = generate_aptitude_questions(1, difficulty, asked)
+            if generated:
+                return generated[0]
+        if sampler is not None and not question_obj:
+            # Every question for this config was asked; widen the pool instead of repeating one
+            question_obj = draw_widening(sampler, category, None, asked, sub_type, company)
+        if question_obj:
             return question_obj['question']
         
         # Ultimate fallback if no questions found
         return "Tell me about yourself and your background in software development."
     
-    def _get_fallback_evaluation(self, qa_history: list, current_answer: str, config: dict) -> dict:
+    def _get_fallback_evaluation(self, qa_history: list, current_answer: str, config: dict, sampler: dict = None, current_question: str = '') -> dict:
         """Get a fallback evaluation when AI is not available or quota exceeded"""
-        word_count = len(current_answer.split())
-        char_count = len(current_answer)
-        
-        # Simple scoring based on answer length and content
-        base_score = 65
-        
-        # Bonus for longer, more detailed answers
-        if word_count > 50:
-            base_score += 10
-        elif word_count > 25:
-            base_score += 5
-        
-        # Bonus for using technical terms (simple heuristic)
-        technical_terms = ['algorithm', 'data', 'structure', 'function', 'class', 'method', 'api', 'database', 'server', 'client']
-        found_terms = sum(1 for term in technical_terms if term.lower() in current_answer.lower())
-        base_score += min(found_terms * 2, 10)
-        
-        score = min(95, max(55, base_score))
+        # Score locally against the question's reference terms (bank hints/topics, cached rubric)
+        rubric = rubric_store.get(current_question, config.get('type', 'technical')) or {}
+        reference_answer = ' '.join([rubric.get('modelAnswer', ''), *rubric.get('keyPoints', [])])
+        scored = answer_scorer.score(current_question, current_answer, reference_answer)
+        score = scored['score']
         
         # Generate feedback based on score
         if score >= 85:
@@ -613,13 +985,15 @@ Return as JSON:
             feedback = "Decent answer. Consider providing more specific examples and technical details."
         else:
             feedback = "This answer could be improved with more depth and specific examples."
+        if scored['missedHints']:
+            feedback += f" Consider also covering: {', '.join(scored['missedHints'][:2])}."
         
         # Generate key points based on answer content
-        key_points = []
-        if word_count > 20:
+        key_points = [f"Covered: {hint}" for hint in scored['coveredHints'][:2]]
+        if scored['coverage'] >= 0.3:
+            key_points.append("Used terminology relevant to the question")
+        if scored['wordCount'] > 20:
             key_points.append("Provided a detailed response")
-        if found_terms > 0:
-            key_points.append("Used relevant technical terminology")
         if len(current_answer.split('.')) > 2:
             key_points.append("Structured answer with multiple points")
         
@@ -630,266 +1004,29 @@ Return as JSON:
             "score": score,
             "feedback": feedback,
             "keyPoints": key_points,
-            "nextQuestion": self._get_fallback_first_question(config)  # Generate next question
+            "nextQuestion": self._get_fallback_first_question(config, sampler, self._asked_questions(qa_history, current_question)),  # Generate next question
+            "fallback": True
         }
     
-    def _get_fallback_questions(self, category: str, difficulty: str, count: int) -> list:
+    def _get_fallback_questions(self, category: str, difficulty: str, count: int, sub_type: str = None, company: str = None) -> list:
         """Comprehensive fallback questions when AI is not available"""
-        import random
-        
-        fallback_questions = {
-            "aptitude": [
-                # Logical Reasoning - Entry Level
-                {"question": "If all Bloops are Razzies and all Razzies are Lazzies, are all Bloops definitely Lazzies?", "category": "aptitude", "difficulty": "entry", "hints": ["Syllogism", "Transitive property"], "topics": ["logical-reasoning", "deduction"]},
-                {"question": "Find the odd one out: 2, 5, 10, 17, 26, 37", "category": "aptitude", "difficulty": "entry", "hints": ["Pattern recognition", "Number series"], "topics": ["logical-reasoning", "patterns"]},
-                {"question": "If CAT = 3120, what is DOG?", "category": "aptitude", "difficulty": "entry", "hints": ["Letter-to-number coding", "Position values"], "topics": ["coding-decoding", "patterns"]},
-                {"question": "A clock shows 3:15. What is the angle between the hour and minute hands?", "category": "aptitude", "difficulty": "entry", "hints": ["Each hour = 30°", "Minute hand position"], "topics": ["clock-problems", "angles"]},
-                
-                # Quantitative Aptitude - Entry Level
-                {"question": "A train 100m long passes a pole in 10 seconds. What is its speed in km/hr?", "category": "aptitude", "difficulty": "entry", "hints": ["Speed = Distance/Time", "Convert m/s to km/hr"], "topics": ["speed-distance-time", "trains"]},
-                {"question": "If the cost price of 12 pens equals the selling price of 10 pens, what is the profit percentage?", "category": "aptitude", "difficulty": "entry", "hints": ["Profit = SP - CP", "Percentage formula"], "topics": ["profit-loss", "percentage"]},
-                {"question": "A sum of money doubles itself in 5 years at simple interest. In how many years will it triple?", "category": "aptitude", "difficulty": "entry", "hints": ["SI = PRT/100", "Rate calculation"], "topics": ["simple-interest", "time-calculation"]},
-                {"question": "The ratio of boys to girls in a class is 3:2. If there are 45 students, how many are girls?", "category": "aptitude", "difficulty": "entry", "hints": ["Total parts = 3+2", "Calculate one part"], "topics": ["ratio-proportion", "basic-math"]},
-                
-                # Verbal Reasoning - Entry Level
-                {"question": "Find the synonym of ABUNDANCE: (a) Scarcity (b) Plenty (c) Lack (d) Shortage", "category": "aptitude", "difficulty": "entry", "hints": ["Means plenty/large quantity"], "topics": ["vocabulary", "synonyms"]},
-                {"question": "Complete: Engineer : Building :: Sculptor : ?", "category": "aptitude", "difficulty": "entry", "hints": ["What does a sculptor create?"], "topics": ["analogies", "relationships"]},
-                
-                # Data Interpretation - Entry Level
-                {"question": "A pie chart shows: Sales 40%, Marketing 25%, R&D 20%, Others 15%. If the total budget is $100,000, what is the R&D budget?", "category": "aptitude", "difficulty": "entry", "hints": ["20% of total", "Simple percentage"], "topics": ["data-interpretation", "percentage"]},
-                
-                # Logical Reasoning - Mid Level (TCS/Infosys/Wipro style)
-                {"question": "Five friends are sitting in a row. A is not at either end. B is to the left of C. D is between B and E. Who is in the middle?", "category": "aptitude", "difficulty": "mid", "hints": ["Draw positions", "Eliminate possibilities"], "topics": ["seating-arrangement", "logical-reasoning"]},
-                {"question": "In a certain code, COMPUTER is written as RFUVQNPC. How is MEDICINE written?", "category": "aptitude", "difficulty": "mid", "hints": ["Reverse and shift", "Pattern analysis"], "topics": ["coding-decoding", "ciphers"]},
-                {"question": "How many times do the hands of a clock coincide in a day?", "category": "aptitude", "difficulty": "mid", "hints": ["Not 24!", "11 times in 12 hours"], "topics": ["clock-problems", "frequency"]},
-                {"question": "A man walks 5 km towards East, turns right and walks 3 km, then turns right and walks 5 km. How far is he from the starting point?", "category": "aptitude", "difficulty": "mid", "hints": ["Draw the path", "Pythagoras theorem"], "topics": ["direction-sense", "geometry"]},
-                
-                # Quantitative Aptitude - Mid Level (Accenture/Cognizant style)
-                {"question": "Two trains 150m and 200m long are running in opposite directions at 54 km/hr and 36 km/hr. In how many seconds will they cross each other?", "category": "aptitude", "difficulty": "mid", "hints": ["Relative speed = sum", "Total distance = sum of lengths"], "topics": ["trains", "relative-speed"]},
-                {"question": "A cistern has two pipes. One fills it in 4 hours and the other empties it in 6 hours. If both are opened, in how many hours will the cistern be filled?", "category": "aptitude", "difficulty": "mid", "hints": ["Work done per hour", "Net fill rate"], "topics": ["pipes-cisterns", "work-time"]},
-                {"question": "The average age of 10 students is 20 years. If the teacher's age is included, the average becomes 22 years. What is the teacher's age?", "category": "aptitude", "difficulty": "mid", "hints": ["Total age before and after"], "topics": ["averages", "age-problems"]},
-                {"question": "A person invested money in two schemes A and B at 10% and 12% simple interest. If the total interest after 1 year is ₹840 and ratio of investment is 2:3, find total investment.", "category": "aptitude", "difficulty": "mid", "hints": ["Let investments be 2x and 3x"], "topics": ["simple-interest", "ratio"]},
-                {"question": "If 20 workers can complete a work in 30 days, how many workers are needed to complete it in 20 days?", "category": "aptitude", "difficulty": "mid", "hints": ["Total work = workers × days", "Inverse proportion"], "topics": ["work-time", "inverse-proportion"]},
-                {"question": "A mixture contains milk and water in ratio 5:3. If 16 liters of water is added, the ratio becomes 5:7. Find the initial quantity of milk.", "category": "aptitude", "difficulty": "mid", "hints": ["Let initial quantities be 5x and 3x"], "topics": ["mixture-alligation", "ratio"]},
-                
-                # Data Interpretation - Mid Level
-                {"question": "A bar graph shows quarterly sales: Q1=$50k, Q2=$75k, Q3=$60k, Q4=$90k. What is the percentage increase from Q1 to Q4?", "category": "aptitude", "difficulty": "mid", "hints": ["% increase = (increase/original) × 100"], "topics": ["data-interpretation", "percentage"]},
-                {"question": "A table shows production of 5 companies over 3 years. Company A produced 200, 250, 300 units. Company B produced 180, 220, 280. Which company had higher growth rate?", "category": "aptitude", "difficulty": "mid", "hints": ["Calculate percentage growth"], "topics": ["data-interpretation", "comparison"]},
-                
-                # Probability & Statistics - Mid Level
-                {"question": "What is the probability of getting at least one head when three coins are tossed?", "category": "aptitude", "difficulty": "mid", "hints": ["P(at least one) = 1 - P(none)", "Total outcomes = 8"], "topics": ["probability", "coins"]},
-                {"question": "In how many ways can 5 people be arranged in a row?", "category": "aptitude", "difficulty": "mid", "hints": ["Permutation", "5!"], "topics": ["permutation-combination", "arrangements"]},
-                
-                # Pattern Recognition (Google/Amazon style) - Mid Level
-                {"question": "Find the next number in series: 1, 4, 9, 16, 25, ?", "category": "aptitude", "difficulty": "mid", "hints": ["Perfect squares"], "topics": ["number-series", "patterns"]},
-                {"question": "Find the missing number: 2, 6, 12, 20, 30, ?", "category": "aptitude", "difficulty": "mid", "hints": ["Difference of differences", "n(n+1)"], "topics": ["number-series", "patterns"]},
-                
-                # Logical Reasoning - Senior Level (Microsoft/Google style)
-                {"question": "You have 8 balls, one is heavier. Using a balance scale only twice, how do you find the heavier ball?", "category": "aptitude", "difficulty": "senior", "hints": ["Divide into groups of 3-3-2", "First weighing narrows down"], "topics": ["logical-puzzles", "optimization"]},
-                {"question": "100 prisoners are lined up. Each can see all prisoners in front but not behind. A hat (red or blue) is placed on each head. Starting from the back, each must say their hat color. How to maximize survivors?", "category": "aptitude", "difficulty": "senior", "hints": ["Parity strategy", "Even/odd count"], "topics": ["logical-puzzles", "strategy"]},
-                {"question": "A bridge can hold 2 people max. 4 people need to cross with times: 1, 2, 5, 10 minutes. They need a flashlight. What's the minimum time?", "category": "aptitude", "difficulty": "senior", "hints": ["Send fast ones back", "Optimize pairs"], "topics": ["optimization", "logical-puzzles"]},
-                {"question": "You're in a room with 3 switches outside. Each controls a bulb inside (you can't see). You can flip switches, then enter once. How to determine which switch controls which bulb?", "category": "aptitude", "difficulty": "senior", "hints": ["Use heat", "Time factor"], "topics": ["logical-puzzles", "creative-thinking"]},
-                
-                # Quantitative Aptitude - Senior Level
-                {"question": "A and B can complete a work in 12 days, B and C in 15 days, C and A in 20 days. How long will A, B, and C together take?", "category": "aptitude", "difficulty": "senior", "hints": ["Find individual work rates", "Add all three rates"], "topics": ["work-time", "equations"]},
-                {"question": "A merchant marks his goods 25% above cost price and gives a discount of 10%. What is his profit percentage?", "category": "aptitude", "difficulty": "senior", "hints": ["Let CP = 100", "Calculate step by step"], "topics": ["profit-loss", "discount"]},
-                {"question": "A cistern can be filled by two pipes A and B in 2 hours and 3 hours respectively. An outlet pipe C can empty it in 4 hours. If all three are opened together, in how many hours will the cistern be filled?", "category": "aptitude", "difficulty": "senior", "hints": ["Net rate = A + B - C"], "topics": ["pipes-cisterns", "work-time"]},
-                
-                # Probability & Combinations - Senior Level
-                {"question": "In how many ways can 7 people be seated around a circular table if 2 specific people must not sit together?", "category": "aptitude", "difficulty": "senior", "hints": ["Circular permutation", "Subtract when together"], "topics": ["permutation-combination", "circular"]},
-                {"question": "A bag contains 5 red, 4 blue, and 3 green balls. What is the probability of drawing 3 balls such that all are of different colors?", "category": "aptitude", "difficulty": "senior", "hints": ["5C1 × 4C1 × 3C1 / 12C3"], "topics": ["probability", "combinations"]},
-                
-                # Data Sufficiency (TCS/Infosys)
-                {"question": "Is x > y? (I) x² > y² (II) x³ > y³. Which statement(s) is/are sufficient?", "category": "aptitude", "difficulty": "senior", "hints": ["Consider negative numbers", "Statement II alone"], "topics": ["data-sufficiency", "inequalities"]},
-                
-                # Previous Year Questions from Top Companies
-                # TCS CodeVita/NQT Style
-                {"question": "A number when divided by 5 leaves remainder 3, when divided by 7 leaves remainder 4. What is the smallest such number?", "category": "aptitude", "difficulty": "mid", "hints": ["Chinese remainder theorem", "LCM approach"], "topics": ["number-theory", "remainders"]},
-                {"question": "How many 4-digit numbers can be formed using digits 1-5 without repetition that are divisible by 4?", "category": "aptitude", "difficulty": "mid", "hints": ["Last 2 digits divisible by 4"], "topics": ["permutation-combination", "divisibility"]},
-                
-                # Infosys Previous Year
-                {"question": "A can do a work in 15 days, B in 20 days. They work together for 4 days, then A leaves. In how many more days will B finish the remaining work?", "category": "aptitude", "difficulty": "mid", "hints": ["Calculate work done in 4 days", "Find remaining work"], "topics": ["work-time", "partnership"]},
-                
-                # Wipro Previous Year
-                {"question": "The sum of three numbers is 98. The ratio of first to second is 2:3 and second to third is 5:8. Find the second number.", "category": "aptitude", "difficulty": "mid", "hints": ["Make ratios comparable", "10:15:24"], "topics": ["ratio-proportion", "equations"]},
-                
-                # Cognizant Previous Year
-                {"question": "A sum of ₹12,000 is divided among A, B, C such that A gets 40% more than B, and B gets 20% more than C. Find C's share.", "category": "aptitude", "difficulty": "mid", "hints": ["Let C = x, B = 1.2x, A = 1.68x"], "topics": ["percentage", "distribution"]},
-                
-                # Accenture Previous Year
-                {"question": "A boat travels 24 km upstream and 28 km downstream in 5 hours. Same boat travels 30 km upstream and 21 km downstream in 6.5 hours. Find speed of boat in still water.", "category": "aptitude", "difficulty": "senior", "hints": ["Let boat speed = b, stream = s", "Solve simultaneous equations"], "topics": ["boats-streams", "equations"]},
-            ],
-            "technical": [
-                # DSA - Entry Level
-                {"question": "What is the time complexity of binary search?", "category": "technical", "difficulty": "entry", "hints": ["Divide and conquer", "O(log n)"], "topics": ["dsa", "algorithms"]},
-                {"question": "Explain the difference between an array and a linked list", "category": "technical", "difficulty": "entry", "hints": ["Memory layout", "Access time"], "topics": ["dsa", "data-structures"]},
-                {"question": "What is a stack and where is it used?", "category": "technical", "difficulty": "entry", "hints": ["LIFO", "Function calls"], "topics": ["dsa", "data-structures"]},
-                {"question": "Explain Big O notation with examples", "category": "technical", "difficulty": "entry", "hints": ["Time complexity", "Growth rate"], "topics": ["dsa", "complexity"]},
-                
-                # DSA - Mid Level
-                {"question": "How do you detect a cycle in a linked list?", "category": "technical", "difficulty": "mid", "hints": ["Floyd's algorithm", "Two pointers"], "topics": ["dsa", "algorithms"]},
-                {"question": "Implement a LRU cache with O(1) operations", "category": "technical", "difficulty": "mid", "hints": ["HashMap + DoublyLinkedList", "eviction policy"], "topics": ["dsa", "design"]},
-                {"question": "Explain different tree traversal algorithms", "category": "technical", "difficulty": "mid", "hints": ["Inorder, Preorder, Postorder", "BFS vs DFS"], "topics": ["dsa", "trees"]},
-                
-                # DSA - Senior Level
-                {"question": "Design and implement a consistent hashing algorithm", "category": "technical", "difficulty": "senior", "hints": ["Hash ring", "Load balancing"], "topics": ["dsa", "distributed-systems"]},
-                {"question": "Explain dynamic programming with a complex example", "category": "technical", "difficulty": "senior", "hints": ["Memoization", "Optimal substructure"], "topics": ["dsa", "algorithms"]},
-                
-                # System Design - Entry Level
-                {"question": "What is horizontal vs vertical scaling?", "category": "technical", "difficulty": "entry", "hints": ["Scale out vs scale up", "Load distribution"], "topics": ["system-design", "scalability"]},
-                {"question": "Explain what a load balancer does", "category": "technical", "difficulty": "entry", "hints": ["Traffic distribution", "High availability"], "topics": ["system-design", "infrastructure"]},
-                
-                # System Design - Mid Level
-                {"question": "Design a URL shortening service like bit.ly", "category": "technical", "difficulty": "mid", "hints": ["Base62 encoding", "Database design"], "topics": ["system-design", "scalability"]},
-                {"question": "How would you design a distributed cache?", "category": "technical", "difficulty": "mid", "hints": ["Cache eviction", "Consistency"], "topics": ["system-design", "caching"]},
-                {"question": "Explain the CAP theorem with real examples", "category": "technical", "difficulty": "mid", "hints": ["Consistency, Availability, Partition tolerance"], "topics": ["system-design", "distributed-systems"]},
-                
-                # System Design - Senior Level
-                {"question": "Design a globally distributed social media feed like Twitter", "category": "technical", "difficulty": "senior", "hints": ["Fan-out on write vs read", "Eventual consistency"], "topics": ["system-design", "scalability"]},
-                {"question": "Design a rate limiting system for an API gateway", "category": "technical", "difficulty": "senior", "hints": ["Token bucket", "Sliding window"], "topics": ["system-design", "security"]},
-                
-                # Java - Entry Level
-                {"question": "What is the difference between == and equals() in Java?", "category": "technical", "difficulty": "entry", "hints": ["Reference vs value", "Object comparison"], "topics": ["java", "fundamentals"]},
-                {"question": "Explain Java access modifiers", "category": "technical", "difficulty": "entry", "hints": ["public, private, protected", "Encapsulation"], "topics": ["java", "oop"]},
-                
-                # Java - Mid Level
-                {"question": "How does HashMap work internally in Java?", "category": "technical", "difficulty": "mid", "hints": ["Hashing, buckets", "Collision handling"], "topics": ["java", "collections"]},
-                {"question": "Explain Java Stream API and its benefits", "category": "technical", "difficulty": "mid", "hints": ["Functional programming", "Lazy evaluation"], "topics": ["java", "streams"]},
-                {"question": "What are Java memory leaks and how do you prevent them?", "category": "technical", "difficulty": "mid", "hints": ["GC roots", "Strong references"], "topics": ["java", "memory-management"]},
-                
-                # Java - Senior Level
-                {"question": "Explain Java concurrency utilities and best practices", "category": "technical", "difficulty": "senior", "hints": ["Executors, CompletableFuture", "Thread safety"], "topics": ["java", "concurrency"]},
-                
-                # React - Entry Level
-                {"question": "What is the difference between state and props in React?", "category": "technical", "difficulty": "entry", "hints": ["Mutable vs immutable", "Data flow"], "topics": ["react", "fundamentals"]},
-                {"question": "Explain the Virtual DOM in React", "category": "technical", "difficulty": "entry", "hints": ["Reconciliation", "Performance"], "topics": ["react", "internals"]},
-                
-                # React - Mid Level
-                {"question": "How does useEffect hook work?", "category": "technical", "difficulty": "mid", "hints": ["Dependencies array", "Cleanup function"], "topics": ["react", "hooks"]},
-                {"question": "Explain React Context API and when to use it", "category": "technical", "difficulty": "mid", "hints": ["Props drilling", "Global state"], "topics": ["react", "state-management"]},
-                {"question": "What are React optimization techniques?", "category": "technical", "difficulty": "mid", "hints": ["useMemo, useCallback", "React.memo"], "topics": ["react", "performance"]},
-                
-                # React - Senior Level
-                {"question": "Design a scalable React application architecture", "category": "technical", "difficulty": "senior", "hints": ["Component patterns", "State management"], "topics": ["react", "architecture"]},
-                
-                # Python - Entry Level
-                {"question": "What are list comprehensions in Python?", "category": "technical", "difficulty": "entry", "hints": ["Concise syntax", "Filtering"], "topics": ["python", "fundamentals"]},
-                {"question": "Explain the difference between list and tuple", "category": "technical", "difficulty": "entry", "hints": ["Mutable vs immutable", "Performance"], "topics": ["python", "data-structures"]},
-                
-                # Python - Mid Level
-                {"question": "How do decorators work in Python?", "category": "technical", "difficulty": "mid", "hints": ["Function wrappers", "@ syntax"], "topics": ["python", "advanced"]},
-                {"question": "Explain Python generators and yield", "category": "technical", "difficulty": "mid", "hints": ["Lazy evaluation", "Memory efficiency"], "topics": ["python", "generators"]},
-                {"question": "What is the GIL in Python?", "category": "technical", "difficulty": "mid", "hints": ["Global Interpreter Lock", "Threading limitations"], "topics": ["python", "concurrency"]},
-                
-                # Python - Senior Level
-                {"question": "Explain Python metaclasses and their use cases", "category": "technical", "difficulty": "senior", "hints": ["Class creation", "ORM implementations"], "topics": ["python", "advanced"]},
-                
-                # Node.js - Entry Level
-                {"question": "What is the Node.js event loop?", "category": "technical", "difficulty": "entry", "hints": ["Non-blocking I/O", "Callback queue"], "topics": ["nodejs", "fundamentals"]},
-                {"question": "Explain callback functions in Node.js", "category": "technical", "difficulty": "entry", "hints": ["Asynchronous operations", "Error-first callbacks"], "topics": ["nodejs", "async"]},
-                
-                # Node.js - Mid Level
-                {"question": "How do you handle errors in Express.js middleware?", "category": "technical", "difficulty": "mid", "hints": ["Error handling middleware", "next(err)"], "topics": ["nodejs", "express"]},
-                {"question": "Explain streams in Node.js", "category": "technical", "difficulty": "mid", "hints": ["Readable, Writable", "Pipe"], "topics": ["nodejs", "streams"]},
-                
-                # Node.js - Senior Level
-                {"question": "Design a scalable Node.js microservices architecture", "category": "technical", "difficulty": "senior", "hints": ["Service communication", "Load balancing"], "topics": ["nodejs", "architecture"]},
-                
-                # Database - Entry Level
-                {"question": "What is the difference between SQL and NoSQL?", "category": "technical", "difficulty": "entry", "hints": ["Schema", "Scalability"], "topics": ["database", "fundamentals"]},
-                {"question": "Explain database normalization", "category": "technical", "difficulty": "entry", "hints": ["1NF, 2NF, 3NF", "Redundancy"], "topics": ["database", "design"]},
-                
-                # Database - Mid Level
-                {"question": "What are database indexes and how do they work?", "category": "technical", "difficulty": "mid", "hints": ["B-tree", "Query performance"], "topics": ["database", "optimization"]},
-                {"question": "Explain ACID properties in databases", "category": "technical", "difficulty": "mid", "hints": ["Atomicity, Consistency", "Transactions"], "topics": ["database", "transactions"]},
-                
-                # Database - Senior Level
-                {"question": "Design a database sharding strategy", "category": "technical", "difficulty": "senior", "hints": ["Partition key", "Rebalancing"], "topics": ["database", "scalability"]},
-                
-                # Cloud - Mid Level
-                {"question": "What are the benefits of serverless architecture?", "category": "technical", "difficulty": "mid", "hints": ["Auto-scaling", "Pay-per-use"], "topics": ["cloud", "serverless"]},
-                {"question": "Explain container orchestration with Kubernetes", "category": "technical", "difficulty": "mid", "hints": ["Pods, Services", "Auto-scaling"], "topics": ["cloud", "kubernetes"]},
-                
-                # DevOps - Mid Level
-                {"question": "Explain CI/CD pipeline best practices", "category": "technical", "difficulty": "mid", "hints": ["Automated testing", "Deployment stages"], "topics": ["devops", "ci-cd"]},
-                {"question": "What is Infrastructure as Code?", "category": "technical", "difficulty": "mid", "hints": ["Terraform, CloudFormation", "Version control"], "topics": ["devops", "iac"]},
-                
-                # Microservices - Mid Level
-                {"question": "What are the challenges of microservices?", "category": "technical", "difficulty": "mid", "hints": ["Distributed systems", "Network latency"], "topics": ["microservices", "challenges"]},
-                {"question": "Explain service discovery in microservices", "category": "technical", "difficulty": "mid", "hints": ["Service registry", "Health checks"], "topics": ["microservices", "architecture"]},
-                
-                # General - All Levels
-                {"question": "What are RESTful API design principles?", "category": "technical", "difficulty": "mid", "hints": ["HTTP methods", "Stateless"], "topics": ["api", "design"]},
-                {"question": "Explain OAuth 2.0 authentication flow", "category": "technical", "difficulty": "mid", "hints": ["Authorization code", "Access tokens"], "topics": ["security", "auth"]},
-            ],
-            "behavioral": [
-                # Entry Level
-                {"question": "Tell me about a time you had to learn something new quickly", "category": "behavioral", "difficulty": "entry", "hints": ["Learning approach", "Adaptability"], "topics": ["learning", "growth"]},
-                {"question": "Describe a challenging bug you fixed", "category": "behavioral", "difficulty": "entry", "hints": ["Problem-solving", "Technical approach"], "topics": ["debugging", "problem-solving"]},
-                {"question": "How do you handle feedback on your work?", "category": "behavioral", "difficulty": "entry", "hints": ["Growth mindset", "Constructive response"], "topics": ["feedback", "improvement"]},
-                {"question": "Tell me about a successful project you completed", "category": "behavioral", "difficulty": "entry", "hints": ["Impact", "Your contribution"], "topics": ["achievement", "delivery"]},
-                
-                # Mid Level
-                {"question": "Tell me about a time you faced a difficult challenge at work", "category": "behavioral", "difficulty": "mid", "hints": ["STAR method", "Problem-solving"], "topics": ["problem-solving", "resilience"]},
-                {"question": "Describe a situation where you had to work with a difficult team member", "category": "behavioral", "difficulty": "mid", "hints": ["Conflict resolution", "Communication"], "topics": ["teamwork", "communication"]},
-                {"question": "Tell me about a time you failed and what you learned", "category": "behavioral", "difficulty": "mid", "hints": ["Self-awareness", "Growth mindset"], "topics": ["learning", "resilience"]},
-                {"question": "Describe a situation where you had to meet a tight deadline", "category": "behavioral", "difficulty": "mid", "hints": ["Time management", "Prioritization"], "topics": ["productivity", "pressure"]},
-                {"question": "Tell me about a time you disagreed with a technical decision", "category": "behavioral", "difficulty": "mid", "hints": ["Technical reasoning", "Collaboration"], "topics": ["decision-making", "teamwork"]},
-                {"question": "Describe a project where you had to balance competing priorities", "category": "behavioral", "difficulty": "mid", "hints": ["Trade-offs", "Stakeholder management"], "topics": ["prioritization", "decision-making"]},
-                
-                # Senior Level
-                {"question": "Describe your experience leading a technical team", "category": "behavioral", "difficulty": "senior", "hints": ["Leadership style", "Team development"], "topics": ["leadership", "management"]},
-                {"question": "Tell me about a time you made an architectural decision", "category": "behavioral", "difficulty": "senior", "hints": ["Technical trade-offs", "Long-term impact"], "topics": ["architecture", "decision-making"]},
-                {"question": "How do you mentor junior developers?", "category": "behavioral", "difficulty": "senior", "hints": ["Coaching approach", "Knowledge transfer"], "topics": ["mentorship", "leadership"]},
-                {"question": "Describe a time you drove a major technical initiative", "category": "behavioral", "difficulty": "senior", "hints": ["Vision", "Execution"], "topics": ["leadership", "initiative"]},
-                {"question": "How do you handle disagreements about technical direction?", "category": "behavioral", "difficulty": "senior", "hints": ["Influence", "Consensus building"], "topics": ["leadership", "collaboration"]},
-            ],
-            "hr": [
-                # Entry Level
-                {"question": "Why do you want to work for our company?", "category": "hr", "difficulty": "entry", "hints": ["Research company", "Align with values"], "topics": ["motivation", "culture-fit"]},
-                {"question": "Where do you see yourself in 5 years?", "category": "hr", "difficulty": "entry", "hints": ["Career goals", "Growth"], "topics": ["career-planning", "ambition"]},
-                {"question": "What is your greatest strength?", "category": "hr", "difficulty": "entry", "hints": ["Job relevant", "Specific examples"], "topics": ["self-awareness", "skills"]},
-                {"question": "What is your greatest weakness?", "category": "hr", "difficulty": "entry", "hints": ["Self-awareness", "Improvement steps"], "topics": ["self-awareness", "growth"]},
-                {"question": "Why did you choose this career path?", "category": "hr", "difficulty": "entry", "hints": ["Passion", "Journey"], "topics": ["career", "motivation"]},
-                {"question": "What motivates you at work?", "category": "hr", "difficulty": "entry", "hints": ["Intrinsic motivation", "Work preferences"], "topics": ["motivation", "values"]},
-                
-                # Mid Level
-                {"question": "What are your salary expectations?", "category": "hr", "difficulty": "mid", "hints": ["Market research", "Value proposition"], "topics": ["negotiation", "compensation"]},
-                {"question": "Why are you leaving your current job?", "category": "hr", "difficulty": "mid", "hints": ["Stay positive", "Growth focused"], "topics": ["career-transition", "motivation"]},
-                {"question": "How do you handle work-life balance?", "category": "hr", "difficulty": "mid", "hints": ["Boundaries", "Productivity"], "topics": ["wellness", "balance"]},
-                {"question": "Describe your ideal work environment", "category": "hr", "difficulty": "mid", "hints": ["Team dynamics", "Culture preferences"], "topics": ["culture-fit", "preferences"]},
-                {"question": "How do you stay updated with technology trends?", "category": "hr", "difficulty": "mid", "hints": ["Learning resources", "Continuous learning"], "topics": ["learning", "growth"]},
-                {"question": "What do you know about our company and products?", "category": "hr", "difficulty": "mid", "hints": ["Research", "Interest"], "topics": ["preparation", "interest"]},
-                
-                # Senior Level
-                {"question": "What is your leadership philosophy?", "category": "hr", "difficulty": "senior", "hints": ["Leadership style", "Team development"], "topics": ["leadership", "management"]},
-                {"question": "How do you build high-performing teams?", "category": "hr", "difficulty": "senior", "hints": ["Hiring", "Team culture"], "topics": ["leadership", "team-building"]},
-                {"question": "Describe your approach to technical decision-making", "category": "hr", "difficulty": "senior", "hints": ["Trade-offs", "Stakeholders"], "topics": ["decision-making", "leadership"]},
-                {"question": "How do you handle underperforming team members?", "category": "hr", "difficulty": "senior", "hints": ["Coaching", "Performance management"], "topics": ["management", "leadership"]},
-                {"question": "What's your vision for the next 3-5 years in your career?", "category": "hr", "difficulty": "senior", "hints": ["Strategic thinking", "Impact"], "topics": ["career-planning", "vision"]},
-            ],
-            "case-study": [
-                {"question": "A major client is experiencing downtime. Walk me through your incident response", "category": "case-study", "difficulty": "mid", "hints": ["Communication", "Root cause analysis"], "topics": ["incident-management", "problem-solving"]},
-                {"question": "Our API response time has doubled in the last week. How would you investigate?", "category": "case-study", "difficulty": "mid", "hints": ["Monitoring", "Profiling"], "topics": ["performance", "debugging"]},
-                {"question": "Design a strategy to migrate a monolithic application to microservices", "category": "case-study", "difficulty": "senior", "hints": ["Incremental migration", "Risk mitigation"], "topics": ["architecture", "migration"]},
-                {"question": "How would you improve the deployment process for a team releasing multiple times a day?", "category": "case-study", "difficulty": "mid", "hints": ["CI/CD", "Automation"], "topics": ["devops", "process"]},
-            ]
-        }
-        
-        questions = fallback_questions.get(category, fallback_questions["technical"])
-        # Filter by difficulty if specified
-        if difficulty:
-            filtered = [q for q in questions if q["difficulty"] == difficulty]
-            if filtered:
-                questions = filtered
-        # Shuffle and return requested count
-        random.shuffle(questions)
-        return questions[:count]
+        return sample_fallback_questions(category, difficulty, count, sub_type=sub_type, company=company)
     
-    def generate_question_set(self, config: dict, count: int = 5) -> list:
-        """Generate a complete set of interview questions upfront"""
+    def generate_question_set(self, config: dict, count: int = 5, spares: int = 0) -> list:
+        """
+        Generate a complete set of interview questions upfront.
+
+        With spares > 0 up to that many extra alternates are appended after the
+        first count questions (fewer if the model returns fewer).
+        """
         print(f"=== GEMINI: generate_question_set called ===")
-        print(f"Initialized: {self.initialized}, Count: {count}")
+        print(f"Initialized: {self.initialized}, Count: {count}, Spares: {spares}")
+        generated = self._generated_aptitude_questions(config, round((count + spares) * APTITUDE_GENERATED_SHARE))
+        if len(generated) >= count + spares:
+            return generated
+        # The model only writes the questions the generator did not cover
+        requested = count + spares - len(generated)
+        count = max(count - len(generated), 1)
         
         if not self.initialized:
             raise Exception("Gemini AI is not initialized. Please check your API key configuration.")
@@ -905,7 +1042,7 @@ Return as JSON:
         
         prompt = f"""You are an expert interviewer preparing a {interview_type} interview{tech_context}{company_context} at {difficulty} level for a {role} position.
 
-Generate exactly {count} diverse interview questions that:
+Generate exactly {requested} diverse interview questions that:
 1. Cover different aspects of the role and technology
 2. Progress naturally in complexity
 3. Are realistic and commonly asked in actual interviews
@@ -916,11 +1053,11 @@ Difficulty Guidelines:
 - mid: Intermediate complexity, practical experience, real-world scenarios
 - senior: Advanced topics, architecture, leadership, complex problem-solving
 
-Return ONLY the questions, one per line, numbered 1-{count}. No additional text or formatting."""
+Return ONLY the questions, one per line, numbered 1-{requested}. No additional text or formatting."""
         
         try:
             print(f"=== GEMINI: Calling API for question set ===")
-            response = self.flash_model.generate_content(prompt)
+            response = self._generate(self.flash_model, prompt, 'question_set')
             questions_text = response.text.strip()
             
             # Parse numbered questions
@@ -928,7 +1065,7 @@ Return ONLY the questions, one per line, numbered 1-{count}. No additional text
             questions = []
             for line in lines:
                 line = line.strip()
-                if line and any(line.startswith(f"{i}.") or line.startswith(f"{i})") for i in range(1, count + 2)):
+                if line and any(line.startswith(f"{i}.") or line.startswith(f"{i})") for i in range(1, requested + 2)):
                     # Remove number prefix
                     question = line.split('.', 1)[-1].split(')', 1)[-1].strip()
                     if question:
@@ -938,9 +1075,12 @@ Return ONLY the questions, one per line, numbered 1-{count}. No additional text
             if len(questions) < count:
                 raise Exception(f"Only got {len(questions)} questions, expected {count}")
             
-            questions = questions[:count]  # Trim to exact count
+            questions = questions[:requested]  # Trim to exact count (plus spares)
             
             print(f"=== GEMINI: Generated {len(questions)} questions ===")
+            if generated:
+                questions += generated
+                random.shuffle(questions)
             return questions
             
         except Exception as e:
@@ -950,13 +1090,32 @@ Return ONLY the questions, one per line, numbered 1-{count}. No additional text
             traceback.print_exc()
             raise Exception(f"Failed to generate question set: {str(e)}")
     
+    def get_fallback_question_set(self, config: dict, count: int) -> list:
+        """Question texts from the built-in bank, for when a generated set is unavailable"""
+        category = config.get('type', 'technical')
+        difficulty = config.get('difficulty', 'mid')
+        generated = self._generated_aptitude_questions(config, round(count * APTITUDE_GENERATED_SHARE))
+        questions = self._get_fallback_questions(category, difficulty, count - len(generated), config.get('subType'), config.get('company'))
+        questions = [q['question'] for q in questions]
+        if generated or category == 'aptitude':
+            # Top up from the generator when the bank runs short
+            questions += generated + self._generated_aptitude_questions(config, count - len(generated) - len(questions), questions)
+            random.shuffle(questions)
+        return questions
+    
+    def _generated_aptitude_questions(self, config: dict, count: int, exclude: list = ()) -> list:
+        """Procedurally generated questions for aptitude interviews; empty for other types"""
+        if config.get('type') != 'aptitude' or count <= 0:
+            return []
+        return generate_aptitude_questions(count, config.get('difficulty', 'mid'), exclude)
+    
     def generate_chat_response(self, prompt: str) -> str:
         """Generate response for AI chat assistant"""
         if not self.initialized:
             return "I'm here to help with interview preparation! Ask me about technical concepts, interview strategies, or career advice."
         
         try:
-            response = self.flash_model.generate_content(prompt)
+            response = self._generate(self.flash_model, prompt, 'chat')
             return response.text.strip()
         except Exception as e:
             print(f"Chat API error: {e}")
@@ -977,51 +1136,16 @@ Return ONLY the questions, one per line, numbered 1-{count}. No additional text
             return [q['question'] for q in fallback]
 
     def _get_fallback_practice_questions(self, category: str, difficulty: str, count: int = 5):
-        questions_pool = {
-            'technical': {
-                'entry': [
-                    'What are the four pillars of Object-Oriented Programming?',
-                    'Explain the difference between stack and heap memory.',
-                    'What is the difference between GET and POST HTTP methods?',
-                    'How do you reverse a string in your preferred language?',
-                    'What is the time complexity of binary search?'
-                ],
-                'mid': [
-                    'Explain the SOLID principles in software design.',
-                    'How does a HashMap work internally?',
-                    'What is the difference between Authentication and Authorization?',
-                    'How would you find duplicates in an array efficiently?',
-                    'Explain the CAP theorem in distributed systems.'
-                ],
-                'senior': [
-                    'Design a microservices architecture for an e-commerce platform.',
-                    'How would you implement database sharding?',
-                    'Explain eventual consistency and when to use it.',
-                    'Design a rate limiter for an API.',
-                    'How would you handle cache invalidation in a distributed system?'
-                ]
-            },
-            'behavioral': {
-                'entry': ['Tell me about a time you learned a new technology quickly.', 'Describe a challenging bug you fixed.'],
-                'mid': ['Describe a situation where you disagreed with a technical decision.', 'How do you handle trade-offs in project planning?'],
-                'senior': ['Describe your experience leading a technical team.', 'How do you make architectural decisions?']
-            },
-            'hr': {
-                'entry': ['Why do you want to work here?', 'What are your career goals?'],
-                'mid': ['Where do you see yourself in 5 years?', 'Describe your ideal work environment.'],
-                'senior': ['What is your leadership philosophy?', 'How do you build high-performing teams?']
-            }
-        }
-        questions_list = questions_pool.get(category, {}).get(difficulty, questions_pool['technical']['mid'])
+        questions_list = sample_fallback_questions(category, difficulty, count, pool=PRACTICE_POOL)
         return [
             {
-                'question': q,
+                'question': q['question'],
                 'category': category,
                 'difficulty': difficulty,
                 'hints': ['Think about best practices and real-world applications'],
                 'topics': [category]
             }
-            for q in questions_list[:count]
+            for q in questions_list
         ]
 
     def _get_fallback_practice_evaluation(self, answer: str):
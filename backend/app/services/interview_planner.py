@@ -0,0 +1,130 @@
+import math
+import os
+from typing import Optional
+
+# Early stopping: end the interview once the overall score is pinned down
+EARLY_STOP_ENABLED = os.getenv('EARLY_STOP_ENABLED', 'false').lower() == 'true'
+EARLY_STOP_MIN_ANSWERS = int(os.getenv('EARLY_STOP_MIN_ANSWERS', '4'))
+EARLY_STOP_CONFIDENCE_BAND = float(os.getenv('EARLY_STOP_CONFIDENCE_BAND', '5'))  # ± score points
+EARLY_STOP_Z = 1.96  # 95% confidence
+
+
+def update_score_stats(stats: Optional[dict], score: float) -> dict:
+    """Welford's running mean/variance, stored on the interview as {n, mean, m2}"""
+    stats = dict(stats or {'n': 0, 'mean': 0.0, 'm2': 0.0})
+    stats['n'] += 1
+    delta = score - stats['mean']
+    stats['mean'] += delta / stats['n']
+    stats['m2'] += delta * (score - stats['mean'])
+    return stats
+
+
+def is_measured_score(result: dict) -> bool:
+    """
+    Whether an evaluation's score reflects the answer: scores from the model or the
+    auto-grader count, prescreened, local fallback and default (unparsed) ones do not
+    """
+    return result.get('score') is not None and not result.get('prescreened') and not result.get('fallback')
+
+
+def score_estimate(stats: Optional[dict]) -> dict:
+    """Mean score with the half-width of its confidence interval"""
+    if not stats or stats.get('n', 0) == 0:
+        return {'answers': 0, 'mean': 0, 'stdDev': 0, 'halfWidth': None}
+    n = stats['n']
+    variance = stats['m2'] / (n - 1) if n > 1 else 0.0
+    half_width = EARLY_STOP_Z * math.sqrt(variance / n) if n > 1 else None
+    return {
+        'answers': n,
+        'mean': round(stats['mean'], 1),
+        'stdDev': round(math.sqrt(variance), 2),
+        'halfWidth': round(half_width, 2) if half_width is not None else None
+    }
+
+
+def should_stop_early(stats: Optional[dict], config: dict) -> Optional[dict]:
+    """
+    Return the score estimate when the interview can end early, otherwise None.
+
+    The band can be overridden per interview with config['confidenceBand'];
+    a band of 0 disables early stopping for that interview.
+    """
+    band = config.get('confidenceBand')
+    band = EARLY_STOP_CONFIDENCE_BAND if band is None else float(band)
+    if not EARLY_STOP_ENABLED or band <= 0:
+        return None
+
+    estimate = score_estimate(stats)
+    if estimate['answers'] < max(EARLY_STOP_MIN_ANSWERS, 2):
+        return None
+    if estimate['halfWidth'] is not None and estimate['halfWidth'] <= band:
+        return estimate
+    return None
+
+
+# Question budget: turn durationMinutes into a planned number of questions
+SECONDS_PER_QUESTION = {
+    'technical': 240,
+    'behavioral': 210,
+    'hr': 150,
+    'case-study': 420,
+    'aptitude': 120,
+}
+QUESTION_OVERHEAD_SECONDS = 45  # Reading the question and the feedback between answers
+MIN_QUESTIONS = 3
+MAX_QUESTIONS = 10  # The interview UI stops at 10 questions
+FOLLOW_UP_SHARE = 0.25  # Share of the budget left for adaptive follow-ups
+
+
+def typical_answer_seconds(past_interviews: list) -> Optional[float]:
+    """Median answer time across the user's previous interviews, if there is enough history"""
+    durations = []
+    for interview in past_interviews or []:
+        for qa in interview.get('qa', []):
+            if qa.get('endTs') and qa.get('startTs'):
+                seconds = (qa['endTs'] - qa['startTs']) / 1000
+                if 5 <= seconds <= 20 * 60:
+                    durations.append(seconds)
+    if len(durations) < 5:
+        return None
+    durations.sort()
+    middle = len(durations) // 2
+    return durations[middle] if len(durations) % 2 else (durations[middle - 1] + durations[middle]) / 2
+
+
+def plan_question_budget(config: dict, past_interviews: list = None) -> dict:
+    """
+    Plan how many questions fit in the interview duration.
+
+    'planned' questions are generated up front in one batch; 'followUps' are
+    left for adaptive generation after the planned ones are answered.
+    """
+    interview_type = config.get('type', 'technical')
+    duration_seconds = int(config.get('durationMinutes') or 30) * 60
+
+    seconds_per_question = SECONDS_PER_QUESTION.get(interview_type, SECONDS_PER_QUESTION['technical'])
+    history_seconds = typical_answer_seconds(past_interviews)
+    if history_seconds:
+        # Blend the default pace with how long this user actually takes
+        seconds_per_question = (seconds_per_question + history_seconds + QUESTION_OVERHEAD_SECONDS) / 2
+
+    budget = max(MIN_QUESTIONS, min(MAX_QUESTIONS, round(duration_seconds / seconds_per_question)))
+    follow_ups = 0 if interview_type == 'aptitude' else int(budget * FOLLOW_UP_SHARE)
+
+    return {
+        'budget': budget,
+        'planned': budget - follow_ups,
+        'followUps': follow_ups,
+        'secondsPerQuestion': round(seconds_per_question),
+        'durationSeconds': duration_seconds,
+    }
+
+
+def has_time_for_another_question(plan: dict, qa_history: list) -> bool:
+    """Whether the remaining interview time still fits (most of) another question"""
+    elapsed = sum(
+        (qa['endTs'] - qa['startTs']) / 1000
+        for qa in qa_history
+        if qa.get('endTs') is not None and qa.get('startTs') is not None
+    ) + QUESTION_OVERHEAD_SECONDS * len(qa_history)
+    return plan['durationSeconds'] - elapsed >= plan['secondsPerQuestion'] / 2
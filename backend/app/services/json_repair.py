@@ -0,0 +1,236 @@
+import json
+import re
+import threading
+from typing import Any, Optional
+
+# Tolerant parsing for JSON produced by the LLM: code fences, trailing commas,
+# unescaped quotes/newlines inside strings, Python literals and truncated output
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+class ParseMetrics:
+    """
+    Counts clean parses, successful repairs and real failures per response kind.
+
+    'salvaged' is a subset of 'failed': responses whose JSON was unrecoverable
+    but whose key fields could still be extracted with salvage_fields.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, kind: str, outcome: str):
+        with self._lock:
+            entry = self._stats.setdefault(kind, {'clean': 0, 'repaired': 0, 'failed': 0, 'salvaged': 0})
+            entry[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {kind: dict(entry) for kind, entry in self._stats.items()}
+
+
+parse_metrics = ParseMetrics()
+
+
+def _strip_fences(text: str) -> str:
+    match = _FENCE_RE.search(text)
+    if match:
+        return match.group(1)
+    # Truncated output can have an opening fence without a closing one
+    return re.sub(r"^\s*```(?:json|JSON)?", "", text)
+
+
+def _next_significant(text: str, index: int) -> str:
+    while index < len(text) and text[index] in ' \t\r\n':
+        index += 1
+    return text[index] if index < len(text) else ''
+
+
+def _closes_string(text: str, index: int) -> bool:
+    """Whether the quote at index ends the current string (vs. an unescaped quote inside it)"""
+    following = _next_significant(text, index + 1)
+    if following in ('}', ']', ':', ''):
+        return True
+    if following != ',':
+        return False
+    # After a comma, the next element has to start right away
+    rest = text[text.index(',', index + 1) + 1:].lstrip()
+    return not rest or rest[0] in '"{[}]-' or rest[0].isdigit() or rest.startswith(('true', 'false', 'null'))
+
+
+def _close(out: list, stack: list) -> str:
+    tail = ''.join(out).rstrip()
+    # Drop a dangling comma, or a key/colon whose value never arrived
+    tail = re.sub(r',\s*$', '', tail)
+    tail = re.sub(r',?\s*"[^"]*"\s*:\s*$', '', tail)
+    return tail + ''.join('}' if opener == '{' else ']' for opener in reversed(stack))
+
+
+def _repair(text: str) -> Optional[Any]:
+    """Single pass that rewrites the broken parts, then closes whatever is still open"""
+    out = []
+    stack = []
+    checkpoints = []  # (output length, open brackets) after each complete element
+    in_string = False
+    escaped = False
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(char)
+            elif char == '\\':
+                escaped = True
+                out.append(char)
+            elif char == '"':
+                if _closes_string(text, i):
+                    in_string = False
+                    out.append(char)
+                else:
+                    out.append('\\"')  # quote inside a string value
+            elif char == '\n':
+                out.append('\\n')
+            elif char == '\r':
+                pass
+            elif char == '\t':
+                out.append('\\t')
+            else:
+                out.append(char)
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in '{[':
+            stack.append(char)
+            out.append(char)
+        elif char in '}]':
+            if not stack:
+                break
+            # Trailing comma before a closing bracket
+            while out and out[-1] in ' \t\r\n':
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+            stack.pop()
+            out.append('}' if char == '}' else ']')
+            checkpoints.append((len(out), list(stack)))
+            if not stack:
+                break
+        elif char == ',':
+            checkpoints.append((len(out), list(stack)))
+            out.append(char)
+        elif char.isalpha():
+            match = re.match(r'[A-Za-z]+', text[i:])
+            word = match.group(0)
+            if _next_significant(text, i + len(word)) == ':':
+                out.append(f'"{word}"')  # unquoted key
+            else:
+                out.append(_PY_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(char)
+        i += 1
+
+    if in_string:
+        out.append('"')
+
+    candidates = [_close(out, stack)] if stack or in_string else [''.join(out)]
+    # Truncated output: fall back to the last complete elements
+    for length, open_stack in reversed(checkpoints[-5:]):
+        candidates.append(_close(out[:length], open_stack))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_llm_json(text: str, expect: str = 'object', kind: str = 'generic') -> Optional[Any]:
+    """
+    Parse a JSON object or array out of an LLM response.
+
+    Returns the parsed value (dict for expect='object', list for expect='array')
+    or None when nothing usable could be recovered. Outcomes are counted in
+    parse_metrics under the given kind.
+    """
+    opener = '{' if expect == 'object' else '['
+    closer = '}' if expect == 'object' else ']'
+    expected_type = dict if expect == 'object' else list
+
+    if not text:
+        parse_metrics.record(kind, 'failed')
+        return None
+
+    start_idx = text.find(opener)
+    end_idx = text.rfind(closer) + 1
+    if start_idx != -1 and end_idx > start_idx:
+        try:
+            value = json.loads(text[start_idx:end_idx])
+            if isinstance(value, expected_type):
+                parse_metrics.record(kind, 'clean')
+                return value
+        except ValueError:
+            pass
+
+    body = _strip_fences(text)
+    start_idx = body.find(opener)
+    if start_idx != -1:
+        value = _repair(body[start_idx:])
+        if isinstance(value, expected_type):
+            parse_metrics.record(kind, 'repaired')
+            return value
+
+    parse_metrics.record(kind, 'failed')
+    return None
+
+
+def salvage_fields(text: str, string_fields: tuple = (), number_fields: tuple = (), kind: str = 'generic') -> dict:
+    """Last resort: pull individual "key": value pairs out of unparseable text"""
+    text = text or ''
+    fields = {}
+    for field in number_fields:
+        match = re.search(rf'"?{field}"?\s*[:=]\s*"?(\d+(?:\.\d+)?)', text)
+        if match:
+            fields[field] = float(match.group(1))
+    for field in string_fields:
+        match = re.search(rf'"{field}"\s*:\s*"((?:[^"\\]|\\.)*)', text, re.DOTALL)
+        if match and match.group(1).strip():
+            fields[field] = match.group(1).replace('\\n', '\n').replace('\\"', '"').strip()
+    if fields:
+        parse_metrics.record(kind, 'salvaged')
+    return fields
+
+
+def coerce_score(value, default: int = 70) -> int:
+    """Scores arrive as 75, 75.5, "75", "75/100" or "8/10"; normalize to an int in 0-100"""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return int(round(min(100, max(0, value))))
+    if isinstance(value, str):
+        match = re.search(r'(\d+(?:\.\d+)?)\s*(?:/\s*(\d+))?', value)
+        if match:
+            score = float(match.group(1))
+            if match.group(2) and float(match.group(2)) > 0:
+                score = score * 100 / float(match.group(2))
+            return int(round(min(100, max(0, score))))
+    return default
+
+
+def coerce_str_list(value) -> list:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(item) for item in value if item not in (None, '')]
+    return []
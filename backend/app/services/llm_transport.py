@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Optional
+
+import google.generativeai as genai
+
+# Warm gRPC channels to the Gemini API, shared by every module that calls the LLM
+GEMINI_HOST = 'generativelanguage.googleapis.com:443'
+CHANNEL_POOL_SIZE = int(os.getenv('GEMINI_CHANNEL_POOL_SIZE', '2'))
+CONNECT_TIMEOUT_SECONDS = float(os.getenv('GEMINI_CONNECT_TIMEOUT', '5'))
+KEEPALIVE_INTERVAL_SECONDS = float(os.getenv('GEMINI_KEEPALIVE_SECONDS', '240'))
+
+# HTTP/2 PINGs keep idle connections from being dropped by NATs and load balancers
+CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 60000),
+    ('grpc.keepalive_timeout_ms', 20000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+]
+
+
+class _PooledChannel:
+    """One gRPC channel and its client, with connectivity tracking"""
+
+    def __init__(self, index: int, api_key: str, metrics: 'TransportMetrics'):
+        import grpc
+        from google.auth import api_key as api_key_credentials
+        from google.ai import generativelanguage as glm
+        from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc import GenerativeServiceGrpcTransport
+
+        self.index = index
+        self.metrics = metrics
+        self.state = None
+        self.last_used = 0.0
+        self.channel = GenerativeServiceGrpcTransport.create_channel(
+            GEMINI_HOST,
+            credentials=api_key_credentials.Credentials(api_key),
+            options=CHANNEL_OPTIONS
+        )
+        self.client = glm.GenerativeServiceClient(
+            transport=GenerativeServiceGrpcTransport(host=GEMINI_HOST, channel=self.channel)
+        )
+        self._ready = grpc.ChannelConnectivity.READY
+        self.channel.subscribe(self._on_state_change, try_to_connect=False)
+
+    def _on_state_change(self, state):
+        if state == self._ready and self.state != self._ready:
+            self.metrics.record_connect(self.index)
+        self.state = state
+
+    @property
+    def connected(self) -> bool:
+        return self.state == self._ready
+
+    def connect(self, timeout: float) -> bool:
+        """Resolve DNS and complete the TLS/HTTP2 handshake without sending a request"""
+        import grpc
+        try:
+            grpc.channel_ready_future(self.channel).result(timeout=timeout)
+            return True
+        except grpc.FutureTimeoutError:
+            return False
+
+    def close(self):
+        self.channel.close()
+
+
+class _PooledGenerativeClient:
+    """Stands in for GenerativeServiceClient on GenerativeModel, spreading calls over the pool"""
+
+    def __init__(self, transport: 'LLMTransport'):
+        self._transport = transport
+
+    def __getattr__(self, name):
+        pooled = self._transport._next_channel()
+        self._transport.metrics.record_request(pooled.index, reused=pooled.connected)
+        pooled.last_used = time.monotonic()
+        return getattr(pooled.client, name)
+
+
+class TransportMetrics:
+    """Thread-safe connection reuse counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'reusedConnection': 0,
+            'coldConnection': 0,
+            'connects': 0,
+            'warmups': 0,
+            'warmupFailures': 0,
+            'keepalives': 0,
+            'keepaliveFailures': 0,
+        }
+        self._per_channel = {}
+
+    def _channel(self, index: int) -> dict:
+        if index not in self._per_channel:
+            self._per_channel[index] = {'requests': 0, 'connects': 0}
+        return self._per_channel[index]
+
+    def record_request(self, index: int, reused: bool):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['reusedConnection' if reused else 'coldConnection'] += 1
+            self._channel(index)['requests'] += 1
+
+    def record_connect(self, index: int):
+        with self._lock:
+            self._stats['connects'] += 1
+            self._channel(index)['connects'] += 1
+
+    def record(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests = self._stats['requests']
+            return {
+                **self._stats,
+                'reuseRate': round(self._stats['reusedConnection'] / requests, 3) if requests else None,
+                'channels': {str(k): dict(v) for k, v in self._per_channel.items()}
+            }
+
+
+class LLMTransport:
+    """
+    Single place that configures google-generativeai and hands out models.
+
+    With the gRPC transport (the default) every model shares a small pool of
+    long-lived channels that are pre-connected at startup and kept warm, so
+    requests do not pay DNS, TLS and HTTP/2 setup after a cold start or an
+    idle period. With GEMINI_TRANSPORT=rest the library's own clients are used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._api_key = None
+        self._transport = os.getenv('GEMINI_TRANSPORT', 'grpc').lower()
+        self._channels = []
+        self._round_robin = None
+        self._client = None
+        self._models = {}
+        self._keepalive_task = None
+        self.metrics = TransportMetrics()
+
+    @property
+    def configured(self) -> bool:
+        return self._api_key is not None
+
+    def configure(self, api_key: Optional[str]) -> bool:
+        """Configure the SDK once per process; later calls with the same key are no-ops"""
+        if not api_key:
+            return False
+        with self._lock:
+            if self._api_key == api_key:
+                return True
+            # genai.configure() drops the SDK's cached clients, so only call it when the key changes
+            genai.configure(api_key=api_key, transport=None if self._transport == 'grpc' else self._transport)
+            self._close_channels()
+            if self._transport == 'grpc':
+                self._channels = [_PooledChannel(i, api_key, self.metrics) for i in range(max(CHANNEL_POOL_SIZE, 1))]
+                self._round_robin = itertools.cycle(self._channels)
+                self._client = _PooledGenerativeClient(self)
+            self._models = {}
+            self._api_key = api_key
+            return True
+
+    def _next_channel(self) -> _PooledChannel:
+        with self._lock:
+            return next(self._round_robin)
+
+    def get_model(self, model_name: str):
+        """Cached GenerativeModel bound to the pooled connections"""
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                if self._client is not None:
+                    model._client = self._client
+                self._models[model_name] = model
+            return model
+
+    def warm_up(self) -> int:
+        """Pre-connect every channel in the pool; returns how many are ready"""
+        ready = 0
+        for pooled in list(self._channels):
+            self.metrics.record('warmups')
+            if pooled.connect(CONNECT_TIMEOUT_SECONDS):
+                ready += 1
+            else:
+                self.metrics.record('warmupFailures')
+                print(f"[TRANSPORT] Channel {pooled.index} did not connect within {CONNECT_TIMEOUT_SECONDS}s")
+        if self._channels:
+            print(f"[TRANSPORT] {ready}/{len(self._channels)} Gemini channels warm")
+        return ready
+
+    def send_keepalives(self):
+        """Send a count_tokens call (free, tiny) on channels that have been idle for a full interval"""
+        if not self._models:
+            return
+        from google.ai import generativelanguage as glm
+        model_name = next(iter(self._models.values())).model_name
+        request = glm.CountTokensRequest(model=model_name, contents=[glm.Content(parts=[glm.Part(text='ping')])])
+        now = time.monotonic()
+        for pooled in list(self._channels):
+            if now - pooled.last_used < KEEPALIVE_INTERVAL_SECONDS:
+                continue
+            try:
+                pooled.client.count_tokens(request, timeout=CONNECT_TIMEOUT_SECONDS)
+                pooled.last_used = now
+                self.metrics.record('keepalives')
+            except Exception as e:
+                self.metrics.record('keepaliveFailures')
+                print(f"[TRANSPORT] Keepalive on channel {pooled.index} failed: {type(e).__name__}")
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL_SECONDS)
+            await asyncio.to_thread(self.send_keepalives)
+
+    async def start(self):
+        """App startup: pre-connect the pool and start the keepalive loop"""
+        if not self._channels:
+            return
+        await asyncio.to_thread(self.warm_up)
+        if KEEPALIVE_INTERVAL_SECONDS > 0 and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop(self):
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        with self._lock:
+            self._close_channels()
+
+    def _close_channels(self):
+        for pooled in self._channels:
+            pooled.close()
+        self._channels = []
+
+    def snapshot(self) -> dict:
+        return {
+            'transport': self._transport,
+            'configured': self.configured,
+            'poolSize': len(self._channels),
+            'channelsReady': sum(1 for pooled in self._channels if pooled.connected),
+            'models': sorted(self._models),
+            **self.metrics.snapshot()
+        }
+
+
+# Singleton instance
+llm_transport = LLMTransport()
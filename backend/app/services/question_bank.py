@@ -0,0 +1,395 @@
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Optional
+from app.services.firebase_service import firebase_service
+
+# Built-in question bank used when Gemini is unavailable. Questions live in a
+# JSON Lines file (one question per line) that is loaded on first use and
+# reloaded when it changes on disk, plus admin imports stored in Firestore.
+QUESTION_BANK_PATH = os.getenv(
+    'QUESTION_BANK_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'question_bank.jsonl')
+)
+RELOAD_CHECK_SECONDS = float(os.getenv('QUESTION_BANK_RELOAD_SECONDS', '5'))
+IMPORTED_REFRESH_SECONDS = float(os.getenv('QUESTION_BANK_IMPORT_REFRESH_SECONDS', '300'))
+
+DEFAULT_CATEGORY = 'technical'
+DEFAULT_DIFFICULTY = 'mid'
+INTERVIEW_POOL = 'interview'
+PRACTICE_POOL = 'practice'
+
+# Interview subTypes mapped to the bank topic tags that are relevant to them
+SUBTYPE_TOPICS = {
+    'dsa': ('dsa', 'algorithms', 'data-structures', 'trees', 'complexity'),
+    'system-design': ('system-design', 'scalability', 'distributed-systems', 'caching', 'architecture'),
+    'java': ('java',),
+    'spring-boot': ('java',),
+    'react': ('react', 'hooks', 'state-management'),
+    'python': ('python', 'generators'),
+    'nodejs': ('nodejs', 'express', 'streams'),
+    'microservices': ('microservices', 'distributed-systems'),
+    'cloud': ('cloud', 'serverless', 'kubernetes', 'iac'),
+    'devops': ('devops', 'ci-cd', 'kubernetes', 'iac', 'infrastructure'),
+    'database': ('database', 'transactions'),
+    'fresher': ('fundamentals', 'oop', 'dsa'),
+}
+
+
+def question_id(category: str, text: str) -> str:
+    normalized = ' '.join(text.lower().split())
+    return hashlib.sha1(f"{category}|{normalized}".encode('utf-8')).hexdigest()[:12]
+
+
+def _freeze(record: dict) -> MappingProxyType:
+    return MappingProxyType({
+        'id': record.get('id') or question_id(record['category'], record['question']),
+        'question': record['question'],
+        'category': record['category'],
+        'difficulty': record.get('difficulty') or DEFAULT_DIFFICULTY,
+        'hints': tuple(record.get('hints') or ()),
+        'topics': tuple(record.get('topics') or ()),
+        'companies': tuple(record.get('companies') or ()),
+        'answer': MappingProxyType(dict(record['answer'])) if record.get('answer') else None,
+    })
+
+
+def _tag(kind: str, value: str) -> str:
+    return f"{kind}:{' '.join(str(value).lower().split())}"
+
+
+class BankSnapshot:
+    """
+    One immutable load of the bank file.
+
+    Besides the (category, difficulty) index, each (pool, category) has an
+    inverted index from topic:, difficulty: and company: tags to the
+    positions of its questions. Selections intersect those posting lists and
+    are memoized, so repeated lookups for a config are O(1). The memo is keyed
+    on the tags the bank actually has, so values it does not know (from client
+    configs) share an entry instead of growing it.
+    """
+
+    def __init__(self, records: list, version: int = 0):
+        self.version = version
+        by_category = {}
+        by_level = {}
+        by_id = {}
+        seen = set()
+        for record in records:
+            question = _freeze(record)
+            pool = record.get('pool') or INTERVIEW_POOL
+            if (pool, question['id']) in seen:
+                continue
+            seen.add((pool, question['id']))
+            by_id.setdefault(question['id'], question)
+            by_category.setdefault((pool, question['category']), []).append(question)
+            by_level.setdefault((pool, question['category'], question['difficulty']), []).append(question)
+        self.by_id = MappingProxyType(by_id)
+        self.by_category = MappingProxyType({key: tuple(value) for key, value in by_category.items()})
+        self.by_level = MappingProxyType({key: tuple(value) for key, value in by_level.items()})
+
+        postings = {}
+        for key, questions in self.by_category.items():
+            index = {}
+            for position, question in enumerate(questions):
+                tags = [_tag('difficulty', question['difficulty'])]
+                tags += [_tag('topic', topic) for topic in question['topics']]
+                tags += [_tag('company', company) for company in question['companies']]
+                for tag in tags:
+                    index.setdefault(tag, set()).add(position)
+            postings[key] = MappingProxyType({tag: frozenset(positions) for tag, positions in index.items()})
+        self.postings = MappingProxyType(postings)
+        self._selections = {}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def pool(self, category: str, difficulty: str = None, pool: str = INTERVIEW_POOL) -> tuple:
+        """Questions for the category and difficulty; the whole category if none match that difficulty"""
+        if (pool, category) not in self.by_category:
+            category = DEFAULT_CATEGORY
+        if difficulty:
+            questions = self.by_level.get((pool, category, difficulty))
+            if questions:
+                return questions
+        return self.by_category.get((pool, category), ())
+
+    def _matching(self, key: tuple, tags: list):
+        """Positions carrying any of tags, or None when no question has them"""
+        index = self.postings.get(key, {})
+        matched = set()
+        for tag in tags:
+            matched |= index.get(tag, frozenset())
+        return matched or None
+
+    def _topic_tags(self, sub_type: str) -> list:
+        return [_tag('topic', topic) for topic in SUBTYPE_TOPICS.get(sub_type or '', (sub_type,) if sub_type else ())]
+
+    def covers_sub_type(self, category: str, sub_type: str = None, pool: str = INTERVIEW_POOL) -> bool:
+        """Whether select() can honour the subType; without one any category is covered"""
+        if (pool, category) not in self.by_category:
+            category = DEFAULT_CATEGORY
+        topic_tags = self._topic_tags(sub_type)
+        return not topic_tags or self._matching((pool, category), topic_tags) is not None
+
+    def select(self, category: str, difficulty: str = None, sub_type: str = None, company: str = None, pool: str = INTERVIEW_POOL) -> tuple:
+        """
+        Questions relevant to the config: subType topics ∩ difficulty ∩ company.
+
+        Constraints are relaxed when the intersection is empty, company first,
+        then difficulty; a subType with no matching questions is ignored.
+        """
+        if (pool, category) not in self.by_category:
+            category = DEFAULT_CATEGORY
+        key = (pool, category)
+        index = self.postings.get(key, {})
+
+        def known(tags: list) -> tuple:
+            return tuple(sorted(tag for tag in tags if tag in index))
+
+        topic_tags = known(self._topic_tags(sub_type))
+        level_tags = known([_tag('difficulty', difficulty)] if difficulty else [])
+        company_tags = known([_tag('company', company)] if company else [])
+        cache_key = (pool, category, topic_tags, level_tags, company_tags)
+        cached = self._selections.get(cache_key)
+        if cached is not None:
+            return cached
+
+        questions = self.by_category.get(key, ())
+        topics = self._matching(key, topic_tags) if topic_tags else None
+        level = self._matching(key, level_tags) if level_tags else None
+        employer = self._matching(key, company_tags) if company_tags else None
+
+        # Drop the least important constraint until something matches
+        selected = questions
+        for constraints in ((topics, level, employer), (topics, level), (topics,), (level,)):
+            active = [c for c in constraints if c is not None]
+            if not active:
+                continue
+            positions = active[0].intersection(*active[1:])
+            if positions:
+                selected = tuple(questions[i] for i in sorted(positions))
+                break
+
+        self._selections[cache_key] = selected
+        return selected
+
+
+class QuestionBank:
+    """
+    Lazily loaded, hot-reloaded view of the bank file plus the questions
+    imported by admins. Imports live in Firestore (the file is read-only on
+    serverless hosts and not shared between instances); they are loaded with
+    the file and refreshed in the background every IMPORTED_REFRESH_SECONDS.
+    """
+
+    def __init__(self, path: str = QUESTION_BANK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._file_records = []
+        self._imported = []
+        self._unpublished = False
+        self._mtime = None
+        self._next_check = 0.0
+        self._next_import_refresh = 0.0
+        self._refreshing = False
+        self._import_generation = 0  # Bumped by append(), so a refresh started earlier is dropped
+
+    def _read(self) -> list:
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"[QUESTION BANK] Skipping line {line_number}: {e}")
+                    continue
+                if record.get('question') and record.get('category'):
+                    records.append(record)
+        return records
+
+    def _load_imported(self) -> Optional[list]:
+        try:
+            return [r for r in firebase_service.list_bank_questions() if r.get('question') and r.get('category')]
+        except Exception as e:
+            print(f"[QUESTION BANK] Loading imported questions failed: {e}")
+            return None
+
+    def _rebuild(self):
+        """New snapshot from the file and imported records; the caller holds the lock"""
+        version = (self._snapshot.version + 1) if self._snapshot else 1
+        self._snapshot = BankSnapshot(self._file_records + self._imported, version)
+        self._unpublished = False
+
+    def _refresh_imported(self):
+        """Background reload of imported questions, so imports on other instances show up"""
+        try:
+            generation = self._import_generation
+            imported = self._load_imported()
+            with self._lock:
+                if imported is not None and imported != self._imported and generation == self._import_generation:
+                    self._imported = imported
+                    self._rebuild()
+                    print(f"[QUESTION BANK] Reloaded {len(imported)} imported questions")
+        finally:
+            self._refreshing = False
+
+    def snapshot(self) -> BankSnapshot:
+        """Current bank; re-reads the file at most every RELOAD_CHECK_SECONDS when its mtime changed"""
+        now = time.monotonic()
+        if self._snapshot is not None and now < self._next_check:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is not None and now < self._next_check:
+                return self._snapshot
+            self._next_check = now + RELOAD_CHECK_SECONDS
+            if self._snapshot is None:
+                # First load: imported questions are part of the initial bank
+                self._imported = self._load_imported() or []
+                self._next_import_refresh = now + IMPORTED_REFRESH_SECONDS
+            elif IMPORTED_REFRESH_SECONDS > 0 and now >= self._next_import_refresh and not self._refreshing:
+                self._next_import_refresh = now + IMPORTED_REFRESH_SECONDS
+                self._refreshing = True
+                threading.Thread(target=self._refresh_imported, name='question-bank-refresh', daemon=True).start()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                if self._snapshot is None:
+                    print(f"[QUESTION BANK] Bank file unavailable: {e}")
+                    self._rebuild()
+                return self._snapshot
+            if mtime != self._mtime:
+                try:
+                    self._file_records = self._read()
+                    self._mtime = mtime
+                    self._rebuild()
+                    print(f"[QUESTION BANK] Loaded {len(self._snapshot)} questions from {self.path}")
+                except OSError as e:
+                    print(f"[QUESTION BANK] Reload failed, keeping previous bank: {e}")
+                    if self._snapshot is None:
+                        self._rebuild()
+            return self._snapshot
+
+    def append(self, records: list):
+        """
+        Store imported records in Firestore in one batched write.
+
+        The current snapshot is kept as is; call publish() once the import is
+        done to build a snapshot that includes them.
+        """
+        if not records:
+            return
+        self.snapshot()
+        imported_at = datetime.utcnow().isoformat()
+        stored = [{**record, 'importedAt': imported_at} for record in records]
+        firebase_service.save_bank_questions({
+            f"{record.get('pool', INTERVIEW_POOL)}-{question_id(record['category'], record['question'])}": record
+            for record in stored
+        })
+        with self._lock:
+            self._imported = self._imported + stored
+            self._import_generation += 1
+            self._unpublished = True
+
+    def publish(self) -> BankSnapshot:
+        """Index appended records into a new snapshot without reloading anything"""
+        with self._lock:
+            if self._unpublished:
+                self._rebuild()
+                print(f"[QUESTION BANK] Published {len(self._snapshot)} questions")
+            return self._snapshot
+
+
+question_bank = QuestionBank()
+
+
+def fallback_pool(category: str, difficulty: str = None, pool: str = INTERVIEW_POOL, sub_type: str = None, company: str = None) -> tuple:
+    return question_bank.snapshot().select(category, difficulty, sub_type, company, pool)
+
+
+def lookup_question(category: str, text: str) -> Optional[MappingProxyType]:
+    """Bank question with exactly this text (ignoring case and spacing) in the category or the default category"""
+    by_id = question_bank.snapshot().by_id
+    for candidate in (category or DEFAULT_CATEGORY, DEFAULT_CATEGORY):
+        question = by_id.get(question_id(candidate, text or ''))
+        if question:
+            return question
+    return None
+
+
+def sample_fallback_question(category: str, difficulty: str = None, sub_type: str = None, company: str = None) -> Optional[MappingProxyType]:
+    """One random question, O(1)"""
+    questions = fallback_pool(category, difficulty, sub_type=sub_type, company=company)
+    return questions[random.randrange(len(questions))] if questions else None
+
+
+def sample_fallback_questions(category: str, difficulty: str, count: int, pool: str = INTERVIEW_POOL, sub_type: str = None, company: str = None) -> list:
+    """Up to count distinct random questions, O(count)"""
+    questions = fallback_pool(category, difficulty, pool, sub_type, company)
+    return random.sample(questions, min(count, len(questions)))
+
+
+def _coprime_multiplier(n: int) -> int:
+    if n <= 2:
+        return 1
+    while True:
+        a = random.randrange(1, n)
+        if math.gcd(a, n) == 1:
+            return a
+
+
+def draw_without_replacement(state: dict, category: str, difficulty: str = None, exclude=(), sub_type: str = None, company: str = None) -> Optional[MappingProxyType]:
+    """
+    Next question from a per-interview permutation of the pool, O(1) per draw.
+
+    state (stored on the interview) holds only the permutation i -> (a*i + b) mod n
+    and a cursor, and is updated in place. It is reseeded when the pool changes
+    (e.g. after a bank reload) or is used up. Questions in exclude (already
+    asked) are skipped, so stale state never repeats a question in the interview;
+    None means every question in the pool was already asked.
+    """
+    questions = fallback_pool(category, difficulty, sub_type=sub_type, company=company)
+    n = len(questions)
+    if not n:
+        return None
+
+    pool_key = f"{category}|{difficulty or ''}|{sub_type or ''}|{company or ''}"
+    if state.get('pool') != pool_key or state.get('n') != n or state.get('i', 0) >= n:
+        state.update({'pool': pool_key, 'n': n, 'a': _coprime_multiplier(n), 'b': random.randrange(n), 'i': 0})
+
+    excluded = {' '.join(text.lower().split()) for text in exclude if text}
+    while state['i'] < n:
+        question = questions[(state['a'] * state['i'] + state['b']) % n]
+        state['i'] += 1
+        if ' '.join(question['question'].lower().split()) not in excluded:
+            return question
+    return None
+
+
+def draw_widening(state: dict, category: str, difficulty: str = None, exclude=(), sub_type: str = None, company: str = None) -> Optional[MappingProxyType]:
+    """
+    draw_without_replacement from the config's pool, widening it (any difficulty,
+    then any subType, then any company) while the narrower pool is used up
+    """
+    widenings = dict.fromkeys([
+        (difficulty, sub_type, company),
+        (None, sub_type, company),
+        (None, None, company),
+        (None, None, None),
+    ])
+    for level, topic, employer in widenings:
+        question = draw_without_replacement(state, category, level, exclude, topic, employer)
+        if question:
+            return question
+    return None
@@ -0,0 +1,239 @@
+import asyncio
+import csv
+import json
+import os
+import time
+from typing import AsyncIterator, Optional
+from app.services.aptitude_grader import validate_answer_spec
+from app.services.question_bank import INTERVIEW_POOL, PRACTICE_POOL, question_bank, question_id
+from app.services.question_search import question_search
+
+# Admin bulk import into the question bank (stored in Firestore)
+IMPORT_BATCH_SIZE = int(os.getenv('QUESTION_IMPORT_BATCH_SIZE', '500'))
+MAX_QUESTION_LENGTH = 1000
+MAX_LINE_BYTES = 64 * 1024  # Longer rows are rejected without being buffered
+MAX_REPORTED_ERRORS = 50
+CATEGORIES = ('technical', 'behavioral', 'hr', 'case-study', 'aptitude')
+DIFFICULTIES = ('entry', 'mid', 'senior')
+POOLS = (INTERVIEW_POOL, PRACTICE_POOL)
+LIST_FIELDS = ('hints', 'topics', 'companies')
+CSV_LIST_SEPARATOR = '|'
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """
+    (line number, bytes) for each line of a byte stream, without buffering more
+    than MAX_LINE_BYTES: a longer line is dropped as it arrives and yielded as None
+    """
+    buffer = b''
+    overlong = False
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b'\n')
+        for raw in complete:
+            line_number += 1
+            yield line_number, None if overlong or len(raw) > MAX_LINE_BYTES else raw
+            overlong = False
+        if len(buffer) > MAX_LINE_BYTES:
+            buffer, overlong = b'', True
+    if buffer or overlong:
+        yield line_number + 1, None if overlong else buffer
+
+
+def _overlong(line_number: int) -> tuple:
+    return line_number, None, f"Line longer than {MAX_LINE_BYTES} bytes"
+
+
+def _decode(raw: bytes, line_number: int) -> str:
+    text = raw.decode('utf-8').rstrip('\r')
+    return text.lstrip('\ufeff') if line_number == 1 else text
+
+
+async def _ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    async for line_number, raw in _lines(chunks):
+        if raw is None:
+            yield _overlong(line_number)
+            continue
+        try:
+            text = _decode(raw, line_number).strip()
+            if not text:
+                continue
+            row = json.loads(text)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(row, dict):
+            yield line_number, row, None
+        else:
+            yield line_number, None, "Expected a JSON object"
+
+
+async def _csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """Rows of a CSV with a header line; list fields are separated by '|'"""
+    header = None
+    pending, start = '', 0
+    async for line_number, raw in _lines(chunks):
+        if raw is None:
+            yield _overlong(line_number)
+            continue
+        try:
+            text = _decode(raw, line_number)
+        except ValueError as e:
+            yield line_number, None, f"Invalid UTF-8: {e}"
+            continue
+        # A quoted field can span lines; wait until the quotes balance
+        pending, start = (pending + '\n' + text, start) if pending else (text, line_number)
+        if pending.count('"') % 2:
+            if len(pending) > MAX_LINE_BYTES:
+                yield start, None, f"Quoted field longer than {MAX_LINE_BYTES} bytes"
+                pending = ''
+            continue
+        record, pending = pending, ''
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        row = dict(zip(header, values))
+        for field in LIST_FIELDS:
+            if field in row:
+                row[field] = [item.strip() for item in row[field].split(CSV_LIST_SEPARATOR) if item.strip()]
+        yield start, row, None
+    if pending:
+        yield start, None, "Unterminated quoted field"
+
+
+def validate_row(row: dict) -> tuple:
+    """(bank record, None) for a valid row, otherwise (None, error)"""
+    question = ' '.join(str(row.get('question') or row.get('text') or '').split())
+    if not question:
+        return None, "Missing question"
+    if len(question) > MAX_QUESTION_LENGTH:
+        return None, f"Question longer than {MAX_QUESTION_LENGTH} characters"
+    category = str(row.get('category') or '').strip().lower()
+    if category not in CATEGORIES:
+        return None, f"Unknown category '{category}'"
+    difficulty = str(row.get('difficulty') or 'mid').strip().lower()
+    if difficulty not in DIFFICULTIES:
+        return None, f"Unknown difficulty '{difficulty}'"
+    pool = str(row.get('pool') or INTERVIEW_POOL).strip().lower()
+    if pool not in POOLS:
+        return None, f"Unknown pool '{pool}'"
+
+    record = {'question': question, 'category': category, 'difficulty': difficulty}
+    for field in LIST_FIELDS:
+        values = row.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            return None, f"'{field}' must be a list of strings"
+        values = [v.strip() for v in values if v.strip()]
+        if values or field != 'companies':
+            record[field] = values
+    answer = row.get('answer')
+    if isinstance(answer, str) and answer.strip():
+        # CSV cells hold the canonical answer as a number or a single accepted text
+        try:
+            answer = {'value': float(answer), 'tolerance': float(row.get('tolerance') or 0)}
+        except ValueError:
+            answer = {'accept': [answer.strip()]}
+    if answer:
+        error = validate_answer_spec(answer)
+        if error:
+            return None, error
+        record['answer'] = answer
+    if pool != INTERVIEW_POOL:
+        record['pool'] = pool
+    return record, None
+
+
+class QuestionImporter:
+    """
+    Streams an upload into the bank in batches.
+
+    Each batch is validated, deduplicated against the bank and the upload so
+    far, stored in Firestore in one batched write and added to the search
+    index. The bank snapshot is rebuilt from memory once at the end instead
+    of reloading the bank. Imports run one at a time.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE):
+        self.batch_size = max(batch_size, 1)
+        self._lock = asyncio.Lock()
+
+    def _write_batch(self, rows: list, seen: set, report: dict):
+        records = []
+        for line_number, row in rows:
+            record, error = validate_row(row)
+            if error:
+                self._reject(report, line_number, error)
+                continue
+            key = (record.get('pool', INTERVIEW_POOL), question_id(record['category'], record['question']))
+            if key in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(key)
+            records.append(record)
+        question_bank.append(records)
+        question_search.add_bank_questions([r for r in records if 'pool' not in r])
+        report['imported'] += len(records)
+        report['batches'] += 1
+
+    def _reject(self, report: dict, line_number: int, error: str):
+        report['invalid'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'error': error})
+
+    async def run(self, chunks: AsyncIterator[bytes], fmt: str = 'ndjson') -> dict:
+        started = time.perf_counter()
+        report = {'format': fmt, 'rows': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'batches': 0, 'errors': []}
+        rows = _csv_rows(chunks) if fmt == 'csv' else _ndjson_rows(chunks)
+
+        async with self._lock:
+            snapshot = question_bank.snapshot()
+            seen = {
+                (pool, question['id'])
+                for (pool, _), questions in snapshot.by_category.items()
+                for question in questions
+            }
+            batch = []
+            try:
+                async for line_number, row, error in rows:
+                    report['rows'] += 1
+                    if error:
+                        self._reject(report, line_number, error)
+                        continue
+                    batch.append((line_number, row))
+                    if len(batch) >= self.batch_size:
+                        await asyncio.to_thread(self._write_batch, batch, seen, report)
+                        batch = []
+                if batch:
+                    await asyncio.to_thread(self._write_batch, batch, seen, report)
+            finally:
+                # Publish whatever was written, even if the upload was cut short
+                published = await asyncio.to_thread(question_bank.publish)
+                question_search.bank_published(snapshot.version, published.version)
+
+        report['errors'].sort(key=lambda error: error['line'])
+        report['bankSize'] = len(published)
+        report['tookMs'] = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[QUESTION IMPORT] {report['imported']} imported, {report['duplicates']} duplicates, {report['invalid']} invalid")
+        return report
+
+
+def detect_format(fmt: Optional[str], content_type: str) -> str:
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in ('ndjson', 'csv'):
+            raise ValueError("format must be ndjson or csv")
+        return fmt
+    return 'csv' if 'csv' in (content_type or '').lower() else 'ndjson'
+
+
+# Singleton instance
+question_importer = QuestionImporter()
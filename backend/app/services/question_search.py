@@ -0,0 +1,416 @@
+import base64
+import bisect
+import collections
+import json
+import math
+import os
+import threading
+import uuid
+from types import MappingProxyType
+from typing import Optional
+from app.services.firebase_service import firebase_service
+from app.services.question_bank import INTERVIEW_POOL, lookup_question, question_bank, question_id, _tag
+from app.services.text_tokens import tokenize
+
+# Full-text search over the fallback bank and the shared (daily) question sets.
+# Private sets are not indexed: the search routes are public.
+BM25_K1 = 1.2
+BM25_B = 0.75
+EXHAUSTIVE_CANDIDATES = 2000  # Filters narrower than this are scored in full
+POSTINGS_DEPTH = 50  # Minimum postings read per query term otherwise (at least 2x the limit)
+STORED_SETS_LIMIT = int(os.getenv('QUESTION_SEARCH_STORED_SETS', '1000'))  # Most recent shared sets indexed
+MAX_RESULTS = 100
+DEFAULT_PAGE_SIZE = 20
+FILTER_CACHE_SIZE = 256  # Filter combinations memoized per index
+LISTING_FIELDS = ('id', 'text', 'category', 'difficulty', 'tags', 'companies', 'source')
+
+
+class SearchIndex:
+    """
+    Inverted index over question text, hints and topics.
+
+    Each term maps to the documents containing it, and lazily to those same
+    documents ordered by BM25 term weight, so a ranked query only reads the
+    head of each query term's posting list. Filters are facet posting sets
+    (category:, difficulty:, topic:, company:, source:) that are intersected
+    smallest first; the most recent combinations are memoized. Documents can
+    be appended without a rebuild.
+    """
+
+    def __init__(self, bank_version=None):
+        self.bank_version = bank_version
+        self.generation = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._docs = []
+        self._term_frequencies = []
+        self._lengths = []
+        self._total_length = 0
+        self._ids = {}
+        self._postings = {}
+        self._ranked = {}
+        self._facets = {}
+        self._filtered = collections.OrderedDict()  # filter key -> [positions, positions in index order]
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, record: dict, source: str) -> bool:
+        """Index one question; False when it is already indexed"""
+        text = ' '.join((record.get('question') or '').split())
+        category = ' '.join((record.get('category') or '').lower().split())
+        if not text or not category:
+            return False
+        doc_id = record.get('id') or question_id(category, text)
+        topics = tuple(record.get('topics') or ())
+        hints = tuple(record.get('hints') or ())
+        doc = MappingProxyType({
+            'id': doc_id,
+            'text': text,
+            'category': category,
+            'difficulty': record.get('difficulty') or '',
+            'tags': topics,
+            'companies': tuple(record.get('companies') or ()),
+            'source': source,
+        })
+        frequencies = {}
+        for term in tokenize(' '.join([text, *hints, *topics])):
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+        with self._lock:
+            if doc_id in self._ids:
+                return False
+            position = len(self._docs)
+            self._ids[doc_id] = position
+            self._docs.append(doc)
+            self._term_frequencies.append(frequencies)
+            length = sum(frequencies.values())
+            self._lengths.append(length)
+            self._total_length += length
+            for term in frequencies:
+                self._postings.setdefault(term, []).append(position)
+                self._ranked.pop(term, None)
+            facets = [_tag('category', category), _tag('source', source)]
+            if doc['difficulty']:
+                facets.append(_tag('difficulty', doc['difficulty']))
+            facets += [_tag('topic', topic) for topic in topics]
+            facets += [_tag('company', company) for company in doc['companies']]
+            for facet in facets:
+                self._facets.setdefault(facet, set()).add(position)
+            self._filtered = collections.OrderedDict()
+        return True
+
+    def _weight(self, tf: int, length: int, average_length: float) -> float:
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+
+    def _ranked_postings(self, term: str, average_length: float) -> list:
+        """Postings for term, heaviest first; re-sorted only after the term gets new documents"""
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = sorted(
+                self._postings[term],
+                key=lambda p: self._weight(self._term_frequencies[p][term], self._lengths[p], average_length),
+                reverse=True
+            )
+            self._ranked[term] = ranked
+        return ranked
+
+    def _filter_key(self, filters: list) -> Optional[tuple]:
+        """
+        Memo key of the filters, keeping only facets the index has, so unknown
+        values (filters come from public query strings) never add entries.
+        None when a filter has no known facet and so matches nothing.
+        """
+        key = []
+        for alternatives in filters:
+            known = tuple(sorted({facet for facet in alternatives if facet in self._facets}))
+            if not known:
+                return None
+            key.append(known)
+        return tuple(sorted(key))
+
+    def _matches(self, filters: list) -> list:
+        """[positions, positions in index order or None until listed] for non-empty filters"""
+        key = self._filter_key(filters)
+        if key is None:
+            return [frozenset(), []]
+        entry = self._filtered.get(key)
+        if entry is not None:
+            self._filtered.move_to_end(key)
+            return entry
+        sets = []
+        for alternatives in key:
+            matched = [self._facets[facet] for facet in alternatives]
+            sets.append(matched[0] if len(matched) == 1 else set().union(*matched))
+        sets.sort(key=len)
+        entry = [frozenset(sets[0].intersection(*sets[1:])), None]
+        self._filtered[key] = entry
+        while len(self._filtered) > FILTER_CACHE_SIZE:
+            self._filtered.popitem(last=False)
+        return entry
+
+    def _candidates(self, filters: list) -> Optional[frozenset]:
+        """
+        Positions matching every filter (memoized until the next add), or None
+        when there are no filters. Each filter is a tuple of alternative facets.
+        """
+        if not filters:
+            return None
+        return self._matches(filters)[0]
+
+    def _listing(self, filters: list):
+        """Matching positions in index order, sorted once per filter combination"""
+        if not filters:
+            return range(len(self._docs))
+        entry = self._matches(filters)
+        if entry[1] is None:
+            entry[1] = sorted(entry[0])
+        return entry[1]
+
+    def page(self, filters: list = (), after: Optional[int] = None, limit: int = 20) -> dict:
+        """Up to limit documents after position after, located by binary search"""
+        with self._lock:
+            positions = self._listing(list(filters))
+            start = bisect.bisect_right(positions, after) if after is not None else 0
+            chunk = positions[start:start + limit]
+            more = start + limit < len(positions)
+            return {
+                'docs': [self._docs[p] for p in chunk],
+                'last': chunk[-1] if more and len(chunk) else None,
+                'total': len(positions)
+            }
+
+    def contains(self, doc_id: str) -> bool:
+        return doc_id in self._ids
+
+    def position(self, doc_id: str) -> Optional[int]:
+        return self._ids.get(doc_id)
+
+    def search(self, query: str = '', filters: list = (), limit: int = 20) -> dict:
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            candidates = self._candidates(list(filters))
+            if not terms:
+                positions = self._listing(list(filters))
+                return {
+                    'results': [dict(self._docs[p], score=None) for p in positions[:limit]],
+                    'total': len(positions),
+                    'exact': True
+                }
+
+            terms = [term for term in terms if term in self._postings]
+            if not terms or candidates == frozenset():
+                return {'results': [], 'total': 0, 'exact': True}
+            count = len(self._docs)
+            average_length = self._total_length / count
+            idf = {term: _idf(count, len(self._postings[term])) for term in terms}
+
+            exact = True
+            depth = max(POSTINGS_DEPTH, 2 * limit)
+            if candidates is not None and len(candidates) <= EXHAUSTIVE_CANDIDATES:
+                matched = [p for p in candidates if any(term in self._term_frequencies[p] for term in terms)]
+            else:
+                # Read the heaviest postings of each term; a document found through
+                # one term is still scored on all of them below
+                matched = set()
+                for term in terms:
+                    taken = 0
+                    for position in self._ranked_postings(term, average_length):
+                        if candidates is None or position in candidates:
+                            matched.add(position)
+                            taken += 1
+                            if taken >= depth:
+                                exact = False
+                                break
+
+            scored = []
+            for position in matched:
+                frequencies = self._term_frequencies[position]
+                length = self._lengths[position]
+                score = sum(
+                    idf[term] * self._weight(frequencies[term], length, average_length)
+                    for term in terms if term in frequencies
+                )
+                scored.append((score, position))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            return {
+                'results': [dict(self._docs[p], score=round(score, 3)) for score, p in scored[:limit]],
+                'total': len(scored),
+                'exact': exact
+            }
+
+
+def _idf(count: int, document_frequency: int) -> float:
+    return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+class QuestionSearch:
+    """
+    Search service; the index is rebuilt when the bank is reloaded and shared
+    question sets are added to it as they are saved. Only the most recent
+    STORED_SETS_LIMIT sets are kept; once older ones drop out the index is
+    rebuilt without them on the next query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._stored = None
+
+    def _load_stored(self) -> collections.deque:
+        stored = collections.deque(maxlen=STORED_SETS_LIMIT)
+        try:
+            # Newest first from storage; the deque keeps them oldest first
+            for question_set in reversed(firebase_service.list_question_sets(STORED_SETS_LIMIT, daily_only=True)):
+                stored.append(self._set_records(question_set))
+        except Exception as e:
+            print(f"[QUESTION SEARCH] Could not load stored question sets: {e}")
+        return stored
+
+    def _set_records(self, question_set: dict) -> list:
+        config = question_set.get('config') or {}
+        texts = [q.get('text') for q in question_set.get('questions') or []] + list(question_set.get('spares') or [])
+        return [
+            {
+                'question': text,
+                'category': config.get('type') or 'technical',
+                'difficulty': config.get('difficulty') or '',
+                'topics': [config['subType']] if config.get('subType') else [],
+                'companies': [config['company']] if config.get('company') else [],
+            }
+            for text in texts if text
+        ]
+
+    def index(self) -> SearchIndex:
+        snapshot = question_bank.snapshot()
+        index = self._index
+        if index is not None and index.bank_version == snapshot.version:
+            return index
+        with self._lock:
+            if self._index is not None and self._index.bank_version == snapshot.version:
+                return self._index
+            if self._stored is None:
+                self._stored = self._load_stored()
+            index = SearchIndex(snapshot.version)
+            for (pool, _), questions in snapshot.by_category.items():
+                if pool == INTERVIEW_POOL:
+                    for question in questions:
+                        index.add(question, 'bank')
+            for records in self._stored:
+                for record in records:
+                    index.add(record, 'set')
+            self._index = index
+            print(f"[QUESTION SEARCH] Indexed {len(index)} questions")
+            return index
+
+    def add_question_set(self, question_set: dict):
+        """Make a newly saved shared question set searchable; private sets are never indexed"""
+        if not question_set.get('daily'):
+            return
+        records = self._set_records(question_set)
+        with self._lock:
+            if self._stored is None:
+                return  # Picked up from storage when the index is first built
+            if len(self._stored) == self._stored.maxlen:
+                # The oldest set drops out; rebuild without it on the next query
+                self._stored.append(records)
+                self._index = None
+                return
+            self._stored.append(records)
+            index = self._index
+        if index is not None:
+            for record in records:
+                index.add(record, 'set')
+
+    def add_bank_questions(self, records: list):
+        """Index questions appended to the bank file ahead of the bank snapshot that will include them"""
+        index = self._index
+        if index is not None:
+            for record in records:
+                index.add(record, 'bank')
+
+    def bank_published(self, previous_version, version):
+        """Keep the current index when the new bank snapshot only adds questions it already has"""
+        with self._lock:
+            if self._index is not None and self._index.bank_version == previous_version:
+                self._index.bank_version = version
+
+    def is_shared_question(self, text: str, category: str) -> bool:
+        """Whether the question is in the bank or a shared set, i.e. likely to be asked again"""
+        if lookup_question(category, text):
+            return True
+        category = ' '.join((category or '').lower().split())
+        return self.index().contains(question_id(category, ' '.join((text or '').split())))
+
+    def _filters(self, **values) -> list:
+        """One filter per facet; comma-separated values match any of them"""
+        filters = []
+        for kind, value in values.items():
+            alternatives = tuple(_tag(kind, v) for v in (value or '').split(',') if v.strip())
+            if alternatives:
+                filters.append(alternatives)
+        return filters
+
+    def search(self, query: str = '', category: str = None, difficulty: str = None, topic: str = None,
+               company: str = None, limit: int = 20) -> dict:
+        filters = self._filters(category=category, difficulty=difficulty, topic=topic, company=company)
+        return self.index().search(query, filters, max(1, min(limit, MAX_RESULTS)))
+
+    def list_questions(self, category: str = None, difficulty: str = None, topic: str = None, company: str = None,
+                       source: str = None, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, fields: list = None) -> dict:
+        """
+        One page of questions in index order.
+
+        The cursor is opaque to clients: it names the index it was issued for,
+        the last position returned and the filters. Within the same index the
+        next page is a binary search away; after a rebuild it resumes from the
+        last question's position in the new index.
+        """
+        fields = list(fields or LISTING_FIELDS)
+        unknown = [field for field in fields if field not in LISTING_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        filters = self._filters(category=category, difficulty=difficulty, topic=topic, company=company, source=source)
+        filter_key = json.dumps(sorted(sorted(alternatives) for alternatives in filters))
+
+        index = self.index()
+        after = None
+        if cursor:
+            state = _decode_cursor(cursor)
+            if state.get('f') != filter_key:
+                raise ValueError("Cursor does not match the filters")
+            after = state['p'] if state.get('g') == index.generation else index.position(state.get('id'))
+            if after is None:
+                raise ValueError("Cursor has expired")
+
+        page = index.page(filters, after, max(1, min(limit, MAX_RESULTS)))
+        last = page['last']
+        return {
+            'questions': [{field: doc[field] for field in fields} for doc in page['docs']],
+            'count': len(page['docs']),
+            'total': page['total'],
+            'nextCursor': _encode_cursor({
+                'g': index.generation,
+                'p': last,
+                'id': page['docs'][-1]['id'],
+                'f': filter_key
+            }) if last is not None else None
+        }
+
+
+def _encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(state, dict) or not isinstance(state.get('p'), int):
+            raise ValueError
+        return state
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+# Singleton instance
+question_search = QuestionSearch()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+from app.services.firebase_service import firebase_service
+from app.services.question_search import question_search
+
+# Extra questions generated with every set, served when the user regenerates one
+SPARE_QUESTIONS = int(os.getenv('QUESTION_SET_SPARES', '3'))
+QUESTION_SET_CACHE_SIZE = int(os.getenv('QUESTION_SET_CACHE_SIZE', '500'))
+CACHE_TTL_SECONDS = 3600  # Firestore holds the durable copy; re-read after this in case another instance changed it
+
+
+class QuestionSetStore:
+    """
+    Question sets kept server-side by ID, including shared daily sets.
+
+    Sets live in Firestore; recently used ones are also kept in a bounded
+    in-memory LRU for CACHE_TTL_SECONDS.
+    """
+
+    # Only the fields that change what generate_question_set produces
+    CONFIG_FIELDS = ('type', 'subType', 'difficulty', 'role', 'company')
+
+    def __init__(self, max_entries: int = QUESTION_SET_CACHE_SIZE):
+        self._cache = OrderedDict()  # set_id -> (set, time cached)
+        self._max_entries = max(max_entries, 1)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # set_id -> [lock, holders and waiters]
+
+    def normalize_config(self, config: dict) -> dict:
+        normalized = {}
+        for field in self.CONFIG_FIELDS:
+            value = config.get(field) or ''
+            normalized[field] = ' '.join(str(value).lower().split())
+        return normalized
+
+    def daily_set_id(self, config: dict, count: int, seed: str) -> str:
+        key = json.dumps({**self.normalize_config(config), 'count': count}, sort_keys=True)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return f"daily-{seed}-{digest}"
+
+    def _cached(self, set_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._cache.get(set_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > CACHE_TTL_SECONDS:
+                del self._cache[set_id]
+                return None
+            self._cache.move_to_end(set_id)
+            return entry[0]
+
+    def _remember(self, set_id: str, question_set: dict):
+        with self._lock:
+            self._cache[set_id] = (question_set, time.monotonic())
+            self._cache.move_to_end(set_id)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def get(self, set_id: str) -> Optional[dict]:
+        cached = self._cached(set_id)
+        if cached:
+            return cached
+        stored = firebase_service.get_question_set(set_id)
+        if stored:
+            self._remember(set_id, stored)
+        return stored
+
+    def save(self, set_id: str, set_data: dict) -> dict:
+        saved = firebase_service.save_question_set(set_id, set_data)
+        self._remember(set_id, saved)
+        return saved
+
+    @contextmanager
+    def _locked(self, set_id: str):
+        """Hold the per-set lock; it is dropped once nobody holds or waits for it"""
+        with self._lock:
+            entry = self._key_locks.setdefault(set_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[set_id]
+
+    def _set_data(self, set_id: str, config: dict, questions: list, count: int) -> dict:
+        return {
+            'questions': [
+                {"id": f"{set_id}-{i}", "text": q, "order": i}
+                for i, q in enumerate(questions[:count])
+            ],
+            'spares': list(questions[count:]),
+            'config': self.normalize_config(config),
+            'createdAt': datetime.utcnow().isoformat()
+        }
+
+    def create_set(self, config: dict, questions: list, count: int) -> dict:
+        """Store a freshly generated set; questions beyond count are kept as spares"""
+        set_id = str(uuid.uuid4())
+        question_set = self.save(set_id, self._set_data(set_id, config, questions, count))
+        question_search.add_question_set(question_set)
+        return question_set
+
+    def take_spare(self, set_id: str, exclude: list = None) -> Optional[str]:
+        """
+        Next spare question for the set that is not already in exclude, or None when
+        they have run out. Spares of a private set are used up; daily sets are shared,
+        so theirs are only skipped past.
+        """
+        exclude = {' '.join(text.lower().split()) for text in exclude or []}
+        with self._locked(set_id):
+            question_set = self.get(set_id)
+            if not question_set:
+                return None
+            spares = question_set.get('spares') or []
+            for i, spare in enumerate(spares):
+                if ' '.join(spare.lower().split()) in exclude:
+                    continue
+                if not question_set.get('daily'):
+                    self.save(set_id, {**question_set, 'spares': spares[:i] + spares[i + 1:]})
+                return spare
+            return None
+
+    def get_or_create_daily_set(self, config: dict, count: int, generate: Callable[[dict, int], list], seed: str = None) -> dict:
+        """
+        Return the shared set for this config and seed (default: today's UTC date),
+        generating it once with generate(config, count) if nobody has yet.
+        Any questions generated beyond count are kept as the set's spares.
+        """
+        seed = re.sub(r'[^A-Za-z0-9-]', '', seed or '')[:32] or datetime.utcnow().strftime('%Y-%m-%d')
+        set_id = self.daily_set_id(config, count, seed)
+
+        existing = self.get(set_id)
+        if existing:
+            return existing
+
+        # Concurrent requests for the same set wait for the first generation
+        with self._locked(set_id):
+            existing = self.get(set_id)
+            if existing:
+                return existing
+
+            print(f"=== QUESTION SETS: generating daily set {set_id} ===")
+            questions = generate(config, count)
+            question_set = self.save(set_id, {
+                **self._set_data(set_id, config, questions, count),
+                'seed': seed,
+                'daily': True
+            })
+            question_search.add_question_set(question_set)
+            return question_set
+
+
+# Singleton instance
+question_set_store = QuestionSetStore()
@@ -0,0 +1,198 @@
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RetryPolicy:
+    """Bounded retry budget for one kind of LLM call"""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, deadline: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay  # seconds, first backoff step
+        self.max_delay = max_delay  # seconds, cap for a single backoff
+        self.deadline = deadline  # seconds, overall budget including retries
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+# Interactive calls get a tight budget, background ones can wait longer
+RETRY_POLICIES = {
+    'first_question': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=12.0),
+    'evaluation': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=15.0),
+    'evaluation_refine': RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=2.0, deadline=6.0),
+    'practice_questions': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=15.0),
+    'practice_evaluation': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=12.0),
+    'batch_evaluation': RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=6.0, deadline=25.0),
+    'question_set': RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=5.0, deadline=25.0),
+    'rubric': RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0, deadline=30.0),
+    'model_answer': RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=10.0, deadline=40.0),
+    'chat': RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=2.0, deadline=8.0),
+}
+DEFAULT_RETRY_POLICY = RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=2.0, deadline=10.0)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = (
+    'deadline exceeded', 'unavailable', 'internal error', 'timed out', 'timeout',
+    'connection reset', 'connection aborted', 'temporarily', 'rate limit', 'resource exhausted',
+)
+
+_RETRY_DELAY_PATTERNS = (
+    re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s*nanos:\s*(\d+))?', re.IGNORECASE),
+    re.compile(r'retry in\s*([\d.]+)\s*s', re.IGNORECASE),
+    re.compile(r'retry-after:?\s*([\d.]+)', re.IGNORECASE),
+)
+
+
+def get_status_code(exc: Exception) -> Optional[int]:
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int):
+        return code
+    match = re.match(r'\s*(\d{3})\b', str(exc))
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    message = str(exc).lower()
+    return any(marker in message for marker in RETRYABLE_MARKERS)
+
+
+def get_retry_after(exc: Exception) -> Optional[float]:
+    """Server-supplied retry delay in seconds (Retry-After header or RetryInfo), if any"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        value = headers.get('Retry-After')
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+
+    message = str(exc)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            seconds = float(match.group(1))
+            if match.lastindex and match.lastindex > 1 and match.group(2):
+                seconds += int(match.group(2)) / 1e9
+            return seconds
+    return None
+
+
+class RetryMetrics:
+    """Thread-safe per-call-type counters for LLM attempts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _entry(self, call_type: str) -> dict:
+        if call_type not in self._stats:
+            self._stats[call_type] = {
+                'calls': 0,
+                'attempts': 0,
+                'retries': 0,
+                'successes': 0,
+                'successesAfterRetry': 0,
+                'exhausted': 0,
+                'nonRetryable': 0,
+                'serverDelaysHonored': 0,
+                'backoffSeconds': 0.0,
+                'attemptLatencyMs': 0.0,
+                'errors': {},
+            }
+        return self._stats[call_type]
+
+    def record_call(self, call_type: str):
+        with self._lock:
+            self._entry(call_type)['calls'] += 1
+
+    def record_attempt(self, call_type: str, attempt: int, latency_ms: float, error: Exception = None):
+        with self._lock:
+            entry = self._entry(call_type)
+            entry['attempts'] += 1
+            entry['attemptLatencyMs'] += latency_ms
+            if attempt > 1:
+                entry['retries'] += 1
+            if error is None:
+                entry['successes'] += 1
+                if attempt > 1:
+                    entry['successesAfterRetry'] += 1
+            else:
+                kind = str(get_status_code(error) or type(error).__name__)
+                entry['errors'][kind] = entry['errors'].get(kind, 0) + 1
+
+    def record_backoff(self, call_type: str, delay: float, from_server: bool):
+        with self._lock:
+            entry = self._entry(call_type)
+            entry['backoffSeconds'] += delay
+            if from_server:
+                entry['serverDelaysHonored'] += 1
+
+    def record_failure(self, call_type: str, retryable: bool):
+        with self._lock:
+            self._entry(call_type)['exhausted' if retryable else 'nonRetryable'] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {}
+            for call_type, entry in self._stats.items():
+                snapshot[call_type] = {**entry, 'errors': dict(entry['errors'])}
+                snapshot[call_type]['backoffSeconds'] = round(entry['backoffSeconds'], 3)
+                snapshot[call_type]['avgAttemptLatencyMs'] = round(entry['attemptLatencyMs'] / entry['attempts'], 1) if entry['attempts'] else 0
+                del snapshot[call_type]['attemptLatencyMs']
+            return snapshot
+
+
+retry_metrics = RetryMetrics()
+
+
+def call_with_retry(fn: Callable, call_type: str, policy: RetryPolicy = None):
+    """
+    Call fn() under the retry policy for call_type.
+
+    Transient errors (429/5xx/timeouts) are retried with jittered exponential
+    backoff, or after the server-supplied delay when there is one. The last
+    error is re-raised once attempts or the deadline run out, so callers keep
+    their existing fallback handling. Backoff sleeps the calling thread, so
+    async handlers run LLM calls through asyncio.to_thread.
+    """
+    policy = policy or RETRY_POLICIES.get(call_type, DEFAULT_RETRY_POLICY)
+    retry_metrics.record_call(call_type)
+    started = time.monotonic()
+    attempt = 0
+
+    while True:
+        attempt += 1
+        attempt_started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            retry_metrics.record_attempt(call_type, attempt, (time.monotonic() - attempt_started) * 1000, e)
+
+            retryable = is_retryable(e)
+            if not retryable or attempt >= policy.max_attempts:
+                retry_metrics.record_failure(call_type, retryable)
+                raise
+
+            server_delay = get_retry_after(e)
+            delay = server_delay if server_delay is not None else policy.backoff(attempt)
+            if time.monotonic() - started + delay > policy.deadline:
+                print(f"[RETRY] {call_type}: next retry in {delay:.2f}s would exceed the {policy.deadline}s deadline, giving up")
+                retry_metrics.record_failure(call_type, retryable)
+                raise
+
+            print(f"[RETRY] {call_type}: attempt {attempt} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            retry_metrics.record_backoff(call_type, delay, server_delay is not None)
+            time.sleep(delay)
+            continue
+
+        retry_metrics.record_attempt(call_type, attempt, (time.monotonic() - attempt_started) * 1000)
+        return result
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+from app.services.firebase_service import firebase_service
+from app.services.question_search import question_search
+
+RUBRIC_CACHE_ENABLED = os.getenv('RUBRIC_CACHE_ENABLED', 'true').lower() == 'true'
+RUBRIC_CACHE_SIZE = int(os.getenv('RUBRIC_CACHE_SIZE', '2000'))
+NEGATIVE_TTL_SECONDS = 600  # Known-missing rubrics are re-checked after this, in case another instance made one
+
+
+class RubricStore:
+    """
+    Grading rubrics (key points + model answer) cached per question.
+
+    The first grading of a question schedules rubric generation in the
+    background; later gradings of the same question use the cached rubric
+    with a much shorter prompt.
+
+    Only bank questions and questions from shared sets get rubrics: anything
+    else (e.g. a generated follow-up) is unlikely to be asked again, so it
+    skips the storage lookup entirely. Lookups go through a bounded LRU that
+    also remembers misses for NEGATIVE_TTL_SECONDS.
+    """
+
+    def __init__(self, max_workers: int = 2, max_entries: int = RUBRIC_CACHE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rubric')
+        self._cache = OrderedDict()  # key -> rubric, or the time a lookup found none
+        self._max_entries = max(max_entries, 1)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._stats = {'hits': 0, 'misses': 0, 'skipped': 0, 'generated': 0, 'failed': 0}
+
+    def rubric_key(self, question: str, category: str = '') -> str:
+        normalized = ' '.join((question or '').lower().split())
+        return hashlib.sha1(f"{(category or '').lower()}|{normalized}".encode('utf-8')).hexdigest()[:20]
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _cached(self, key: str):
+        """(found, rubric) from the LRU; found is False when storage has to be asked"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False, None
+            if not isinstance(entry, dict) and time.monotonic() - entry > NEGATIVE_TTL_SECONDS:
+                del self._cache[key]
+                return False, None
+            self._cache.move_to_end(key)
+            return True, entry if isinstance(entry, dict) else None
+
+    def _remember(self, key: str, rubric: Optional[dict]):
+        with self._lock:
+            self._cache[key] = rubric if rubric else time.monotonic()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def _eligible(self, question: str, category: str) -> bool:
+        return RUBRIC_CACHE_ENABLED and bool(question) and question_search.is_shared_question(question, category)
+
+    def get(self, question: str, category: str = '') -> Optional[dict]:
+        if not self._eligible(question, category):
+            if RUBRIC_CACHE_ENABLED and question:
+                self._count('skipped')
+            return None
+        key = self.rubric_key(question, category)
+        found, rubric = self._cached(key)
+        if not found:
+            rubric = firebase_service.get_rubric(key)
+            self._remember(key, rubric)
+        self._count('hits' if rubric else 'misses')
+        return rubric
+
+    def schedule(self, question: str, category: str, generate: Callable[[str, str], Optional[dict]]) -> bool:
+        """Generate the rubric in the background unless it exists, is being generated or is not worth caching"""
+        if not self._eligible(question, category):
+            return False
+        key = self.rubric_key(question, category)
+        with self._lock:
+            if isinstance(self._cache.get(key), dict) or key in self._pending:
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._generate, key, question, category, generate)
+        return True
+
+    def _generate(self, key: str, question: str, category: str, generate: Callable[[str, str], Optional[dict]]):
+        try:
+            rubric = generate(question, category)
+            if not rubric or not rubric.get('keyPoints'):
+                self._count('failed')
+                return
+            rubric = firebase_service.save_rubric(key, {
+                **rubric,
+                'question': question,
+                'category': category,
+                'createdAt': datetime.utcnow().isoformat()
+            })
+            self._remember(key, rubric)
+            self._count('generated')
+        except Exception as e:
+            print(f"[RUBRIC] Rubric generation failed: {e}")
+            self._count('failed')
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cached = sum(1 for entry in self._cache.values() if isinstance(entry, dict))
+            return {**self._stats, 'cached': cached, 'knownMissing': len(self._cache) - cached, 'pending': len(self._pending)}
+
+
+# Singleton instance
+rubric_store = RubricStore()
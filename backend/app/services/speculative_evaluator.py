@@ -0,0 +1,113 @@
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> list:
+    return _WORD_RE.findall((text or '').lower())
+
+
+class SpeculativeEvaluator:
+    """
+    Evaluates partial transcripts in the background while the candidate is
+    still answering, so the final submit can reuse (or cheaply refine) the
+    result instead of waiting for a full evaluation.
+    """
+
+    MIN_WORDS = 12  # Too little text to be worth evaluating
+    MIN_GROWTH = 0.25  # Re-speculate only when the transcript grew by this fraction
+    REUSE_MAX_NEW_WORDS = 0.1  # Final answer may add up to this fraction and still be reused as-is
+    REFINE_MIN_OVERLAP = 0.6  # Below this the speculation is discarded and a full evaluation runs
+    ENTRY_TTL = 15 * 60  # seconds
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='speculative-eval')
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {'started': 0, 'skipped': 0, 'reused': 0, 'refined': 0, 'discarded': 0}
+
+    def _count(self, key: str):
+        self._stats[key] += 1
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ENTRY_TTL
+        for interview_id in [k for k, v in self._entries.items() if v['startedAt'] < cutoff]:
+            del self._entries[interview_id]
+
+    def submit_partial(self, interview_id: str, question_index: int, transcript: str, evaluate: Callable[[str], dict]) -> str:
+        """Start a speculative evaluation of transcript unless one is running or it barely changed"""
+        word_count = len(_words(transcript))
+        with self._lock:
+            self._evict_expired()
+            if word_count < self.MIN_WORDS:
+                self._count('skipped')
+                return 'too_short'
+
+            entry = self._entries.get(interview_id)
+            if entry and entry['questionIndex'] == question_index:
+                if not entry['future'].done():
+                    self._count('skipped')
+                    return 'in_flight'
+                if word_count < entry['wordCount'] * (1 + self.MIN_GROWTH):
+                    self._count('skipped')
+                    return 'unchanged'
+
+            self._entries[interview_id] = {
+                'questionIndex': question_index,
+                'transcript': transcript,
+                'wordCount': word_count,
+                'future': self._executor.submit(evaluate, transcript),
+                'startedAt': time.monotonic()
+            }
+            self._count('started')
+            return 'started'
+
+    async def take(self, interview_id: str, question_index: int, final_answer: str, timeout: float = 20.0) -> Optional[Tuple[dict, str, str]]:
+        """
+        Claim the speculation for this answer.
+
+        Returns (result, 'reuse' or 'refine', partial transcript), or None when
+        there is no usable speculation and the caller should evaluate from scratch.
+        A still-running speculation is awaited without blocking the event loop.
+        """
+        with self._lock:
+            entry = self._entries.pop(interview_id, None)
+        if not entry or entry['questionIndex'] != question_index:
+            return None
+
+        partial_words = _words(entry['transcript'])
+        final_words = _words(final_answer)
+        final_set = set(final_words)
+        overlap = sum(1 for word in partial_words if word in final_set) / max(len(partial_words), 1)
+        new_words = max(len(final_words) - len(partial_words), 0) / max(len(final_words), 1)
+
+        if overlap < self.REFINE_MIN_OVERLAP:
+            with self._lock:
+                self._count('discarded')
+            return None
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(entry['future']), timeout)
+        except Exception as e:
+            print(f"[SPECULATIVE] Speculative evaluation unusable: {e}")
+            with self._lock:
+                self._count('discarded')
+            return None
+
+        match = 'reuse' if final_words == partial_words or (overlap >= 0.95 and new_words <= self.REUSE_MAX_NEW_WORDS) else 'refine'
+        with self._lock:
+            self._count('reused' if match == 'reuse' else 'refined')
+        return result, match, entry['transcript']
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'pending': len(self._entries)}
+
+
+# Singleton instance
+speculative_evaluator = SpeculativeEvaluator()
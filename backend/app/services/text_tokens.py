@@ -0,0 +1,22 @@
+import re
+
+# Shared text analysis for local scoring and question search
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#][+#]?)?")
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not now of off on once only or other our out over own
+same she should so some such than that the their them then there these they this those through to too under until
+up very was we were what when where which while who whom why will with would you your yours explain describe what
+tell walk give example examples use using used way ways
+""".split())
+
+def _stem(token: str) -> str:
+    for suffix in ('ations', 'ation', 'ings', 'ing', 'ies', 'ed', 'es', 's'):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return token
+
+
+def tokenize(text: str) -> list:
+    return [_stem(token) for token in _TOKEN_RE.findall((text or '').lower().replace('-', ' ')) if token not in STOPWORDS and len(token) > 1]
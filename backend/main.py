@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+import asyncio
 import os
 import logging
 from datetime import datetime
@@ -114,6 +115,29 @@ if RESUME_ENABLED:
 if CHAT_ASSISTANT_ENABLED:
     app.include_router(chat_assistant.router)
 
+@app.on_event("startup")
+async def warm_llm_transport():
+    """Pre-connect to the Gemini API so the first request does not pay connection setup"""
+    from app.services.llm_transport import llm_transport
+    try:
+        await llm_transport.start()
+    except Exception as e:
+        logger.warning(f"Gemini transport warm-up failed: {e}")
+
+@app.on_event("startup")
+async def build_question_search_index():
+    """Index the question bank before the first search request"""
+    from app.services.question_search import question_search
+    try:
+        await asyncio.to_thread(question_search.index)
+    except Exception as e:
+        logger.warning(f"Question search index build failed: {e}")
+
+@app.on_event("shutdown")
+async def close_llm_transport():
+    from app.services.llm_transport import llm_transport
+    await llm_transport.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint - API information"""
@@ -127,6 +151,7 @@ async def root():
             "endpoints": {
                 "docs": "/docs" if not IS_PRODUCTION else "disabled",
                 "health": "/health",
+                "metrics": "/metrics",
                 "api": "/api"
             }
         }
@@ -155,6 +180,27 @@ async def health_check():
             }
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the LLM integration and code execution"""
+    from app.services.retry_policy import retry_metrics
+    from app.services.json_repair import parse_metrics
+    from app.services.speculative_evaluator import speculative_evaluator
+    from app.services.llm_transport import llm_transport
+    from app.services.rubric_store import rubric_store
+    from app.services.execution_pool import execution_pool
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "codeExecution": execution_pool.snapshot(),
+        "llm": {
+            "retries": retry_metrics.snapshot(),
+            "parsing": parse_metrics.snapshot(),
+            "speculative": speculative_evaluator.snapshot(),
+            "transport": llm_transport.snapshot(),
+            "rubrics": rubric_store.snapshot()
+        }
+    }
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8001))
@@ -0,0 +1,54 @@
+"""Checks for the deterministic aptitude grader (run directly or with pytest)"""
+
+from app.services.aptitude_grader import grade, grade_answer
+
+SYNONYM = "Find the synonym of ABUNDANCE: (a) Scarcity (b) Plenty (c) Lack (d) Shortage"
+ANALOGY = "Complete: Engineer : Building :: Sculptor : ?"
+SYLLOGISM = "If all Bloops are Razzies and all Razzies are Lazzies, are all Bloops definitely Lazzies?"
+TRAIN = "A train 100m long passes a pole in 10 seconds. What is its speed in km/hr?"
+
+CASES = [
+    # (question, answer, expected verdict)
+    (SYNONYM, "b", True),
+    (SYNONYM, "(b) Plenty", True),
+    (SYNONYM, "Option B", True),
+    (SYNONYM, "A synonym of abundance is plenty", True),
+    (SYNONYM, "a", False),
+    (SYNONYM, "b. Plenty", True),
+    (SYNONYM, "E.g. plenty is the synonym", True),
+    (SYNONYM, "e.g. scarcity", False),
+    (SYNONYM, "It is not scarcity, the answer is plenty", True),
+    (SYNONYM, "Scarcity", False),
+    (ANALOGY, "Statue", True),
+    (ANALOGY, "A sculptor does not make a building, he makes a statue", True),
+    (ANALOGY, "Painting", False),
+    (ANALOGY, "An engineer makes a building and a sculptor makes a painting", False),
+    (SYLLOGISM, "Yes", True),
+    (SYLLOGISM, "It is not false, so yes", True),
+    (SYLLOGISM, "Yes, there is no exception since the relation is transitive", True),
+    (SYLLOGISM, "No, not necessarily", False),
+    (SYLLOGISM, "Not necessarily", False),
+    (TRAIN, "36 km/hr", True),
+    (TRAIN, "100/10 = 10 m/s, times 18/5, so the answer is 36 km/hr", True),
+    (TRAIN, "40", False),
+]
+
+
+def test_verdicts():
+    from app.services.question_bank import lookup_question
+    for question, answer, expected in CASES:
+        spec = lookup_question('aptitude', question)['answer']
+        assert grade(spec, answer, question) is expected, (question, answer)
+
+
+def test_scores():
+    assert grade_answer(SYNONYM, "A synonym of abundance is plenty")['score'] >= 85
+    assert grade_answer(SYNONYM, "E.g. plenty is the synonym")['score'] >= 85
+    assert grade_answer(ANALOGY, "A sculptor does not make a building, he makes a statue")['score'] >= 85
+    assert grade_answer("Tell me about yourself", "I am an engineer") is None
+
+
+if __name__ == "__main__":
+    test_verdicts()
+    test_scores()
+    print(f"✓ {len(CASES)} grader cases passed")
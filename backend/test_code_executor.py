@@ -0,0 +1,41 @@
+"""Checks for the async code executor timeouts (run directly or with pytest)"""
+
+import asyncio
+import time
+
+from app.services.code_executor import CodeExecutor
+
+# Programs that leave a child behind holding stdout/stderr open
+BACKGROUND_CHILD_AND_WAIT = ('bash', "sleep 30 & sleep 30\n")
+BACKGROUND_CHILD_ONLY = ('python', "import subprocess\nsubprocess.Popen(['sleep', '30'])\nprint('started')\n")
+
+
+def _execute(language: str, code: str, timeout: int = 2) -> tuple:
+    executor = CodeExecutor()
+    executor.timeout = timeout
+    started = time.monotonic()
+    result = asyncio.run(executor.execute_async(code, language))
+    return result, time.monotonic() - started
+
+
+def test_runs_program():
+    result, _ = _execute('python', "print('hello')", timeout=10)
+    assert result['success'] and result['output'].strip() == 'hello', result
+
+
+def test_timeout_with_background_child():
+    result, elapsed = _execute(*BACKGROUND_CHILD_AND_WAIT)
+    assert not result['success'], result
+    assert elapsed < 6, elapsed
+
+
+def test_background_child_does_not_hold_pipes():
+    result, elapsed = _execute(*BACKGROUND_CHILD_ONLY)
+    assert elapsed < 6, elapsed
+
+
+if __name__ == "__main__":
+    test_runs_program()
+    test_timeout_with_background_child()
+    test_background_child_does_not_hold_pipes()
+    print("✓ code executor checks passed")
@@ -4,7 +4,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { Helmet } from 'react-helmet';
 import { interviewAPI } from '../services/api';
 import toast from 'react-hot-toast';
-import { Download, ArrowLeft, Trophy } from 'lucide-react';
+import { Download, ArrowLeft, Trophy, Lightbulb } from 'lucide-react';
 import { 
   getScoreBadgeColor, 
   formatScore,
@@ -16,6 +16,8 @@ export default function InterviewResults() {
   const navigate = useNavigate();
   const [interview, setInterview] = useState<any>(null);
   const [loading, setLoading] = useState(true);
+  const [modelAnswers, setModelAnswers] = useState<Record<string, string>>({});
+  const [loadingModelAnswer, setLoadingModelAnswer] = useState<string | null>(null);
 
   useEffect(() => {
     loadResults();
@@ -33,6 +35,21 @@ export default function InterviewResults() {
     }
   };
 
+  // Model answers are generated on first request and cached on the interview
+  const loadModelAnswer = async (questionId: string) => {
+    setLoadingModelAnswer(questionId);
+    try {
+      const data = await interviewAPI.getModelAnswer(id!, questionId);
+      setModelAnswers(prev => ({ ...prev, [questionId]: data.modelAnswer }));
+    } catch (error: any) {
+      toast.error(error?.response?.data?.detail || 'Failed to load model answer');
+    } finally {
+      setLoadingModelAnswer(null);
+    }
+  };
+
+  const getModelAnswerText = (qa: any): string | undefined => qa.modelAnswer || modelAnswers[qa.questionId];
+
   const downloadPDFResults = () => {
     if (!interview) return;
     
@@ -103,6 +120,11 @@ export default function InterviewResults() {
         doc.text(`AI Feedback: ${feedbackText}`, 14, y);
         y += 7;
       }
+      const modelAnswerText = getModelAnswerText(qa);
+      if (modelAnswerText) {
+        doc.text(`Model Answer: ${String(modelAnswerText)}`, 14, y);
+        y += 7;
+      }
       const responseTime = formatDuration((qa.endTs - qa.startTs) / 1000);
       doc.text(`Response Time: ${responseTime}`, 14, y);
       y += 10;
@@ -291,11 +313,26 @@ export default function InterviewResults() {
                     <div className="text-dark-800 bg-dark-50 p-3 rounded">{qa.answerText}</div>
                   </div>
                   {qa.aiFeedback && (
-                    <div>
+                    <div className="mb-3">
                       <div className="text-sm text-dark-600 mb-1">AI Feedback:</div>
                       <div className="text-dark-700">{qa.aiFeedback}</div>
                     </div>
                   )}
+                  {getModelAnswerText(qa) ? (
+                    <div>
+                      <div className="text-sm text-dark-600 mb-1">Model Answer:</div>
+                      <div className="text-dark-700 bg-green-500/10 border border-green-500/30 p-3 rounded whitespace-pre-wrap">{getModelAnswerText(qa)}</div>
+                    </div>
+                  ) : qa.questionId && (
+                    <button
+                      onClick={() => loadModelAnswer(qa.questionId)}
+                      disabled={loadingModelAnswer === qa.questionId}
+                      className="flex items-center gap-2 text-sm text-primary-600 hover:text-primary-700 disabled:opacity-50"
+                    >
+                      <Lightbulb className="w-4 h-4" />
+                      {loadingModelAnswer === qa.questionId ? 'Generating model answer...' : 'Show model answer'}
+                    </button>
+                  )}
                 </div>
               ))}
             </div>
@@ -102,6 +102,21 @@ export default function InterviewSession() {
     }
   }, [interview, stream, isCameraOn]);
 
+  // Send the answer so far once the candidate pauses, so the backend can start
+  // evaluating it before they submit (the backend ignores short or barely changed drafts)
+  useEffect(() => {
+    const draft = answer.trim();
+    if (!id || loading || interview?.evaluationMode === 'deferred' || draft.split(/\s+/).length < 12) {
+      return;
+    }
+    const timer = setTimeout(() => {
+      interviewAPI.submitPartialAnswer(id, draft, startTime ? Date.now() - startTime : 0).catch(error => {
+        console.error('Partial answer error:', error);
+      });
+    }, 1500);
+    return () => clearTimeout(timer);
+  }, [answer, id, loading, interview, startTime]);
+
   const startCamera = async () => {
     try {
       console.log('Starting camera...');
@@ -424,8 +439,10 @@ export default function InterviewSession() {
       // Get score from evaluation
       const score = response.evaluation?.score || 0;
       
-      // Show appropriate feedback based on score
-      if (score >= 85) {
+      // Show appropriate feedback based on score (deferred interviews are graded at the end)
+      if (response.deferred) {
+        toast.success('Answer saved ✅');
+      } else if (score >= 85) {
         toast.success('Excellent answer! 🌟');
       } else if (score >= 70) {
         toast.success('Good job! 👍');
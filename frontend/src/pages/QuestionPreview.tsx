@@ -16,6 +16,7 @@ export default function QuestionPreview() {
   const config = location.state?.config;
   
   const [questions, setQuestions] = useState<Question[]>([]);
+  const [setId, setSetId] = useState<string | undefined>(undefined);
   const [loading, setLoading] = useState(true);
   const [regenerating, setRegenerating] = useState<string | null>(null);
 
@@ -33,6 +34,7 @@ export default function QuestionPreview() {
     try {
       const response = await interviewAPI.generateQuestionSet(config);
       setQuestions(response.questions);
+      setSetId(response.setId);
       toast.success('Questions generated successfully!');
     } catch (error: any) {
       toast.error(error.message || 'Failed to generate questions');
@@ -45,7 +47,12 @@ export default function QuestionPreview() {
   const regenerateQuestion = async (questionId: string) => {
     setRegenerating(questionId);
     try {
-      const response = await interviewAPI.regenerateQuestion(config, questionId);
+      const response = await interviewAPI.regenerateQuestion(
+        config,
+        questionId,
+        setId,
+        questions.map(q => q.text)
+      );
       setQuestions(prev => prev.map(q => 
         q.id === questionId ? response.question : q
       ));
@@ -62,6 +69,7 @@ export default function QuestionPreview() {
     try {
       const response = await interviewAPI.generateQuestionSet(config);
       setQuestions(response.questions);
+      setSetId(response.setId);
       toast.success('All questions regenerated!');
     } catch (error: any) {
       toast.error(error.message || 'Failed to regenerate questions');
@@ -73,7 +81,7 @@ export default function QuestionPreview() {
   const startInterview = async () => {
     setLoading(true);
     try {
-      const response = await interviewAPI.startInterviewWithQuestions(config, questions);
+      const response = await interviewAPI.startInterviewWithQuestions(config, questions, setId);
       toast.success('Interview started!');
       navigate(`/interview/session/${response.interviewId}`);
     } catch (error: any) {
@@ -98,18 +98,18 @@ export const interviewAPI = {
     return response.data;
   },
 
-  generateQuestionSet: async (config: any, count: number = 5) => {
-    const response = await apiClient.post('/api/interviews/generate-question-set', { config, count });
+  generateQuestionSet: async (config: any, count: number = 5, daily: boolean = false) => {
+    const response = await apiClient.post('/api/interviews/generate-question-set', { config, count, daily });
     return response.data;
   },
 
-  regenerateQuestion: async (config: any, questionId: string) => {
-    const response = await apiClient.post('/api/interviews/regenerate-question', { config, questionId });
+  regenerateQuestion: async (config: any, questionId: string, setId?: string, exclude: string[] = []) => {
+    const response = await apiClient.post('/api/interviews/regenerate-question', { config, questionId, setId, exclude });
     return response.data;
   },
 
-  startInterviewWithQuestions: async (config: any, questions: any[]) => {
-    const response = await apiClient.post('/api/interviews/start-with-questions', { config, questions });
+  startInterviewWithQuestions: async (config: any, questions: any[], setId?: string) => {
+    const response = await apiClient.post('/api/interviews/start-with-questions', { config, questions, setId });
     return response.data;
   },
 
@@ -121,6 +121,14 @@ export const interviewAPI = {
     return response.data;
   },
 
+  submitPartialAnswer: async (interviewId: string, partialTranscript: string, elapsedMs: number = 0) => {
+    const response = await apiClient.post(`/api/interviews/${interviewId}/partial`, {
+      partialTranscript,
+      elapsedMs,
+    });
+    return response.data;
+  },
+
   finishInterview: async (interviewId: string) => {
     const response = await apiClient.post(`/api/interviews/${interviewId}/finish`);
     return response.data;
@@ -131,6 +139,11 @@ export const interviewAPI = {
     return response.data;
   },
 
+  getModelAnswer: async (interviewId: string, questionId: string) => {
+    const response = await apiClient.get(`/api/interviews/${interviewId}/qa/${questionId}/model-answer`);
+    return response.data;
+  },
+
   getUserInterviews: async () => {
     const response = await apiClient.get('/api/interviews');
     return response.data;
@@ -138,10 +151,21 @@ export const interviewAPI = {
 };
 
 export const questionsAPI = {
-  getQuestions: async (category?: string, difficulty?: string) => {
+  getQuestions: async (
+    category?: string,
+    difficulty?: string,
+    options: { topic?: string; company?: string; cursor?: string; limit?: number; fields?: string[] } = {}
+  ) => {
     const params = new URLSearchParams();
     if (category) params.append('category', category);
     if (difficulty) params.append('difficulty', difficulty);
+    if (options.topic) params.append('topic', options.topic);
+    if (options.company) params.append('company', options.company);
+    if (options.cursor) params.append('cursor', options.cursor);
+    if (options.limit) params.append('limit', String(options.limit));
+    if (options.fields?.length) params.append('fields', options.fields.join(','));
+    // A plain list without a limit or cursor, otherwise { questions, count, total, nextCursor };
+    // pass nextCursor back for the next page
     const response = await apiClient.get(`/api/questions?${params.toString()}`);
     return response.data;
   },